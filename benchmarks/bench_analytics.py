@@ -0,0 +1,64 @@
+"""
+NAME
+    bench_analytics
+
+DESCRIPTION
+    Benchmark of the streak analytics of many habits. Compares the reference functions
+    of the analytics module with the vectorized batch analytics.
+
+    Run with:
+        python -m benchmarks.bench_analytics
+"""
+import time
+from datetime import datetime, timedelta
+from random import Random
+import scr.analytics as ana
+import scr.batch_analytics as batch
+from scr.completion import CompletedDates
+
+HABIT_COUNT = 5000
+HISTORY_SIZE = 365
+
+
+def create_habits():
+    """
+    Returns habit data with random completed dates over the history.
+
+    Returns:
+        [dict]: The habit data.
+    """
+    random = Random(1)
+    creation_time = datetime.now() - timedelta(days=HISTORY_SIZE)
+    habits = []
+    for _ in range(HABIT_COUNT):
+        frequency = random.choice([1, 7])
+        completed_dates = [creation_time.date() + timedelta(days=day)
+                           for day in range(0, HISTORY_SIZE, frequency) if random.random() < 0.8]
+        habits.append({"frequency": frequency, "creation_time": creation_time,
+                       "completed_dates": CompletedDates(creation_day=creation_time.date(),
+                                                         frequency=frequency,
+                                                         completed_dates=completed_dates)})
+    return habits
+
+
+def main():
+    """
+    Prints the times of the reference and the batch analytics.
+    """
+    habits = create_habits()
+    start = time.perf_counter()
+    for habit in habits:
+        ana.get_current_streak(habit=habit)
+        ana.get_longest_streak(habit=habit)
+    reference_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batch.get_batch_statistics(habit_list=habits)
+    batch_time = time.perf_counter() - start
+
+    print(f"{HABIT_COUNT} habits over {HISTORY_SIZE} days")
+    print(f"reference {reference_time * 1000:10.1f}ms")
+    print(f"batch     {batch_time * 1000:10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+NAME
+    bench_load
+
+DESCRIPTION
+    Benchmark of loading large completion histories. Builds a database with the text
+    format of schema version 2, measures its size and the time to read and decode all
+    completions, migrates it in place to the integer ordinal format and measures again.
+
+    Run with:
+        python -m benchmarks.bench_load
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from datetime import date, timedelta
+from scr import migrations
+from scr.sqlite_storage import SQLiteStorage
+
+HABIT_COUNT = 100
+HISTORY_SIZE = 3650
+
+
+def create_text_data_base(data_base):
+    """
+    Creates a database with schema version 2, which stores the dates as iso-format text.
+
+    Args:
+        data_base (str): The path of the database.
+    """
+    first_day = date.today() - timedelta(days=HISTORY_SIZE)
+    with closing(sqlite3.connect(data_base, isolation_level=None)) as connect:
+        with closing(connect.cursor()) as cursor:
+            cursor.execute("BEGIN")
+            for migration in migrations.MIGRATIONS[:2]:
+                migration(cursor)
+            cursor.execute("PRAGMA user_version = 2")
+            cursor.executemany("""
+                INSERT INTO habit (id, name, description, frequency, creation_time)
+                VALUES (?, 'bench', 'bench', 1, ?)
+            """, [(habit_id, first_day.isoformat() + "T00:00:00")
+                  for habit_id in range(1, HABIT_COUNT + 1)])
+            cursor.executemany("""
+                INSERT INTO tracking (habit_id, completed_dates) VALUES (?, ?)
+            """, ((habit_id, (first_day + timedelta(days=day)).isoformat())
+                  for habit_id in range(1, HABIT_COUNT + 1) for day in range(HISTORY_SIZE)))
+            cursor.execute("COMMIT")
+        connect.execute("VACUUM")
+
+
+def time_load(data_base, decode):
+    """
+    Returns the times to read and to decode all completions.
+
+    Args:
+        data_base (str): The path of the database.
+        decode (function): The function which decodes one stored date.
+
+    Returns:
+        (float, float): The read time and the decode time in seconds.
+    """
+    with closing(sqlite3.connect(data_base)) as connect:
+        start = time.perf_counter()
+        rows = connect.execute("""
+            SELECT habit_id, completed_dates FROM tracking ORDER BY habit_id, completed_dates
+        """).fetchall()
+        read_time = time.perf_counter() - start
+        start = time.perf_counter()
+        [decode(row[1]) for row in rows]
+        return read_time, time.perf_counter() - start
+
+
+def main():
+    """
+    Prints the size of the database and the load times before and after the migration.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        data_base = os.path.join(directory, "bench.db")
+        create_text_data_base(data_base)
+        text_size = os.path.getsize(data_base)
+        text_times = time_load(data_base, date.fromisoformat)
+
+        #migrates the database in place to the current schema
+        with SQLiteStorage(data_base=data_base) as storage:
+            storage.get_connection().execute("VACUUM")
+        ordinal_size = os.path.getsize(data_base)
+        ordinal_times = time_load(data_base, date.fromordinal)
+
+    print(f"{HABIT_COUNT} habits with {HISTORY_SIZE} completed dates each")
+    print("format         size        read       decode")
+    for name, size, times in (("text", text_size, text_times),
+                              ("ordinal", ordinal_size, ordinal_times)):
+        print(f"{name:<10}{size / 2**20:8.2f}MB{times[0] * 1000:10.1f}ms{times[1] * 1000:10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+NAME
+    bench_save
+
+DESCRIPTION
+    Benchmark of SQLiteStorage.save. Measures one save of a loaded habit for a growing
+    stored history and a growing number of new completed dates.
+
+    Run with:
+        python -m benchmarks.bench_save
+"""
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from scr.habit import Habit
+from scr.sqlite_storage import SQLiteStorage
+
+HISTORY_SIZES = (10, 365, 3650, 36500)
+NEW_DATE_COUNTS = (1, 10, 100)
+
+
+def time_save(history_size, new_date_count, repeat=5):
+    """
+    Returns the best time of saving new dates to a habit with a stored history.
+
+    Args:
+        history_size (int): The number of stored completed dates.
+        new_date_count (int): The number of dates added before the save.
+        repeat (int): The number of measurements. Default is 5.
+
+    Returns:
+        float: The best time of one save in seconds.
+    """
+    today = datetime.now()
+    creation_time = today - timedelta(days=history_size + new_date_count * repeat)
+    history = [creation_time.date() + timedelta(days=i) for i in range(history_size)]
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as directory:
+        with SQLiteStorage(data_base=os.path.join(directory, "bench.db")) as storage:
+            Habit.DEFAULT_STORAGE_STRATEGY = storage
+            habit = Habit(name="bench", description="bench", completed_dates=history,
+                          creation_time=creation_time)
+            habit.save()
+            habit = Habit.load(habit["habit_id"])
+            next_day = creation_time.date() + timedelta(days=history_size)
+            for _ in range(repeat):
+                for _ in range(new_date_count):
+                    habit.completion.mark_completed(next_day)
+                    next_day += timedelta(days=1)
+                start = time.perf_counter()
+                habit.save()
+                best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """
+    Prints the save time in milliseconds for every history size and number of new dates.
+    """
+    default_storage = Habit.DEFAULT_STORAGE_STRATEGY
+    print("history  " + "".join(f"{count:>10} new" for count in NEW_DATE_COUNTS))
+    try:
+        for history_size in HISTORY_SIZES:
+            times = [time_save(history_size, count) * 1000 for count in NEW_DATE_COUNTS]
+            print(f"{history_size:>7}  " + "".join(f"{value:>11.3f}ms" for value in times))
+    finally:
+        Habit.DEFAULT_STORAGE_STRATEGY = default_storage
+
+
+if __name__ == "__main__":
+    main()
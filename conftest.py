@@ -26,7 +26,8 @@ def set_up():
     
     yield
 
-    #remove test database
+    #close the connections and remove test database
+    Habit.DEFAULT_STORAGE_STRATEGY.close()
     if os.path.exists("test/test_data.db"):
         os.remove("test/test_data.db")
 
@@ -51,6 +52,19 @@ def data_base_path():
     return "test/test_data.db"
 
 
+@pytest.fixture
+def create_habit():
+    """
+    Returns a function which creates an unsaved daily or weekly habit.
+    The completed dates are given as days after the creation day.
+    """
+    def create(number, days=(), frequency=1, creation_time=datetime(year=2024,month=9,day=30)):
+        return Habit(name=f"habit {number}",description=f"description {number}",
+                     frequency=frequency,creation_time=creation_time,
+                     completed_dates=[creation_time.date() + timedelta(days=day) for day in days])
+    return create
+
+
 def create_habit_data():
     """
     Creats the habit_data which is stored in the test database.
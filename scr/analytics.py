@@ -6,7 +6,9 @@ DESCRIPTION
     Modul which contains the functions in functional programming paradigm for
     the habit tracking app.
 """
+from collections import namedtuple
 from datetime import date, timedelta
+from scr.habit_collection import HabitCollection
 #from scr.habit import Habit
 
 
@@ -16,7 +18,7 @@ def get_current_tracked_habit(habit_id:int,habit_list:list)->object:
 
     Args:
         habit_id (int): The id with which is the habit stored in the database.
-        habit_list (ist): A list of habits.
+        habit_list (list): A list or a HabitCollection of habits.
 
     Returns:
         Habit: The habit from the habit_list with the habit_id if existing.
@@ -27,6 +29,12 @@ def get_current_tracked_habit(habit_id:int,habit_list:list)->object:
         ValueError: "There is no habit with id habit_id in the list."
     
     """
+    #look up the habit by id in a habit collection.
+    if isinstance(habit_list,HabitCollection):
+        habit = habit_list.get(habit_id)
+        if habit is None:
+            raise ValueError(f"There is no habit with id {habit_id} in the list.")
+        return habit
     #check if habit_list a list.
     if not isinstance(habit_list,list):
         raise TypeError("Habit list is not a list.")
@@ -45,7 +53,7 @@ def get_all_current_tracked_habits(habit_list:list, id_list:list)->list:
     Returns a list of habits with the ids from the id list.
 
     Args:
-        habit_list (ist): A list of habits.
+        habit_list (list): A list or a HabitCollection of habits.
         id_list (list): The ids of the habits.
 
     Returns:
@@ -77,7 +85,7 @@ def get_habit_with_frequency(habit_list:list, frequency:int)->list:
     Get all habit with the selected frequency.
 
     Args:
-        habit_list (list): The list of habits which should be checked.
+        habit_list (list): The list or the HabitCollection of habits which should be checked.
         frequency (int): The periodicity of the habits.
 
     Returns:
@@ -87,6 +95,9 @@ def get_habit_with_frequency(habit_list:list, frequency:int)->list:
         TypeError: "Object not of type Habit."
 
     """
+    #use the frequency index of a habit collection.
+    if isinstance(habit_list,HabitCollection):
+        return habit_list.with_frequency(frequency)
     if not isinstance(habit_list,list):
         raise TypeError("Habit list is not a list.")
     try:
@@ -193,6 +204,105 @@ def get_longest_streak(habit)->int:
 
     return longest_streak
 
+#the result of the streak engine
+StreakStatistics = namedtuple("StreakStatistics",
+                              ["current_streak", "longest_streak", "streak_count",
+                               "completed_periods", "gap_count", "longest_gap", "missed_periods"])
+
+def compute_streak_statistics(period_indexes, current_period:int)->StreakStatistics:
+    """
+    Calculate all streak statistics in one pass over the sorted period indexes.
+    Only the periods between the creation period 0 and the current period are counted.
+
+    Args:
+        period_indexes (iterable): The sorted indexes of the completed periods.
+        current_period (int): The index of the period which contains today.
+
+    Returns:
+        StreakStatistics: (current_streak, longest_streak, streak_count, completed_periods,
+                          gap_count, longest_gap, missed_periods)
+    """
+    streak = longest_streak = streak_count = completed_periods = 0
+    gap_count = longest_gap = 0
+    #the index of the last completed period
+    last_period = -1
+    for period in period_indexes:
+        if period <= last_period or period < 0:
+            continue
+        if period > current_period:
+            break
+        gap = period - last_period - 1
+        if gap:
+            #a missed period before this period ends the streak
+            gap_count += 1
+            longest_gap = max(longest_gap, gap)
+            streak_count += 1
+            streak = 1
+        else:
+            if not streak:
+                streak_count += 1
+            streak += 1
+        longest_streak = max(longest_streak, streak)
+        completed_periods += 1
+        last_period = period
+
+    #the missed periods after the last completed period
+    gap = current_period - last_period
+    if gap > 0:
+        gap_count += 1
+        longest_gap = max(longest_gap, gap)
+        streak = 0
+    missed_periods = max(current_period + 1, 0) - completed_periods
+    return StreakStatistics(streak, longest_streak, streak_count, completed_periods,
+                            gap_count, longest_gap, missed_periods)
+
+def get_streak_statistics(habit)->StreakStatistics:
+    """
+    Get the current streak, the longest streak and the gap statistics of the habit
+    between creation date and today with one pass over the completed periods.
+
+    Args:
+        habit(Habit): The habit from which the statistics should be calculated
+
+    Returns:
+        StreakStatistics: The streak statistics of the habit.
+
+    Raises:
+        TypeError: Habit not of type Habit.
+        TypeError: Creation time not of type datetime.datetime.
+        TypeError: Completed dates is not iterable.
+    """
+    #check if habit keywords are callable.
+    try:
+        creation_time=habit["creation_time"]
+        frequency=habit["frequency"]
+        completed_dates=habit["completed_dates"]
+    except (KeyError,TypeError) as exc:
+        raise TypeError("Habit not of type Habit.") from exc
+
+    try:
+        #change creation_time of habit to date.
+        creation_day = creation_time.date()
+    except AttributeError as exc:
+        raise TypeError("Creation time not of type datetime.datetime.") from exc
+
+    #the index of the period which contains today
+    current_period = (date.today() - creation_day).days // frequency
+
+    try:
+        period_indexes = completed_dates.get_period_indexes()
+    except AttributeError:
+        try:
+            #only the first days of the periods are completed periods
+            offsets = ((completed - creation_day).days for completed in completed_dates)
+            period_indexes = sorted({offset // frequency for offset in offsets
+                                     if offset >= 0 and not offset % frequency})
+        except TypeError as exc:
+            raise TypeError("Completed dates is not iterable.") from exc
+
+    return compute_streak_statistics(period_indexes=period_indexes,
+                                     current_period=current_period)
+
 def get_longest_streak_of_all(habit_list:list)->int:
     """
     Get the longest streak of all habits.
@@ -206,13 +316,13 @@ def get_longest_streak_of_all(habit_list:list)->int:
     Raises:
         TypeError: Habit list is not a list.
     """
-    if not isinstance(habit_list,list):
+    if not isinstance(habit_list,(list,HabitCollection)):
         raise TypeError("Habit list is not a list.")
 
     over_all_longest_streak = 0
     for habit in habit_list:
         try:
-            longest_streak = get_longest_streak(habit=habit)
+            longest_streak = get_streak_statistics(habit=habit).longest_streak
         except TypeError:
             continue
         over_all_longest_streak = max(over_all_longest_streak,longest_streak)
@@ -0,0 +1,375 @@
+"""
+NAME
+    app
+
+DESCRIPTION
+    The main window of the habit tracking app. It imports tkinter and tkcalendar,
+    so it is only imported when the GUI starts.
+
+CLASSES
+    tk.TK
+        App
+"""
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+import tkinter.messagebox as mb
+from scr.change_detector import ChangeDetector
+from scr.habit import Habit
+from scr.habit_collection import HabitCollection
+from scr.storage_executor import StorageExecutor
+from scr.center_frame import CenterFrame
+from scr.bottom_frame import BottomFrame
+
+
+class App(tk.Tk):
+    """
+    The main application class for the Habit Tracking App.
+    
+    Attributes:
+        USABLE_FREQUENCIES (dict): Implemented frequency keys:["DAILY"]=1 ,["WEEKLY"]=7
+        SELECTABLE_FREQUENCIES (tuple): Selectable frequencies:
+                                    ("Daily", "Weekly", "Selected", "All")
+        HABIT_LIST_TITLES (tuple): ("selected", "habit name", "description", "frequency",
+                         "current streak", "longest streak")
+        LOAD_POLL_INTERVAL (int): The milliseconds between two polls of the loaded habits.
+        CHANGE_POLL_INTERVAL (int): The milliseconds between two checks for changes
+                                    of other processes.
+        
+        all_habits (HabitCollection): All habits which are saved in the database.
+                                      It is filled by the worker thread while loading.
+        child_windows (list): A list to keep track of child windows.
+        top_frame (ttk.Frame): The top frame of the application.
+        bottom_frame (BottomFrame): The bottom frame of the application.
+        center_frame (CenterFrame): The center frame of the application displaying the habit data.
+        longest_streak_label (ttk.Label): The label of the overall longest streak.
+        progress_bar (ttk.Progressbar): The progress of loading the habits.
+        storage_executor (StorageExecutor): Runs the storage calls of the GUI in a worker thread.
+        change_detector (ChangeDetector): Finds the habits changed by other processes.
+    """
+    USABLE_FREQUENCIES = {"Daily" : 1, "Weekly" : 7}
+    SELECTABLE_FREQUENCIES = ("Daily", "Weekly", "Selected", "All")
+    HABIT_LIST_TITLES = ("selected", "habit name", "description", "frequency",
+                         "current streak", "longest streak")
+    LOAD_POLL_INTERVAL = 50
+    CHANGE_POLL_INTERVAL = 1000
+
+
+    def __init__(self):
+        super().__init__()
+
+        #the habits are loaded in a worker thread after the window is shown
+        self.all_habits = HabitCollection()
+        self.child_windows = []
+        self.__load_queue = queue.Queue()
+        self.__loading = True
+        #all storage calls of the GUI are executed by the storage executor
+        self.storage_executor = StorageExecutor(master=self,
+                                                on_pending=self.update_button_state)
+        self.change_detector = ChangeDetector(storage=Habit.DEFAULT_STORAGE_STRATEGY)
+        self.__change_poll_id = None
+
+        #set the geometry and the title of the main window
+        self.geometry("900x450")
+        self.title("Habit Tracking App")
+
+        self.top_frame = self.get_top_frame()
+        self.top_frame.pack(side="top")
+
+        self.center_frame = CenterFrame(self,column_names=self.HABIT_LIST_TITLES,
+                                        habit_list=self.all_habits)
+        self.center_frame.pack(side="top", fill="both", expand=True)
+
+        self.bottom_frame = BottomFrame(self)
+        self.bottom_frame.pack(side="bottom")
+
+        self.start_loading()
+
+    def destroy(self):
+        """
+        Override the destroy method to ensure all child windows are closed
+        before the main window is destroyed.
+
+        Raises:
+            AttributeError: Child window has no Attribute destroy.
+        """
+        try:
+            for child in self.child_windows:
+                #call the destroy methode in the child window
+                child.destroy()
+        except AttributeError as exc:
+            raise AttributeError("Child window has no Attribute destroy.") from exc
+        if self.__change_poll_id is not None:
+            self.after_cancel(self.__change_poll_id)
+            self.__change_poll_id = None
+        #finish the pending storage calls before the app is closed
+        self.storage_executor.shutdown(wait=True)
+        return super().destroy()
+
+    def add_child_window(self, child):
+        """
+        Add a child window to the list and disable buttons in the bottom frame.
+        
+        Args:
+            child (PopUpWindow): The child window to add.
+        """
+        self.child_windows.append(child)
+
+        #disables button that there is only one child window at once.
+        self.update_button_state()
+
+    def remove_child_window(self,child):
+        """
+        Remove a child window from the list and enable buttons in the bottom frame.
+        
+        Args:
+            child (PopUpWindow): The child window to remove.
+        """
+        self.child_windows.remove(child)
+        self.update_button_state()
+
+    def update_button_state(self, *args):
+        """
+        Disable the buttons in the bottom frame while a child window is open, the habits
+        are loaded or storage calls are pending, else enable them.
+        The mouse cursor shows the pending storage calls.
+        """
+        pending = self.storage_executor.pending
+        busy = self.child_windows or self.__loading or pending
+        for button in self.bottom_frame.buttons:
+            button.state(["disabled" if busy else "!disabled"])
+        self.configure(cursor="watch" if pending else "")
+        #return args to prevent unused argument Pylint warning
+        return args
+
+    def show_storage_error(self, exception):
+        """
+        Show the error of a failed storage call.
+
+        Args:
+            exception (Exception): The exception of the storage call.
+        """
+        mb.showerror(title="STORAGE ERROR", message=f"The habit data is not stored: {exception}")
+
+
+    def get_top_frame(self):
+        """
+        Create and return the top frame of the application.
+        
+        Returns:
+            ttk.Frame: The top frame containing the application title.
+        """
+        top_frame = ttk.Frame(self)
+        #creates and pack title label
+        title = ttk.Label(top_frame, text="Habit Tracking App")
+        title.pack(side="top")
+        #create and pack label with the value of the longest streak count.
+        self.longest_streak_label = ttk.Label(top_frame, text="Loading habits ...")
+        self.longest_streak_label.pack(side="top")
+        #create and pack the progress bar, which is shown while the habits are loaded.
+        self.progress_bar = ttk.Progressbar(top_frame, mode="determinate", length=300)
+        self.progress_bar.pack(side="top")
+        return top_frame
+
+    def start_loading(self):
+        """
+        Start the worker thread which loads the habits and poll its results.
+        The buttons are disabled until all habits are loaded.
+        """
+        self.__loading = True
+        self.update_button_state()
+        #the data version before the load, so the changes during the load are found.
+        #the check opens the connection of the storage executor, which also does the
+        #writes of the app, so the own saves do not count as changes
+        self.storage_executor.submit(self.change_detector.check,
+                                     callback=self.start_load_thread,
+                                     error_callback=self.start_load_thread,
+                                     background=True)
+        self.after(App.LOAD_POLL_INTERVAL, self.poll_loading)
+
+    def start_load_thread(self, *args):
+        """
+        Start the worker thread which loads the habits after the first check of the data
+        version. If the check fails, the habits are loaded anyway and the load reports
+        the error of the database.
+        """
+        threading.Thread(target=self.load_habits,
+                         args=(self.__load_queue, self.change_detector),
+                         daemon=True).start()
+        #return args to prevent unused argument Pylint warning
+        return args
+
+    @staticmethod
+    def load_habits(load_queue, change_detector):
+        """
+        Load the habits in chunks and put them into the queue. It runs in the worker
+        thread and must not use any widget.
+
+        Args:
+            load_queue (queue.Queue): The queue of the messages (kind, value) to the main thread.
+            change_detector (ChangeDetector): Stores the revision before the habits are loaded.
+        """
+        try:
+            change_detector.sync()
+            load_queue.put(("count", Habit.count_all()))
+            for habits in Habit.iter_all():
+                load_queue.put(("habits", habits))
+        except Exception as exc: #pylint: disable=broad-exception-caught
+            load_queue.put(("error", exc))
+        else:
+            load_queue.put(("done", None))
+
+    def poll_loading(self):
+        """
+        Take the next message of the worker thread and show the loaded habits.
+        At most one chunk of habits is handled per call, so the window stays responsive.
+        """
+        try:
+            kind, value = self.__load_queue.get_nowait()
+        except queue.Empty:
+            self.after(App.LOAD_POLL_INTERVAL, self.poll_loading)
+            return
+
+        if kind == "count":
+            self.progress_bar["maximum"] = max(value, 1)
+        elif kind == "habits":
+            self.all_habits.extend(value)
+            if self.center_frame.habit_list is self.all_habits:
+                self.center_frame.add_habits(habits=value)
+            self.progress_bar["value"] = len(self.all_habits)
+        else:
+            self.finish_loading()
+            if kind == "error":
+                mb.showerror(title="LOADING ERROR", message=f"The habits are not loaded: {value}")
+            return
+        self.after_idle(self.poll_loading)
+
+    def finish_loading(self):
+        """
+        Hide the progress bar, show the overall longest streak and enable the buttons.
+        """
+        self.progress_bar.pack_forget()
+        self.update_longest_streak()
+        self.__loading = False
+        self.update_button_state()
+        self.__change_poll_id = self.after(App.CHANGE_POLL_INTERVAL, self.poll_changes)
+
+    def poll_changes(self):
+        """
+        Let the storage executor check with the data version whether another process
+        changed the database. The next check is scheduled CHANGE_POLL_INTERVAL milliseconds
+        after the result of this check.
+        """
+        self.__change_poll_id = None
+        self.storage_executor.submit(self.change_detector.check,
+                                     callback=self.changes_checked,
+                                     error_callback=self.change_check_failed,
+                                     background=True)
+
+    def changes_checked(self, changed):
+        """
+        Let the storage executor load only the changed habits, if the database is changed,
+        and schedule the next check.
+
+        Args:
+            changed (bool): The result of the check of the change detector.
+        """
+        if changed:
+            self.storage_executor.submit(self.change_detector.poll,
+                                         callback=self.apply_changes,
+                                         error_callback=self.show_storage_error,
+                                         background=True)
+        self.__change_poll_id = self.after(App.CHANGE_POLL_INTERVAL, self.poll_changes)
+
+    def change_check_failed(self, exception):
+        """
+        Show the error of the check. The checks are stopped, so a broken database
+        does not show the error every CHANGE_POLL_INTERVAL milliseconds.
+
+        Args:
+            exception (Exception): The exception of the check.
+        """
+        mb.showerror(title="STORAGE ERROR",
+                     message=f"The changes of other programs are not shown: {exception}")
+
+    def apply_changes(self, changes):
+        """
+        Show the habits which are changed, added or deleted by another process.
+        Changes which the app made itself are already shown, they only update the rows.
+
+        Args:
+            changes (Changes): The changed habits and the ids of the deleted habits.
+        """
+        for habit in changes.habits:
+            if self.all_habits.get(habit["habit_id"]) is None:
+                self.all_habits.append(habit)
+                if self.center_frame.habit_list is self.all_habits:
+                    self.center_frame.add_habit(habit)
+            else:
+                self.all_habits.update(habit)
+                self.center_frame.update_habit(habit)
+        for habit_id in changes.deleted_ids:
+            if self.all_habits.get(habit_id) is not None:
+                self.all_habits.remove(habit_id)
+                self.center_frame.remove_habit(habit_id)
+        if changes.habits or changes.deleted_ids:
+            self.update_longest_streak()
+
+    def update_longest_streak(self):
+        """
+        Update the label of the overall longest streak from the stored streak statistics.
+        The statistics are read by the storage executor.
+        """
+        def set_label(longest_streak):
+            self.longest_streak_label["text"] = f"Overall longest streak is {longest_streak}."
+        self.storage_executor.submit(Habit.get_longest_streak_of_all, callback=set_label,
+                                     error_callback=self.show_storage_error)
+
+    def add_habit(self, habit):
+        """
+        Add the saved habit to all habits and its row to the center frame.
+        If the center frame shows a selection of the habits, it is reloaded with all habits.
+
+        Args:
+            habit (Habit): The saved habit.
+        """
+        self.all_habits.append(habit)
+        if self.center_frame.habit_list is self.all_habits:
+            self.center_frame.add_habit(habit)
+        else:
+            self.reload_center_frame(self.all_habits)
+        self.update_longest_streak()
+
+    def update_habit(self, habit):
+        """
+        Replace the saved habit in all habits and update its row in the center frame
+        and the overall longest streak, without reloading the other habits.
+
+        Args:
+            habit (Habit): The saved habit.
+        """
+        self.all_habits.update(habit)
+        self.center_frame.update_habit(habit)
+        self.update_longest_streak()
+
+    def remove_habit(self, habit_id):
+        """
+        Remove the deleted habit from all habits and its row from the center frame.
+
+        Args:
+            habit_id (int): The id of the deleted habit.
+        """
+        self.all_habits.remove(habit_id)
+        self.center_frame.remove_habit(habit_id)
+        self.update_longest_streak()
+
+    def reload_center_frame(self, habit_list):
+        """
+        Reload the center frame with updated habit data.
+        The center frame is refreshed in place and keeps the selected habits.
+        
+        Args:
+            habit_list (list): The updated list of habits.
+        """
+        self.center_frame.pack_all_habits(habit_list=habit_list)
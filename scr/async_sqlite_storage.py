@@ -0,0 +1,40 @@
+"""
+NAME
+    async_sqlite_storage
+
+DESCRIPTION
+    Asynchronous strategy to save and load habit data with sqlite3 for asyncio services.
+
+CLASSES
+    AsyncStorageStrategy
+        AsyncStorageAdapter
+            AsyncSQLiteStorage
+"""
+from scr.async_storage_strategy import AsyncStorageAdapter
+from scr.sqlite_storage import SQLiteStorage
+
+
+class AsyncSQLiteStorage(AsyncStorageAdapter):
+    """
+    Runs an SQLiteStorage in a bounded thread pool for the reads and a single writer thread.
+    Every thread uses its own connection of the SQLiteStorage, so the reads run
+    concurrently in WAL mode while the writes are serialized.
+
+    Args:
+        data_base (str): The name of the used database. Default is SQLiteStorage.DB_NAME.
+        pragmas (dict): Pragmas which override SQLiteStorage.DEFAULT_PRAGMAS. Default is None.
+        max_workers (int): The number of threads for the reads.
+                           Default is AsyncStorageAdapter.MAX_WORKERS.
+    """
+    def __init__(self, data_base=SQLiteStorage.DB_NAME, pragmas=None,
+                 max_workers=AsyncStorageAdapter.MAX_WORKERS):
+        super().__init__(storage=SQLiteStorage(data_base=data_base, pragmas=pragmas),
+                         max_workers=max_workers)
+
+    async def close(self):
+        """
+        Waits for the running calls, stops the threads and closes the connections
+        of the SQLiteStorage.
+        """
+        await super().close()
+        self.storage.close()
@@ -0,0 +1,249 @@
+"""
+NAME
+    async_storage_strategy
+
+DESCRIPTION
+    Contains the abstract class AsyncStorageStrategy, the asyncio counterpart of
+    StorageStrategy, and AsyncStorageAdapter, which runs a synchronous storage strategy
+    in threads without blocking the event loop.
+
+CLASSES
+    ABC
+        AsyncStorageStrategy
+            AsyncStorageAdapter
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class AsyncStorageStrategy(ABC):
+    """abstract class to set the coroutines for the asynchronous storage strategy"""
+    @abstractmethod
+    async def save(self, habit):
+        """save the habit and return the saved habit"""
+
+    @abstractmethod
+    async def load(self, habit_id):
+        """load the habit"""
+
+    @abstractmethod
+    async def delete(self, habit_id):
+        """delete the habit"""
+
+    @abstractmethod
+    async def load_all(self):
+        """load the data of all habits ordered by habit id"""
+
+    async def load_many(self, habit_ids):
+        """
+        Load the data of the habits with the habit ids ordered by habit id.
+        Ids which are not stored are skipped.
+
+        Strategies which can fetch several habits at once should override this method.
+        """
+        habits = [await self.load(habit_id) for habit_id in sorted(set(habit_ids))]
+        return [data for data in habits if data]
+
+    async def iter_all(self, chunk_size=500):
+        """
+        Yields the data of all habits ordered by habit id in lists of chunk_size habits.
+
+        Strategies which can read the habits in chunks should override this method.
+        """
+        habits = await self.load_all()
+        for start in range(0, len(habits), chunk_size):
+            yield habits[start:start + chunk_size]
+
+
+class AsyncStorageAdapter(AsyncStorageStrategy):
+    """
+    Runs the calls of a synchronous storage strategy in threads.
+
+    The reads run in a bounded thread pool, so at most max_workers calls use the storage
+    at once. The writes run one after another in a single writer thread, so concurrent
+    saves and deletes do not compete for the write lock of the storage.
+
+    Args:
+        storage (StorageStrategy): The synchronous storage strategy.
+        max_workers (int): The number of threads for the reads. Default is MAX_WORKERS.
+
+    Attributes:
+        MAX_WORKERS = 4: The default number of threads for the reads.
+        storage (StorageStrategy): The synchronous storage strategy.
+    """
+    MAX_WORKERS = 4
+
+    def __init__(self, storage, max_workers=MAX_WORKERS):
+        self.storage = storage
+        self.__readers = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="storage-reader")
+        self.__writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-writer")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def run_read(self, function, *args, **kwargs):
+        """
+        Runs the call in the thread pool of the reads.
+
+        Args:
+            function (function): The call of the storage.
+
+        Returns:
+            object: The result of the call.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__readers, partial(function, *args, **kwargs))
+
+    async def run_write(self, function, *args, **kwargs):
+        """
+        Runs the call in the writer thread after the writes submitted before.
+
+        Args:
+            function (function): The call of the storage.
+
+        Returns:
+            object: The result of the call.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__writer, partial(function, *args, **kwargs))
+
+    async def save(self, habit):
+        """
+        Saves the habit in the writer thread.
+
+        Args:
+            habit (Habit): The habit which should be saved.
+
+        Returns:
+            Habit: The saved habit.
+        """
+        return await self.run_write(self.storage.save, habit)
+
+    async def load(self, habit_id):
+        """
+        Loads the data of the habit.
+
+        Args:
+            habit_id (int): The id of the habit.
+
+        Returns:
+            dict: The habit data or None if the habit is not stored.
+        """
+        return await self.run_read(self.storage.load, habit_id)
+
+    async def load_many(self, habit_ids):
+        """
+        Loads the data of the habits with the habit ids with one call of the storage.
+
+        Args:
+            habit_ids (list): The ids of the habits.
+
+        Returns:
+            [dict]: The habit data ordered by habit id.
+        """
+        return await self.run_read(self.storage.load_many, list(habit_ids))
+
+    async def load_all(self):
+        """
+        Loads the data of all habits.
+
+        Returns:
+            [dict]: The habit data ordered by habit id.
+        """
+        return await self.run_read(self.storage.load_all)
+
+    async def delete(self, habit_id):
+        """
+        Deletes the habit in the writer thread.
+
+        Args:
+            habit_id (int): The id of the habit.
+        """
+        return await self.run_write(self.storage.delete, habit_id)
+
+    async def iter_all(self, chunk_size=500):
+        """
+        Loads the data of all habits chunk by chunk with load_chunk of the storage.
+        Every chunk is an independent call, so no cursor is kept between the chunks.
+
+        Args:
+            chunk_size (int): The number of habits in a chunk. Default is 500.
+
+        Yields:
+            [dict]: The habit data of the next chunk ordered by habit id.
+        """
+        chunk = await self.run_read(self.storage.load_chunk, chunk_size=chunk_size)
+        while chunk:
+            yield chunk
+            chunk = await self.run_read(self.storage.load_chunk,
+                                        after_id=chunk[-1]["habit_id"], chunk_size=chunk_size)
+
+    async def query(self, with_completions=True, **filters):
+        """
+        Loads the habits which match the filters with one call of the storage.
+
+        Args:
+            with_completions (bool): Loads the completed dates of the habits. Default is True.
+            **filters: The filters, the order and the paging of HabitQuery.
+
+        Returns:
+            [dict]: The habit data of the matching habits.
+        """
+        return await self.run_read(self.storage.query, with_completions=with_completions,
+                                   **filters)
+
+    async def get_completions_between(self, habit_id, start, end):
+        """
+        Loads the completed dates of the habit in the date range.
+
+        Args:
+            habit_id (int): The id of the habit.
+            start (datetime.date): The first date of the range.
+            end (datetime.date): The last date of the range.
+
+        Returns:
+            [datetime.date]: The sorted completed dates.
+        """
+        return await self.run_read(self.storage.get_completions_between, habit_id, start, end)
+
+    async def count_habits(self):
+        """
+        Returns the number of stored habits.
+
+        Returns:
+            int: The number of habits.
+        """
+        return await self.run_read(self.storage.count_habits)
+
+    async def get_longest_streak_of_all(self):
+        """
+        Returns the longest streak of all habits.
+
+        Returns:
+            int: The value of the longest streak of all habits.
+        """
+        return await self.run_read(self.storage.get_longest_streak_of_all)
+
+    async def load_streaks(self):
+        """
+        Returns the current and the longest streak of all habits.
+
+        Returns:
+            {int: (int, int)}: The current and the longest streak by habit id.
+        """
+        return await self.run_read(self.storage.load_streaks)
+
+    async def close(self):
+        """
+        Waits for the running calls and stops the threads.
+        The storage stays open, because it can be shared with synchronous code.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.__writer.shutdown)
+        await loop.run_in_executor(None, self.__readers.shutdown)
@@ -0,0 +1,220 @@
+"""
+NAME
+    batch_analytics
+
+DESCRIPTION
+    Vectorized analytics of many habits at once with NumPy.
+
+    The completed periods of all habits are concatenated to one ragged array of period
+    indexes with a parallel array of habit rows. The streaks are the runs of consecutive
+    period indexes of the same habit, so all statistics are computed with a few array
+    operations instead of a Python loop per period. The functions in the analytics module
+    are the reference implementations of these statistics.
+
+    NumPy is an optional dependency, install it with the extra "batch".
+
+FUNCTIONS
+    get_habit_periods
+    compute_batch_statistics
+    get_batch_statistics
+    get_statistics_of_periods
+    get_longest_streak_of_all
+"""
+from collections import namedtuple
+from datetime import date
+from scr.habit_collection import HabitCollection
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#the statistics of the habits, every field is an array in the order of the habit list
+BatchStatistics = namedtuple("BatchStatistics",
+                             ["current_streak", "longest_streak",
+                              "completed_periods", "completion_rate"])
+
+
+def require_numpy():
+    """
+    Raises an ImportError if NumPy is not installed.
+
+    Raises:
+        ImportError: NumPy is required for the batch analytics.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for the batch analytics. "
+                          "Install the habit tracking app with the extra batch.")
+
+
+def get_habit_periods(habit, today=None):
+    """
+    Returns the index of the current period and the indexes of the completed periods
+    between the creation period and the current period of the habit.
+
+    Args:
+        habit (Habit): The habit.
+        today (datetime.date): The day of the current period. Default is datetime.date.today().
+
+    Returns:
+        (int, numpy.ndarray): The current period and the sorted completed period indexes.
+
+    Raises:
+        TypeError: Habit not of type Habit.
+        TypeError: Creation time not of type datetime.datetime.
+        TypeError: Completed dates is not iterable.
+    """
+    require_numpy()
+    #check if habit keywords are callable.
+    try:
+        creation_time=habit["creation_time"]
+        frequency=habit["frequency"]
+        completed_dates=habit["completed_dates"]
+    except (KeyError,TypeError) as exc:
+        raise TypeError("Habit not of type Habit.") from exc
+
+    try:
+        #change creation_time of habit to date.
+        creation_day = creation_time.date()
+    except AttributeError as exc:
+        raise TypeError("Creation time not of type datetime.datetime.") from exc
+
+    if today is None:
+        today = date.today()
+    current_period = (today - creation_day).days // frequency
+
+    try:
+        #the bit i of the bitset is set if the period i is completed
+        bits = np.frombuffer(completed_dates.get_bitset(), dtype=np.uint8)
+        period_indexes = np.flatnonzero(np.unpackbits(bits, bitorder="little"))
+    except AttributeError:
+        try:
+            offsets = np.fromiter((completed.toordinal() for completed in completed_dates),
+                                  dtype=np.int64) - creation_day.toordinal()
+        except (AttributeError,TypeError) as exc:
+            raise TypeError("Completed dates is not iterable.") from exc
+        #only the first days of the periods are completed periods
+        offsets = offsets[(offsets >= 0) & (offsets % frequency == 0)]
+        period_indexes = np.unique(offsets // frequency)
+
+    return current_period, period_indexes[period_indexes <= current_period]
+
+
+def compute_batch_statistics(period_indexes, habit_rows, current_periods):
+    """
+    Computes the statistics of all habits from the ragged array of completed periods.
+
+    Args:
+        period_indexes (numpy.ndarray): The completed period indexes of all habits, sorted
+                                        by habit row and period index without duplicates.
+        habit_rows (numpy.ndarray): The habit row of every period index.
+        current_periods (numpy.ndarray): The current period of every habit.
+
+    Returns:
+        BatchStatistics: The statistics of the habits.
+    """
+    require_numpy()
+    period_indexes = np.asarray(period_indexes, dtype=np.int64)
+    habit_rows = np.asarray(habit_rows, dtype=np.int64)
+    current_periods = np.asarray(current_periods, dtype=np.int64)
+    habit_count = len(current_periods)
+    size = len(period_indexes)
+
+    completed_periods = np.bincount(habit_rows, minlength=habit_count)
+    current_streak = np.zeros(habit_count, dtype=np.int64)
+    longest_streak = np.zeros(habit_count, dtype=np.int64)
+    if size:
+        #a run starts where the previous period of the same habit is not completed
+        starts = np.ones(size, dtype=bool)
+        starts[1:] = (np.diff(period_indexes) != 1) | (np.diff(habit_rows) != 0)
+        run_starts = np.flatnonzero(starts)
+        run_ends = np.append(run_starts[1:], size) - 1
+        run_lengths = run_ends - run_starts + 1
+        run_rows = habit_rows[run_starts]
+        np.maximum.at(longest_streak, run_rows, run_lengths)
+
+        #the last run of a habit is the current streak if it ends in the current period
+        last_runs = np.flatnonzero(np.append(run_rows[1:] != run_rows[:-1], True))
+        rows = run_rows[last_runs]
+        is_current = period_indexes[run_ends[last_runs]] == current_periods[rows]
+        current_streak[rows[is_current]] = run_lengths[last_runs][is_current]
+
+    period_count = np.maximum(current_periods + 1, 0)
+    completion_rate = np.divide(completed_periods, period_count,
+                                out=np.zeros(habit_count), where=period_count > 0)
+    return BatchStatistics(current_streak, longest_streak, completed_periods, completion_rate)
+
+
+def get_batch_statistics(habit_list:list, today=None)->BatchStatistics:
+    """
+    Get the current streak, the longest streak, the completed periods and the completion
+    rate of all habits between their creation date and today.
+
+    Args:
+        habit_list (list): The habits from which the statistics should be calculated.
+        today (datetime.date): The day of the current period. Default is datetime.date.today().
+
+    Returns:
+        BatchStatistics: The statistics in the order of the habit list.
+
+    Raises:
+        TypeError: Habit list is not a list.
+        TypeError: Habit not of type Habit.
+        TypeError: Creation time not of type datetime.datetime.
+        TypeError: Completed dates is not iterable.
+    """
+    if not isinstance(habit_list,(list,HabitCollection)):
+        raise TypeError("Habit list is not a list.")
+    if today is None:
+        today = date.today()
+    habit_periods = [get_habit_periods(habit=habit, today=today) for habit in habit_list]
+    return get_statistics_of_periods(habit_periods)
+
+
+def get_statistics_of_periods(habit_periods):
+    """
+    Concatenates the periods of the habits and computes their statistics.
+
+    Args:
+        habit_periods (list): The current period and the completed periods of every habit.
+
+    Returns:
+        BatchStatistics: The statistics in the order of the habit periods.
+    """
+    require_numpy()
+    current_periods = np.array([current for current, _ in habit_periods], dtype=np.int64)
+    lengths = [len(indexes) for _, indexes in habit_periods]
+    if habit_periods:
+        period_indexes = np.concatenate([indexes for _, indexes in habit_periods])
+    else:
+        period_indexes = np.zeros(0, dtype=np.int64)
+    habit_rows = np.repeat(np.arange(len(habit_periods)), lengths)
+    return compute_batch_statistics(period_indexes=period_indexes, habit_rows=habit_rows,
+                                    current_periods=current_periods)
+
+
+def get_longest_streak_of_all(habit_list:list, today=None)->int:
+    """
+    Get the longest streak of all habits. Habits which are not of type Habit are skipped.
+
+    Args:
+        habit_list (list): The habits from which the longest series should be calculated.
+        today (datetime.date): The day of the current period. Default is datetime.date.today().
+
+    Returns:
+        int: The value of the longest streak of all habits.
+
+    Raises:
+        TypeError: Habit list is not a list.
+    """
+    if not isinstance(habit_list,(list,HabitCollection)):
+        raise TypeError("Habit list is not a list.")
+    if today is None:
+        today = date.today()
+    habit_periods = []
+    for habit in habit_list:
+        try:
+            habit_periods.append(get_habit_periods(habit=habit, today=today))
+        except TypeError:
+            continue
+    longest_streak = get_statistics_of_periods(habit_periods).longest_streak
+    return int(longest_streak.max()) if len(longest_streak) else 0
@@ -103,17 +103,13 @@ class BottomFrame(ttk.Frame):
         Else it creates a new date picker window.
 
         Raises:
-            AttributeError: Selected habit id does not exist or has no Attribute get().
+            AttributeError: Center frame does not exist or has no selected habits.
         """
         try:
-            #saves the values of the selected_habit_id to a list.
-            #x.get() is False if x not selected.
-            values = list(map(lambda x: x.get(), self.master.center_frame.selected_habit_id))
+            #get the ids of the selected habits.
+            values = self.master.center_frame.get_selected_ids()
         except AttributeError as exc:
-            raise AttributeError("""Selected habit id does not exist
-                                 or has no Attribute get().""") from exc
-        #shortens values only to the selected values.
-        values = [v for v in values if v]
+            raise AttributeError("Center frame does not exist or has no selected habits.") from exc
 
         #shows datepicker only if one habit is selected
         if len(values) == 1:
@@ -144,17 +140,13 @@ class BottomFrame(ttk.Frame):
         or the description of an existing habit.
 
         Raises:
-            AttributeError: Selected habit id does not exist or has no Attribute get().
+            AttributeError: Center frame does not exist or has no selected habits.
         """
         try:
-            #saves the values of the selected_habit_id to a list.
-            #x.get() is False if x not selected.
-            values = list(map(lambda x: x.get(), self.master.center_frame.selected_habit_id))
+            #get the ids of the selected habits.
+            values = self.master.center_frame.get_selected_ids()
         except AttributeError as exc:
-            raise AttributeError("""Selected habit id does not exist
-                                 or has no Attribute get().""") from exc
-        #shortens values only to the selected values.
-        values = [v for v in values if v]
+            raise AttributeError("Center frame does not exist or has no selected habits.") from exc
         #shows entry window only if one habit is selected
         if len(values) == 1:
             try:
@@ -173,25 +165,19 @@ class BottomFrame(ttk.Frame):
 
         If no habit is or more then one habit are selected, it shows an input error message.
         Else it shows a ask-ok-cancel message. If this message returns okay,
-        the selected habit is deleted from the database and the center frame
-        will be reloaded.
+        the selected habit is deleted from the database by the storage executor
+        and its row is removed from the center frame.
 
         Raises:
-            AttributeError: Selected habit id does not exist or has no Attribute get().
-            AttributeError: No attribute analytics in master.
-            AttributeError: No attribute reload center frame in master.
+            AttributeError: Center frame does not exist or has no selected habits.
+            AttributeError: No attribute storage executor in master.
         """
 
         try:
-            #saves the values of the selected_habit_id to a list.
-            #x.get() is False if x not selected.
-            values = list(map(lambda x: x.get(), self.master.center_frame.selected_habit_id))
+            #get the ids of the selected habits.
+            values = self.master.center_frame.get_selected_ids()
         except AttributeError as exc:
-            raise AttributeError("""Selected habit id does not exist
-                                 or has no Attribute get().""") from exc
-
-        #shortens values only to the selected values.
-        values = [v for v in values if v]
+            raise AttributeError("Center frame does not exist or has no selected habits.") from exc
         #shows ok/cancle message only if one habit is selected
         if len(values) == 1:
             message = mb.askokcancel(title="Delete",
@@ -199,18 +185,16 @@ class BottomFrame(ttk.Frame):
                                     {values[0]}?"
                                     )
             if message:
-                #if ok, the habit will be deleted
-                Habit.delete(habit_id=values[0])
-                try:
-                    #reload all habits
-                    self.master.all_habits = Habit.load_all()
-                except AttributeError as exc:
-                    raise AttributeError("No attribute analytics in master.") from exc
+                habit_id = values[0]
                 try:
-                    #reload the center frame
-                    self.master.reload_center_frame(self.master.all_habits)
+                    #if ok, the habit will be deleted in the worker thread,
+                    #then it is removed from all habits and the center frame
+                    self.master.storage_executor.submit(
+                        Habit.delete, habit_id=habit_id,
+                        callback=lambda _: self.master.remove_habit(habit_id=habit_id),
+                        error_callback=self.master.show_storage_error)
                 except AttributeError as exc:
-                    raise AttributeError("No attribute reload center frame in master.") from exc
+                    raise AttributeError("No attribute storage executor in master.") from exc
         else:
             #shows input error message
             self.show_no_habit_selected()
@@ -223,19 +207,14 @@ class BottomFrame(ttk.Frame):
         Else it create a new pop-up-calendar to show the dates when the habit is completed.
 
         Raises:
-            AttributeError: Selected habit id does not exist or has no Attribute get().
+            AttributeError: Center frame does not exist or has no selected habits.
             ValueError: There is no Habit object insert to show calendar.
         """
         try:
-            #saves the values of the selected_habit_id to a list.
-            #x.get() is False if x not selected.
-            values = list(map(lambda x: x.get(), self.master.center_frame.selected_habit_id))
+            #get the ids of the selected habits.
+            values = self.master.center_frame.get_selected_ids()
         except AttributeError as exc:
-            raise AttributeError("""Selected habit id does not exist
-                                 or has no Attribute get().""") from exc
-
-        #shortens values only to the selected values.
-        values = [v for v in values if v]
+            raise AttributeError("Center frame does not exist or has no selected habits.") from exc
         #shows ok/cancle message only if one habit is selected
         if len(values) == 1:
             try:
@@ -245,11 +224,10 @@ class BottomFrame(ttk.Frame):
                 if habit is None:
                     raise ValueError("There is no habit insert to show calendar.")
 
-                completed_dates = habit["completed_dates"]
                 frequency = habit["frequency"]
                 creation_date = habit["creation_time"].date()
-                #creates a calendar pop up window
-                PopUpCalendar(main_window=self.master,completed_dates=completed_dates,
+                #creates a calendar pop up window, which loads the dates of the shown month
+                PopUpCalendar(main_window=self.master,habit_id=habit_id,
                             frequency=frequency, creation_date=creation_date)
             except AttributeError as exc:
                 raise AttributeError("""Selected habit id does not exist
@@ -285,15 +263,11 @@ class BottomFrame(ttk.Frame):
             elif frequency_name == self.master.SELECTABLE_FREQUENCIES[2]:
                 #get all selected frequencies
                 try:
-                    #saves the values of the selected_habit_id to a list.
-                    #x.get() is False if x not selected.
-                    values = list(map(lambda x: x.get(),
-                                      self.master.center_frame.selected_habit_id))
+                    #get the ids of the selected habits.
+                    values = self.master.center_frame.get_selected_ids()
                 except AttributeError as exc:
-                    raise AttributeError("""Selected habit id does not exist
-                                        or has not Attribute get().""") from exc
-                #shortens values only to the selected values.
-                values = [v for v in values if v]
+                    raise AttributeError("Center frame does not exist "\
+                                         "or has no selected habits.") from exc
                 try:
                     #get all current tracked habits in habit_list
                     habit_list = ana.get_all_current_tracked_habits(\
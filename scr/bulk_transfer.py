@@ -0,0 +1,423 @@
+"""
+NAME
+    bulk_transfer
+
+DESCRIPTION
+    Streams habits and completions between an SQLiteStorage and CSV or JSON Lines files.
+
+    The export iterates one query with fetchmany, so the rows are written while SQLite
+    reads them and the memory does not grow with the history. The import inserts the
+    records in chunks with executemany inside one transaction, so either the whole file
+    is imported or nothing. The unique index of the tracking table can be dropped during
+    a large import and rebuilt once at the end. The habit_stats of the touched habits are
+    rebuilt before the transaction is committed.
+
+    Every transfer returns a TransferReport with the number of rows and the throughput.
+
+    Records:
+        habits: habit_id, name, description, frequency, creation_time (iso-format)
+        completions: habit_id, completed_date (iso-format)
+
+FUNCTIONS
+    export_habits
+    export_completions
+    import_habits
+    import_completions
+"""
+import csv
+import json
+import sqlite3
+import time
+from collections import namedtuple
+from contextlib import closing
+from datetime import date, datetime
+from itertools import islice
+from scr import habit_stats
+
+HABIT_COLUMNS = ("habit_id", "name", "description", "frequency", "creation_time")
+COMPLETION_COLUMNS = ("habit_id", "completed_date")
+FORMATS = ("csv", "jsonl")
+CHUNK_SIZE = 10000
+
+#the number of transferred rows, the duration in seconds and the rows per second
+TransferReport = namedtuple("TransferReport", ["rows", "seconds", "rows_per_second"])
+
+
+def get_report(rows, start):
+    """
+    Returns the report of a transfer.
+
+    Args:
+        rows (int): The number of transferred rows.
+        start (float): The time.perf_counter() at the start of the transfer.
+
+    Returns:
+        TransferReport: The report.
+    """
+    seconds = time.perf_counter() - start
+    return TransferReport(rows, seconds, rows / seconds if seconds > 0 else float(rows))
+
+
+def get_format(file_name):
+    """
+    Returns the format of the file from its extension.
+
+    Args:
+        file_name (str): The name of the file.
+
+    Returns:
+        str: "jsonl" for .jsonl and .ndjson files, else "csv".
+    """
+    return "jsonl" if file_name.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_records(input_file, input_format, columns):
+    """
+    Reads the records of the file one by one as tuples in the order of the columns.
+
+    Args:
+        input_file (file): The text file.
+        input_format (str): "csv" with a header row or "jsonl" with one object per line.
+        columns (tuple): The names of the columns. Missing columns are None.
+
+    Yields:
+        tuple: The values of the next record.
+
+    Raises:
+        ValueError: The format is not supported or a line is no JSON object.
+    """
+    if input_format == "csv":
+        reader = csv.reader(input_file)
+        header = next(reader, [])
+        indexes = [header.index(column) if column in header else None for column in columns]
+        for row in reader:
+            if row:
+                yield tuple(None if index is None or index >= len(row) else row[index]
+                            for index in indexes)
+    elif input_format == "jsonl":
+        for line in input_file:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                    yield tuple(record.get(column) for column in columns)
+                except (AttributeError, ValueError) as exc:
+                    raise ValueError(f"Invalid JSON record {line.strip()!r}.") from exc
+    else:
+        raise ValueError(f"Format must be one of {', '.join(FORMATS)}.")
+
+
+def write_records(output, rows, columns, output_format):
+    """
+    Writes the rows chunk by chunk.
+
+    Args:
+        output (file): The text file.
+        rows (iterable): The chunks of rows in the order of the columns.
+        columns (tuple): The names of the columns.
+        output_format (str): "csv" with a header row or "jsonl" with one object per line.
+
+    Returns:
+        int: The number of written rows.
+
+    Raises:
+        ValueError: The format is not supported.
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(FORMATS)}.")
+    count = 0
+    if output_format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(columns)
+    for chunk in rows:
+        if output_format == "csv":
+            writer.writerows(chunk)
+        else:
+            output.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in chunk)
+        count += len(chunk)
+    output.flush()
+    return count
+
+
+def get_chunks(iterable, chunk_size):
+    """
+    Splits the iterable in lists of chunk_size elements.
+
+    Args:
+        iterable (iterable): The elements.
+        chunk_size (int): The maximal number of elements in a chunk.
+
+    Yields:
+        list: The next chunk.
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, chunk_size))
+
+
+def fetch_chunks(cursor, chunk_size):
+    """
+    Fetches the rows of the executed query chunk by chunk.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the executed query.
+        chunk_size (int): The number of rows in a chunk.
+
+    Yields:
+        list: The next rows.
+    """
+    rows = cursor.fetchmany(chunk_size)
+    while rows:
+        yield rows
+        rows = cursor.fetchmany(chunk_size)
+
+
+def export_habits(storage, output, output_format="csv", chunk_size=CHUNK_SIZE):
+    """
+    Writes all habits ordered by habit id.
+
+    Args:
+        storage (SQLiteStorage): The storage.
+        output (file): The text file.
+        output_format (str): "csv" or "jsonl". Default is "csv".
+        chunk_size (int): The number of rows fetched at once. Default is CHUNK_SIZE.
+
+    Returns:
+        TransferReport: The number of exported habits and the throughput.
+    """
+    start = time.perf_counter()
+    with closing(storage.get_connection().cursor()) as cursor:
+        cursor.execute("""
+            SELECT id, name, description, frequency, creation_time FROM habit ORDER BY id
+        """)
+        rows = write_records(output, fetch_chunks(cursor, chunk_size), HABIT_COLUMNS,
+                             output_format)
+    return get_report(rows, start)
+
+
+def export_completions(storage, output, output_format="csv", chunk_size=CHUNK_SIZE):
+    """
+    Writes all completions ordered by habit id and date. The query reads the covering
+    index tracking_habit_date, so the rows are streamed without sorting.
+
+    Args:
+        storage (SQLiteStorage): The storage.
+        output (file): The text file.
+        output_format (str): "csv" or "jsonl". Default is "csv".
+        chunk_size (int): The number of rows fetched at once. Default is CHUNK_SIZE.
+
+    Returns:
+        TransferReport: The number of exported completions and the throughput.
+    """
+    start = time.perf_counter()
+    with closing(storage.get_connection().cursor()) as cursor:
+        cursor.execute("""
+            SELECT habit_id, completed_dates FROM tracking ORDER BY habit_id, completed_dates
+        """)
+        chunks = ([(habit_id, date.fromordinal(ordinal).isoformat())
+                   for habit_id, ordinal in rows] for rows in fetch_chunks(cursor, chunk_size))
+        rows = write_records(output, chunks, COMPLETION_COLUMNS, output_format)
+    return get_report(rows, start)
+
+
+def parse_habit(record):
+    """
+    Converts the habit record to a row of the habit table.
+
+    Args:
+        record (tuple): The values of HABIT_COLUMNS. An empty habit_id gets a new id.
+
+    Returns:
+        tuple: (id, name, description, frequency, creation_time)
+
+    Raises:
+        ValueError: The habit record is not valid.
+    """
+    habit_id, name, description, frequency, creation_time = record
+    try:
+        frequency = int(frequency)
+        if frequency < 1:
+            raise ValueError("Frequency must be a positiv integer.")
+        return (int(habit_id) if habit_id not in (None, "") else None,
+                name or "new habit",
+                description or "new description",
+                frequency,
+                datetime.fromisoformat(creation_time).isoformat())
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid habit record {record!r}.") from exc
+
+
+def parse_completion(record):
+    """
+    Converts the completion record to a row of the tracking table.
+
+    Args:
+        record (tuple): The values of COMPLETION_COLUMNS.
+
+    Returns:
+        tuple: (habit_id, ordinal of the completed date)
+
+    Raises:
+        ValueError: The completion record is not valid.
+    """
+    try:
+        return int(record[0]), date.fromisoformat(record[1]).toordinal()
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid completion record {record!r}.") from exc
+
+
+def normalize_completions(cursor, chunk, habits):
+    """
+    Checks that the completed dates of the chunk are between the creation day of their
+    habit and today and sets them to the start date of their period, like
+    Completion.mark_completed does. Completions of unknown habits are left to the foreign
+    key of the tracking table.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the import transaction.
+        chunk (list): The rows (habit_id, ordinal of the completed date).
+        habits (dict): The ordinals of the creation days and the frequencies of the habits
+                       by habit id. The habits of the chunk which are missing are added.
+
+    Returns:
+        list: The rows (habit_id, ordinal of the start date of the period).
+
+    Raises:
+        ValueError: A completed date is before the creation day of its habit or after today.
+    """
+    missing_ids = {row[0] for row in chunk}.difference(habits)
+    if missing_ids:
+        cursor.execute("""
+            SELECT id, creation_time, frequency FROM habit
+            WHERE id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(sorted(missing_ids)),))
+        habits.update((habit_id, (datetime.fromisoformat(creation_time).toordinal(), frequency))
+                      for habit_id, creation_time, frequency in cursor.fetchall())
+    today = date.today().toordinal()
+    rows = []
+    for habit_id, ordinal in chunk:
+        creation_day, frequency = habits.get(habit_id, (ordinal, 1))
+        if not creation_day <= ordinal <= today:
+            record = (habit_id, date.fromordinal(ordinal).isoformat())
+            raise ValueError(f"Invalid completion record {record!r}, the date is not between "
+                             "the creation day of the habit and today.")
+        rows.append((habit_id,
+                     creation_day + (ordinal - creation_day) // frequency * frequency))
+    return rows
+
+
+def create_tracking_index(cursor):
+    """
+    Creates the unique index of the tracking table after an import with deferred index.
+    Only if the index fails, the duplicated rows, which the index would have skipped,
+    are removed first.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the import transaction.
+
+    Returns:
+        int: The number of removed duplicates.
+    """
+    query = """
+        CREATE UNIQUE INDEX tracking_habit_date ON tracking (habit_id, completed_dates)
+    """
+    try:
+        cursor.execute(query)
+        return 0
+    except sqlite3.IntegrityError:
+        cursor.execute("""
+            DELETE FROM tracking WHERE ID NOT IN
+            (SELECT MIN(ID) FROM tracking GROUP BY habit_id, completed_dates)
+        """)
+        duplicates = cursor.rowcount
+        cursor.execute(query)
+        return duplicates
+
+
+def import_habits(storage, input_file, input_format="csv", chunk_size=CHUNK_SIZE):
+    """
+    Inserts the habits of the file in one transaction. The habits keep their habit ids,
+    so the completions of an export can be imported afterwards.
+
+    Args:
+        storage (SQLiteStorage): The storage.
+        input_file (file): The text file.
+        input_format (str): "csv" or "jsonl". Default is "csv".
+        chunk_size (int): The number of rows inserted with one executemany.
+                          Default is CHUNK_SIZE.
+
+    Returns:
+        TransferReport: The number of imported habits and the throughput.
+
+    Raises:
+        ValueError: A record is not valid or its habit id already exists.
+    """
+    start = time.perf_counter()
+    rows = 0
+    records = map(parse_habit, read_records(input_file, input_format, HABIT_COLUMNS))
+    try:
+        with storage.transaction() as cursor:
+            for chunk in get_chunks(records, chunk_size):
+                cursor.executemany("""
+                    INSERT INTO habit (id, name, description, frequency, creation_time)
+                    VALUES (?, ?, ?, ?, ?)
+                """, chunk)
+                rows += len(chunk)
+            cursor.execute("""
+                SELECT id FROM habit WHERE id NOT IN (SELECT habit_id FROM habit_stats)
+            """)
+            habit_stats.rebuild_habit_stats(cursor=cursor,
+                                            habit_ids=[row[0] for row in cursor.fetchall()])
+    except sqlite3.IntegrityError as exc:
+        raise ValueError(f"The habits can not be imported: {exc}.") from exc
+    return get_report(rows, start)
+
+
+def import_completions(storage, input_file, input_format="csv", chunk_size=CHUNK_SIZE,
+                       defer_indexes=False):
+    """
+    Inserts the completions of the file in one transaction. The completed dates are set to
+    the start date of their period, completions which are already stored are skipped and
+    the stats of the touched habits are rebuilt at the end.
+
+    Args:
+        storage (SQLiteStorage): The storage.
+        input_file (file): The text file.
+        input_format (str): "csv" or "jsonl". Default is "csv".
+        chunk_size (int): The number of rows inserted with one executemany.
+                          Default is CHUNK_SIZE.
+        defer_indexes (bool): Drops the unique index of the tracking table during the
+                              import and rebuilds it once at the end, which is faster
+                              for files much larger than the stored history.
+                              Default is False.
+
+    Returns:
+        TransferReport: The number of inserted completions and the throughput.
+
+    Raises:
+        ValueError: A record is not valid, its date is out of the range of its habit
+                    or its habit does not exist.
+    """
+    start = time.perf_counter()
+    rows = 0
+    habit_ids = set()
+    habits = {}
+    records = map(parse_completion, read_records(input_file, input_format, COMPLETION_COLUMNS))
+    try:
+        with storage.transaction() as cursor:
+            if defer_indexes:
+                cursor.execute("DROP INDEX tracking_habit_date")
+            for chunk in get_chunks(records, chunk_size):
+                chunk = normalize_completions(cursor, chunk, habits)
+                cursor.executemany("""
+                    INSERT OR IGNORE INTO tracking (habit_id, completed_dates) VALUES (?, ?)
+                """, chunk)
+                rows += cursor.rowcount
+                habit_ids.update(row[0] for row in chunk)
+            if defer_indexes:
+                rows -= create_tracking_index(cursor)
+            habit_stats.rebuild_habit_stats(cursor=cursor, habit_ids=habit_ids)
+    except sqlite3.IntegrityError as exc:
+        raise ValueError(f"The completions can not be imported: {exc}.") from exc
+    return get_report(rows, start)
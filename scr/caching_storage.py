@@ -0,0 +1,406 @@
+"""
+NAME
+    caching_storage
+
+DESCRIPTION
+    Read-through cache in front of any storage strategy. The decoded habit data of the
+    recently loaded habits is kept in a bounded LRU, so a repeated load of a habit is a
+    dictionary lookup instead of a database query. Saves and deletes are written through
+    to the storage and invalidate the cached data of the habit.
+
+CLASSES
+    StorageStrategy
+        CachingStorage
+"""
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from scr.storage_strategy import StorageStrategy
+
+#the hits, the misses and the evictions since the start, the number of cached habits
+#and their estimated size in bytes
+CacheStats = namedtuple("CacheStats", ["hits", "misses", "evictions", "habits", "size"])
+
+
+class CachingStorage(StorageStrategy):
+    """
+    Caches the habit data loaded from the storage in an LRU, which is bounded by the
+    number of habits and by the estimated memory of their completed dates.
+
+    The cache only sees the changes made through it. If another process or another
+    storage writes the database, the cache has to be cleared with clear().
+
+    Args:
+        storage (StorageStrategy): The storage behind the cache.
+        max_habits (int): The maximal number of cached habits. Default is MAX_HABITS.
+        max_size (int): The maximal estimated size of the cached data in bytes.
+                        Default is MAX_SIZE.
+
+    Attributes:
+        MAX_HABITS = 1024: The default maximal number of cached habits.
+        MAX_SIZE = 16 MiB: The default memory budget.
+        HABIT_SIZE = 1024: The estimated bytes of the data of a habit without dates.
+        DATE_SIZE = 40: The estimated bytes of a completed date, the date object
+                        and its reference in the tuple.
+        storage (StorageStrategy): The storage behind the cache.
+    """
+    MAX_HABITS = 1024
+    MAX_SIZE = 16 * 1024 * 1024
+    HABIT_SIZE = 1024
+    DATE_SIZE = 40
+
+    def __init__(self, storage, max_habits=MAX_HABITS, max_size=MAX_SIZE):
+        self.storage = storage
+        self.__max_habits = max_habits
+        self.__max_size = max_size
+        #habit_id: (habit data with a tuple of completed dates, estimated size)
+        self.__cache = OrderedDict()
+        self.__size = 0
+        self.__hits = self.__misses = self.__evictions = 0
+        #incremented by every invalidation, so a load which started before a write
+        #does not cache the old data
+        self.__generation = 0
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            CacheStats: (hits, misses, evictions, habits, size)
+        """
+        with self.__lock:
+            return CacheStats(self.__hits, self.__misses, self.__evictions,
+                              len(self.__cache), self.__size)
+
+    def clear(self):
+        """
+        Removes all habits from the cache. The counters are kept.
+        """
+        with self.__lock:
+            self.__cache.clear()
+            self.__size = 0
+            self.__generation += 1
+
+    def invalidate(self, habit_id):
+        """
+        Removes the habit from the cache.
+
+        Args:
+            habit_id (int): The id of the habit.
+        """
+        with self.__lock:
+            entry = self.__cache.pop(habit_id, None)
+            if entry is not None:
+                self.__size -= entry[1]
+            self.__generation += 1
+
+    def get_cached(self, habit_id):
+        """
+        Returns a copy of the cached data of the habit and counts the hit or the miss.
+
+        Args:
+            habit_id (int): The id of the habit.
+
+        Returns:
+            dict: The habit data or None if the habit is not cached.
+        """
+        with self.__lock:
+            entry = self.__cache.get(habit_id)
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__cache.move_to_end(habit_id)
+            self.__hits += 1
+        return dict(entry[0], completed_dates=list(entry[0]["completed_dates"]))
+
+    def put(self, habit_data, generation):
+        """
+        Caches the loaded habit data and evicts the least recently used habits
+        until the cache fits in the budget.
+
+        Args:
+            habit_data (list): The habit data loaded from the storage.
+            generation (int): The generation of the cache before the data was loaded.
+                              The data is not cached if it was invalidated meanwhile.
+        """
+        with self.__lock:
+            if generation != self.__generation:
+                return
+            for data in habit_data:
+                size = CachingStorage.HABIT_SIZE\
+                    + CachingStorage.DATE_SIZE * len(data["completed_dates"])
+                if size > self.__max_size:
+                    continue
+                entry = self.__cache.pop(data["habit_id"], None)
+                if entry is not None:
+                    self.__size -= entry[1]
+                self.__cache[data["habit_id"]] = (dict(data, completed_dates=tuple(
+                    data["completed_dates"])), size)
+                self.__size += size
+            while len(self.__cache) > self.__max_habits or self.__size > self.__max_size:
+                _, (_, size) = self.__cache.popitem(last=False)
+                self.__size -= size
+                self.__evictions += 1
+
+    def get_generation(self):
+        """
+        Returns the generation of the cache, which changes with every invalidation.
+
+        Returns:
+            int: The generation.
+        """
+        with self.__lock:
+            return self.__generation
+
+    def save(self, habit):
+        """
+        Saves the habit in the storage and removes it from the cache.
+
+        Args:
+            habit (Habit): The habit which should be saved.
+
+        Returns:
+            Habit: The saved habit.
+        """
+        try:
+            return self.storage.save(habit)
+        finally:
+            #the habit is invalidated after failed saves, too
+            habit_id = habit["habit_id"] if hasattr(habit, "completion") else None
+            if habit_id is not None:
+                self.invalidate(habit_id)
+
+    def delete(self, habit_id):
+        """
+        Deletes the habit in the storage and removes it from the cache.
+
+        Args:
+            habit_id (int): The id of the habit.
+
+        Raises:
+            ValueError: ID is not in database.
+        """
+        try:
+            self.storage.delete(habit_id)
+        finally:
+            self.invalidate(habit_id)
+
+    def load(self, habit_id):
+        """
+        Loads the habit data from the cache or from the storage.
+
+        Args:
+            habit_id (int): The id of the habit.
+
+        Returns:
+            dict: The habit data or None if the habit is not stored.
+        """
+        data = self.get_cached(habit_id)
+        if data is not None:
+            return data
+        generation = self.get_generation()
+        data = self.storage.load(habit_id)
+        if data:
+            self.put([data], generation)
+        return data
+
+    def load_many(self, habit_ids):
+        """
+        Loads the cached habits from the cache and the others with one call of the storage.
+
+        Args:
+            habit_ids (list): The ids of the habits.
+
+        Returns:
+            [dict]: The habit data ordered by habit id. Ids which are not stored are skipped.
+        """
+        habit_data = {}
+        missing_ids = []
+        for habit_id in sorted(set(habit_ids)):
+            data = self.get_cached(habit_id)
+            if data is None:
+                missing_ids.append(habit_id)
+            else:
+                habit_data[habit_id] = data
+        if missing_ids:
+            generation = self.get_generation()
+            loaded = self.storage.load_many(missing_ids)
+            self.put(loaded, generation)
+            habit_data.update((data["habit_id"], data) for data in loaded)
+        return [habit_data[habit_id] for habit_id in sorted(habit_data)]
+
+    def load_all(self):
+        """
+        Loads the data of all habits from the storage and caches it.
+
+        Returns:
+            [dict]: The habit data ordered by habit id.
+        """
+        generation = self.get_generation()
+        habit_data = self.storage.load_all()
+        self.put(habit_data, generation)
+        return habit_data
+
+    def iter_all(self, chunk_size=500):
+        """
+        Loads the data of all habits chunk by chunk with load_chunk.
+
+        Args:
+            chunk_size (int): The number of habits in a chunk. Default is 500.
+
+        Yields:
+            [dict]: The habit data of the next chunk ordered by habit id.
+        """
+        chunk = self.load_chunk(chunk_size=chunk_size)
+        while chunk:
+            yield chunk
+            chunk = self.load_chunk(after_id=chunk[-1]["habit_id"], chunk_size=chunk_size)
+
+    def load_chunk(self, after_id=None, chunk_size=500):
+        """
+        Loads the next chunk of habits from the storage and caches it, so the habits
+        shown by the GUI are cached while they are loaded.
+
+        Args:
+            after_id (int): The habit id before the chunk. Default is None for the first chunk.
+            chunk_size (int): The maximal number of habits. Default is 500.
+
+        Returns:
+            [dict]: The habit data ordered by habit id, empty after the last habit.
+        """
+        generation = self.get_generation()
+        habit_data = self.storage.load_chunk(after_id=after_id, chunk_size=chunk_size)
+        self.put(habit_data, generation)
+        return habit_data
+
+    def query(self, with_completions=True, **filters):
+        """
+        Loads the habits which match the filters from the storage and caches them.
+
+        Args:
+            with_completions (bool): Loads the completed dates of the habits. Default is True.
+            **filters: The filters, the order and the paging of HabitQuery.
+
+        Returns:
+            [dict]: The habit data of the matching habits.
+        """
+        generation = self.get_generation()
+        habit_data = self.storage.query(with_completions=with_completions, **filters)
+        if with_completions:
+            self.put(habit_data, generation)
+        return habit_data
+
+    def get_completions_between(self, habit_id, start, end):
+        """
+        Returns the completed dates of the habit in the date range from the cached habit,
+        else from the storage without caching the whole habit.
+
+        Args:
+            habit_id (int): The id of the habit.
+            start (datetime.date): The first date of the range.
+            end (datetime.date): The last date of the range.
+
+        Returns:
+            [datetime.date]: The sorted completed dates.
+        """
+        data = self.get_cached(habit_id)
+        if data is None:
+            return self.storage.get_completions_between(habit_id, start, end)
+        return [completed for completed in data["completed_dates"] if start <= completed <= end]
+
+    def count_habits(self):
+        """
+        Returns the number of stored habits.
+
+        Returns:
+            int: The number of habits.
+        """
+        return self.storage.count_habits()
+
+    def get_longest_streak_of_all(self):
+        """
+        Returns the longest streak of all habits.
+
+        Returns:
+            int: The value of the longest streak of all habits.
+        """
+        return self.storage.get_longest_streak_of_all()
+
+    def load_streaks(self):
+        """
+        Returns the current and the longest streak of all habits.
+
+        Returns:
+            {int: (int, int)}: The current and the longest streak by habit id.
+        """
+        return self.storage.load_streaks()
+
+    def get_all_id(self):
+        """
+        Get the list of all habit_ids of the stored habits.
+
+        Returns:
+            [int]: List of the habit_ids
+        """
+        return self.storage.get_all_id()
+
+    def get_data_version(self):
+        """
+        Returns the data version of the storage for the change detection.
+
+        Returns:
+            int: The data version.
+        """
+        return self.storage.get_data_version()
+
+    def get_revision(self):
+        """
+        Returns the last given revision of the storage.
+
+        Returns:
+            int: The revision.
+        """
+        return self.storage.get_revision()
+
+    def load_changed(self, after_revision):
+        """
+        Loads the habits which are changed after the revision from the storage.
+        The cached data of the habits is invalidated by the ChangeDetector.
+
+        Args:
+            after_revision (int): The revision of the last known change.
+
+        Returns:
+            (int, [dict]): The current revision and the habit data of the changed habits.
+        """
+        return self.storage.load_changed(after_revision)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the block in a transaction of the storage. The cache is cleared if the
+        transaction is rolled back, because it can hold data of the rolled back changes.
+
+        Yields:
+            object: The value of the transaction of the storage.
+        """
+        try:
+            with self.storage.transaction() as value:
+                yield value
+        except BaseException:
+            self.clear()
+            raise
+
+    def close(self):
+        """
+        Clears the cache and closes the storage.
+        """
+        self.clear()
+        self.storage.close()
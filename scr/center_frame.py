@@ -7,6 +7,7 @@ CLASSES
         CenterFrame
 """
 import tkinter as tk
+from itertools import chain
 from tkinter import ttk
 from scr.habit import Habit
 
@@ -14,19 +15,26 @@ class CenterFrame(ttk.Frame):
     """
     The center frame of the habit tracking app.
 
+    The habits are shown in a ttk.Treeview, which draws only the visible rows, so there
+    are no widgets per habit. The rows are inserted in chunks while the app is idle and
+    the frame is refreshed in place, so the selection survives a reload of the habits.
+
     Args:
         master (tkinter.Tk): The main window of the habit tracking app.
         column_names (list): The Names of the columns of the table.
         habit_list (list): List of the habits witch will be shown in the table.
-    
+
     Attributes:
-        COLUMN_OFFSET (int): The numbers of columns that are empty on the left of the grid.
+        CHUNK_SIZE (int): The number of rows inserted at once.
+        CHECKED (str): The mark of a selected habit in the first column.
+        UNCHECKED (str): The mark of a not selected habit in the first column.
         column_names (list): The list of the column names. Default is None.
         habit_list (list): The list of the habits shown in the center frame. Default is None.
-        selected_habit_id (tkIntVar): The id of the selected radiobutton. Linked to the habit_id.
-        buttons (list): The list of the shown radiobuttons.
+        tree (ttk.Treeview): The table of the habits. The item id of a row is the habit id.
     """
-    COLUMN_OFFSET = 1
+    CHUNK_SIZE = 200
+    CHECKED = "☑"
+    UNCHECKED = "☐"
 
     def __init__(self, master, column_names=None, habit_list = None):
         super().__init__(master)
@@ -39,19 +47,37 @@ class CenterFrame(ttk.Frame):
         if self.habit_list is None:
             self.habit_list = []
 
-        #list of the selected habit ids.
-        self.selected_habit_id = []
+        #set of the selected habit ids.
+        self.__selected_ids = set()
+        #the habits which are not inserted in the table yet
+        self.__pending_habits = iter(())
+        self.__after_id = None
+
+        self.tree = ttk.Treeview(self, columns=tuple(range(len(self.column_names))),
+                                 show="headings", selectmode="none")
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        #a click on a row toggles the selection of the habit
+        self.tree.bind("<Button-1>", self.click_row)
 
         #set the titles of the columns
         self.set_column_names(column_names=self.column_names)
         #pack the data of the habits in the table of the center frame
         self.pack_all_habits(habit_list=self.habit_list)
-        self.columnconfigure(0, minsize=10)
+
+    def destroy(self):
+        """
+        Cancels the insertion of the pending rows before the frame is destroyed.
+        """
+        self.cancel_pending_rows()
+        return super().destroy()
 
     def set_column_names(self, column_names):
         """
         Set the column names of the data table.
-        
+
         Args:
             column_names (list): The name of the columns of the data table.
 
@@ -60,17 +86,17 @@ class CenterFrame(ttk.Frame):
         """
         try:
             for i,name in enumerate(column_names):
-                ttk.Label(self,text=name,anchor=tk.CENTER)\
-                    .grid(column=i+CenterFrame.COLUMN_OFFSET,
-                    row=0,ipadx=10, ipady=20
-                    )
+                self.tree.heading(i, text=name, anchor=tk.CENTER)
+                self.tree.column(i, anchor=tk.CENTER, width=60 if i == 0 else 140)
         except TypeError as exc:
             raise TypeError("Object is not iterable.") from exc
 
     def pack_all_habits(self, habit_list):
         """
-        Packing the data of all habits in the data table of the center frame.
-        
+        Replaces the rows of the data table with the data of the habits.
+        The selected habits of the habit list stay selected.
+        The first chunk of rows is inserted at once, the others when the app is idle.
+
         Args:
             habit_list (list): A list of the habit from which the data should be packed.
 
@@ -79,39 +105,155 @@ class CenterFrame(ttk.Frame):
             TypeError: Object not of type habit.
         """
         try:
-            for row,habit in enumerate(habit_list,start=1):
-                self.pack_habit(habit_data=Habit.habit_data(habit),row=row)
+            self.habit_list = habit_list
+            habit_ids = {habit["habit_id"] for habit in habit_list}
         except TypeError as exc:
             raise TypeError("Object is not iterable.") from exc
+        self.cancel_pending_rows()
+        self.__selected_ids &= habit_ids
+        self.tree.delete(*self.tree.get_children())
+        #the habit list can change while the rows are pending
+        self.__pending_habits = iter(list(habit_list))
+        self.pack_pending_rows()
+
+    def pack_pending_rows(self):
+        """
+        Inserts the next chunk of pending habits in the data table and schedules the next
+        chunk, if there are more habits.
+
+        Raises:
+            TypeError: Object not of type habit.
+        """
+        self.__after_id = None
+        count = 0
+        for habit in self.__pending_habits:
+            self.pack_habit(habit_data=Habit.habit_data(habit))
+            count += 1
+            if count == CenterFrame.CHUNK_SIZE:
+                self.__after_id = self.after_idle(self.pack_pending_rows)
+                break
 
-    def pack_habit(self, habit_data, row):
+    def cancel_pending_rows(self):
         """
-        Packing the data of one habit in the next empty row of the data table.
-        Adding a check box in the first column of the table.
-        
+        Cancels the insertion of the pending rows.
+        """
+        if self.__after_id is not None:
+            self.after_cancel(self.__after_id)
+            self.__after_id = None
+        self.__pending_habits = iter(())
+
+    def pack_habit(self, habit_data, row="end"):
+        """
+        Inserts the data of one habit as row in the data table.
+        The first column shows if the habit is selected.
+
         Args:
-            habit_data (dict): The data of the habit that is added to the table.
-            row (int): The row which the habit data is added to.
+            habit_data (tuple): The data of the habit that is added to the table.
+            row (int or str): The position of the row. Default is the end of the table.
 
         Raises:
-            TypeError: habit data no dictionary.
-            TypeError: row is no integer.
-        """
-        #if not isinstance(habit_data,list):
-        #    raise TypeError("habit is no Habit.")
-        if not isinstance(row,int):
-            raise TypeError("row is no integer.")
-        for i,data in enumerate(habit_data):
-            #insert checkbutton in the first column of the table
-            if i==0:
-                variable = tk.IntVar()
-                button = ttk.Checkbutton(self,onvalue=data,offvalue=None,
-                                         variable=variable)
-                self.selected_habit_id.append(variable)
-                button.grid(column=i+CenterFrame.COLUMN_OFFSET,
-                          row=row,ipadx=10)
-            else:
-                #insert the data in the other columns of the table
-                ttk.Label(self, text=str(data),anchor=tk.CENTER)\
-                    .grid(column=i+CenterFrame.COLUMN_OFFSET,
-                          row=row,ipadx=30,ipady=10)
+            TypeError: habit data is not a tuple.
+        """
+        if not isinstance(habit_data,tuple):
+            raise TypeError("habit data is not a tuple.")
+        habit_id = habit_data[0]
+        self.tree.insert("", row, iid=str(habit_id),
+                         values=(self.get_mark(habit_id),) + habit_data[1:])
+
+    def add_habit(self, habit):
+        """
+        Adds the row of the habit at the end of the data table.
+
+        Args:
+            habit (Habit): The habit.
+        """
+        self.add_habits(habits=[habit])
+
+    def add_habits(self, habits):
+        """
+        Adds the rows of the habits at the end of the data table in chunks.
+
+        Args:
+            habits (list): The habits.
+        """
+        self.__pending_habits = chain(self.__pending_habits, list(habits))
+        if self.__after_id is None:
+            self.pack_pending_rows()
+
+    def update_habit(self, habit):
+        """
+        Updates the row of the habit in the data table. A pending habit is replaced
+        before its row is inserted.
+
+        Args:
+            habit (Habit): The habit.
+
+        Returns:
+            bool: True if the habit has a row in the data table.
+        """
+        habit_id = habit["habit_id"]
+        if self.__after_id is not None:
+            self.__pending_habits = (habit if pending["habit_id"] == habit_id else pending
+                                     for pending in self.__pending_habits)
+        item = str(habit_id)
+        if not self.tree.exists(item):
+            return False
+        habit_data = Habit.habit_data(habit)
+        self.tree.item(item, values=(self.get_mark(habit_id),) + habit_data[1:])
+        return True
+
+    def remove_habit(self, habit_id):
+        """
+        Removes the row and the selection of the habit from the data table.
+
+        Args:
+            habit_id (int): The id of the habit.
+        """
+        self.__selected_ids.discard(habit_id)
+        if self.__after_id is not None:
+            self.__pending_habits = (pending for pending in self.__pending_habits
+                                     if pending["habit_id"] != habit_id)
+        if self.tree.exists(str(habit_id)):
+            self.tree.delete(str(habit_id))
+
+    def get_mark(self, habit_id):
+        """
+        Returns the mark of the first column of the habit.
+
+        Args:
+            habit_id (int): The id of the habit.
+
+        Returns:
+            str: CHECKED if the habit is selected, else UNCHECKED.
+        """
+        return CenterFrame.CHECKED if habit_id in self.__selected_ids else CenterFrame.UNCHECKED
+
+    def click_row(self, event):
+        """
+        Toggles the selection of the habit in the clicked row.
+
+        Args:
+            event (tkinter.Event): The click event.
+
+        Returns:
+            str: "break" if a row is clicked to stop the default handling of the click.
+        """
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return None
+        habit_id = int(item)
+        if habit_id in self.__selected_ids:
+            self.__selected_ids.remove(habit_id)
+        else:
+            self.__selected_ids.add(habit_id)
+        self.tree.set(item, 0, self.get_mark(habit_id))
+        return "break"
+
+    def get_selected_ids(self):
+        """
+        Returns the ids of the selected habits.
+
+        Returns:
+            [int]: The sorted ids of the selected habits.
+        """
+        return sorted(self.__selected_ids)
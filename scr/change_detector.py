@@ -0,0 +1,89 @@
+"""
+NAME
+    change_detector
+
+DESCRIPTION
+    Detects changes of the habit database which are made by other connections, for example
+    by the habits-cli or a cron job, so the GUI reloads only the changed habits.
+
+    The check compares PRAGMA data_version, which is a single cheap call and can be polled
+    often. Only if it changed, the habits with a larger revision than the last known
+    revision are loaded. Deleted habits are found by comparing the known habit ids with
+    the stored ones, which is only done if the number of habits does not match.
+
+CLASSES
+    ChangeDetector
+"""
+from collections import namedtuple
+from scr.caching_storage import CachingStorage
+from scr.habit import Habit
+
+#the changed or new habits and the ids of the deleted habits
+Changes = namedtuple("Changes", ["habits", "deleted_ids"])
+
+
+class ChangeDetector:
+    """
+    Detects the changed habits of an SQLiteStorage.
+
+    check() must always be called in the same thread, because the data version belongs
+    to the connection of the thread. sync() and poll() can run in a worker thread,
+    but not at the same time.
+
+    Args:
+        storage (SQLiteStorage): The storage or a CachingStorage in front of it.
+                                 The cached data of changed habits is invalidated.
+
+    Attributes:
+        storage (SQLiteStorage): The storage.
+        revision (int): The last known revision, None before sync().
+    """
+    def __init__(self, storage):
+        self.storage = storage
+        self.revision = None
+        self.__data_version = None
+        self.__known_ids = set()
+
+    def check(self):
+        """
+        Checks if another connection committed changes since the last check.
+        The first check only stores the data version.
+
+        Returns:
+            bool: True if the database is changed.
+        """
+        data_version = self.storage.get_data_version()
+        changed = self.__data_version is not None and data_version != self.__data_version
+        self.__data_version = data_version
+        return changed
+
+    def sync(self):
+        """
+        Stores the current revision and the ids of the stored habits. It is called before
+        the habits are loaded, so the changes during the load are found by the next poll.
+        """
+        self.revision = self.storage.get_revision()
+        self.__known_ids = set(self.storage.get_all_id())
+
+    def poll(self):
+        """
+        Loads the habits which are changed since the last poll and finds the deleted habits.
+
+        Returns:
+            Changes: The changed habits and the ids of the deleted habits.
+        """
+        if self.revision is None:
+            self.sync()
+        self.revision, habit_data = self.storage.load_changed(self.revision)
+        habits = [Habit.create_from_data(data) for data in habit_data]
+        self.__known_ids.update(habit["habit_id"] for habit in habits)
+
+        deleted_ids = []
+        if len(self.__known_ids) != self.storage.count_habits():
+            stored_ids = set(self.storage.get_all_id())
+            deleted_ids = sorted(self.__known_ids - stored_ids)
+            self.__known_ids = stored_ids
+        if isinstance(self.storage, CachingStorage):
+            for habit_id in [habit["habit_id"] for habit in habits] + deleted_ids:
+                self.storage.invalidate(habit_id)
+        return Changes(habits, deleted_ids)
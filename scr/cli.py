@@ -0,0 +1,399 @@
+"""
+NAME
+    cli
+
+DESCRIPTION
+    Headless command line interface of the habit tracking app for scripts and nightly jobs.
+
+    The habits are read chunk by chunk and every row is written as soon as it is computed,
+    so listing a database with a long history needs constant memory. The bulk commands
+    run in one transaction, so either all changes are stored or none.
+
+    Usage:
+        habits-cli [--db DB] list [--format csv|json] [--frequency FREQUENCY]
+        habits-cli [--db DB] stats [--format csv|json]
+        habits-cli [--db DB] create NAME [NAME ...] [--description TEXT] [--frequency FREQUENCY]
+        habits-cli [--db DB] delete HABIT_ID [HABIT_ID ...]
+        habits-cli [--db DB] mark HABIT_ID [HABIT_ID ...] [--date DATE ...]
+        habits-cli [--db DB] export {habits,completions} [--output FILE] [--format csv|jsonl]
+        habits-cli [--db DB] import {habits,completions} FILE [--format csv|jsonl]
+                                    [--chunk-size N] [--defer-indexes]
+
+FUNCTIONS
+    main
+"""
+import argparse
+import csv
+import json
+import sys
+from datetime import date
+import scr.analytics as ana
+from scr import bulk_transfer
+from scr.completion import Completion
+from scr.habit import Habit
+from scr.sqlite_storage import SQLiteStorage
+
+FREQUENCIES = {"daily": Completion.DAILY, "weekly": Completion.WEEKLY}
+LIST_COLUMNS = ("habit_id", "name", "description", "frequency",
+                "current_streak", "longest_streak")
+STATS_COLUMNS = ("habit_id",) + ana.StreakStatistics._fields + ("completion_rate",)
+#the number of habits loaded by one query
+QUERY_CHUNK_SIZE = 500
+
+
+class CommandError(Exception):
+    """The command can not be executed. The message is shown to the user."""
+
+
+def parse_frequency(value):
+    """
+    Parses the frequency as name or as number of days.
+
+    Args:
+        value (str): "daily", "weekly" or a positive integer.
+
+    Returns:
+        int: The frequency in days.
+
+    Raises:
+        argparse.ArgumentTypeError: The frequency is not valid.
+    """
+    if value.lower() in FREQUENCIES:
+        return FREQUENCIES[value.lower()]
+    try:
+        frequency = int(value)
+    except ValueError:
+        frequency = 0
+    if frequency < Completion.DAILY:
+        raise argparse.ArgumentTypeError(f"invalid frequency: {value}")
+    return frequency
+
+
+def parse_date(value):
+    """
+    Parses the date in iso-format.
+
+    Args:
+        value (str): The date as YYYY-MM-DD.
+
+    Returns:
+        datetime.date: The date.
+
+    Raises:
+        argparse.ArgumentTypeError: The date is not valid.
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid date: {value}") from exc
+
+
+class RowWriter:
+    """
+    Writes rows as CSV with a header or as JSON array of objects, one row at a time.
+
+    Args:
+        output (file): The text file the rows are written to.
+        columns (tuple): The names of the columns.
+        output_format (str): "csv" or "json".
+    """
+    def __init__(self, output, columns, output_format):
+        self.__output = output
+        self.__columns = columns
+        self.__format = output_format
+        self.__count = 0
+        if output_format == "csv":
+            self.__writer = csv.writer(output)
+            self.__writer.writerow(columns)
+        else:
+            output.write("[")
+
+    def write(self, row):
+        """
+        Writes the row.
+
+        Args:
+            row (tuple): The values in the order of the columns.
+        """
+        if self.__format == "csv":
+            self.__writer.writerow(row)
+        else:
+            self.__output.write(",\n" if self.__count else "\n")
+            self.__output.write(json.dumps(dict(zip(self.__columns, row))))
+        self.__count += 1
+
+    def close(self):
+        """
+        Finishes the output.
+        """
+        if self.__format == "json":
+            self.__output.write("\n]\n" if self.__count else "]\n")
+        self.__output.flush()
+
+
+def iter_habits(frequency=None, completions=Habit.COMPLETIONS_EAGER):
+    """
+    Loads the habits chunk by chunk. The frequency is filtered by the storage,
+    so the habits of other frequencies are not loaded.
+
+    Args:
+        frequency (int): Only habits with this frequency. Default is None for all habits.
+        completions (str): The completion mode of Habit.query. Default is eager.
+
+    Yields:
+        Habit: The habits ordered by habit id.
+    """
+    chunk = Habit.query(completions=completions, frequency=frequency, limit=QUERY_CHUNK_SIZE)
+    while chunk:
+        yield from chunk
+        chunk = Habit.query(completions=completions, frequency=frequency,
+                            after_id=chunk[-1]["habit_id"], limit=QUERY_CHUNK_SIZE)
+
+
+def list_habits(args, output):
+    """
+    Writes the habits with their current and longest streak.
+    """
+    writer = RowWriter(output, LIST_COLUMNS, args.format)
+    #the streaks are stored, so the completed dates are not loaded
+    for habit in iter_habits(frequency=args.frequency, completions=Habit.COMPLETIONS_SUMMARY):
+        writer.write(Habit.habit_data(habit))
+    writer.close()
+
+
+def write_stats(args, output):
+    """
+    Writes the streak statistics and the completion rate of every habit.
+    """
+    writer = RowWriter(output, STATS_COLUMNS, args.format)
+    for habit in iter_habits():
+        statistics = ana.get_streak_statistics(habit=habit)
+        periods = statistics.completed_periods + statistics.missed_periods
+        completion_rate = round(statistics.completed_periods / periods, 4) if periods else 0.0
+        writer.write((habit["habit_id"],) + tuple(statistics) + (completion_rate,))
+    writer.close()
+
+
+def create_habits(args, output):
+    """
+    Creates a habit for every name in one transaction and writes the new ids.
+    """
+    with Habit.DEFAULT_STORAGE_STRATEGY.transaction():
+        habits = [Habit(name=name, description=args.description,
+                        frequency=args.frequency).save() for name in args.names]
+    for habit in habits:
+        output.write(f"{habit['habit_id']}\n")
+
+
+def delete_habits(args, output):
+    """
+    Deletes the habits in one transaction.
+
+    Raises:
+        CommandError: There is no habit with the id.
+    """
+    with Habit.DEFAULT_STORAGE_STRATEGY.transaction():
+        for habit_id in args.habit_ids:
+            try:
+                Habit.delete(habit_id=habit_id)
+            except ValueError as exc:
+                raise CommandError(f"There is no habit with id {habit_id}.") from exc
+    output.write(f"deleted {len(args.habit_ids)} habits\n")
+
+
+def mark_habits(args, output):
+    """
+    Marks every date as completed for every habit and saves the habits in one transaction.
+
+    Raises:
+        CommandError: There is no habit with the id.
+        CommandError: The date is out of the checkable interval of the habit.
+    """
+    habit_ids = list(dict.fromkeys(args.habit_ids))
+    dates = args.dates or [date.today()]
+    with Habit.DEFAULT_STORAGE_STRATEGY.transaction():
+        habits = Habit.load_many(habit_ids)
+        missing_ids = sorted(set(habit_ids) - {habit["habit_id"] for habit in habits})
+        if missing_ids:
+            raise CommandError(f"There is no habit with id {missing_ids[0]}.")
+        for habit in habits:
+            for checked_date in dates:
+                try:
+                    habit.completion.mark_completed(checked_date=checked_date)
+                except ValueError as exc:
+                    raise CommandError(f"Date {checked_date.isoformat()} is out of the "
+                                       f"checkable interval of habit {habit['habit_id']}.") from exc
+            habit.save()
+    output.write(f"marked {len(dates)} dates for {len(habits)} habits\n")
+
+
+def open_file(file_name, mode):
+    """
+    Opens the text file for the bulk transfer. "-" is the standard input or output.
+
+    Args:
+        file_name (str): The name of the file.
+        mode (str): "r" or "w".
+
+    Returns:
+        file: The opened file, which is closed by the caller.
+
+    Raises:
+        CommandError: The file can not be opened.
+    """
+    if file_name == "-":
+        stream = sys.stdin if mode == "r" else sys.stdout
+        return open(stream.fileno(), mode, encoding="utf-8", newline="", closefd=False)
+    try:
+        return open(file_name, mode, encoding="utf-8", newline="")
+    except OSError as exc:
+        raise CommandError(f"Can not open {file_name}: {exc.strerror}.") from exc
+
+
+def print_report(action, table, report):
+    """
+    Prints the throughput of the bulk transfer to the standard error.
+
+    Args:
+        action (str): "imported" or "exported".
+        table (str): "habits" or "completions".
+        report (bulk_transfer.TransferReport): The report of the transfer.
+    """
+    print(f"{action} {report.rows} {table} in {report.seconds:.2f} s "
+          f"({report.rows_per_second:.0f} rows/s)", file=sys.stderr)
+
+
+def export_table(args, output):
+    """
+    Streams the habits or the completions to the file or the output.
+    """
+    output_format = args.format or bulk_transfer.get_format(args.output or "")
+    export = bulk_transfer.export_habits if args.table == "habits"\
+        else bulk_transfer.export_completions
+    if args.output is None:
+        report = export(Habit.DEFAULT_STORAGE_STRATEGY, output, output_format=output_format)
+    else:
+        with open_file(args.output, "w") as output_file:
+            report = export(Habit.DEFAULT_STORAGE_STRATEGY, output_file,
+                            output_format=output_format)
+    print_report("exported", args.table, report)
+
+
+def import_table(args, output): #pylint: disable=unused-argument
+    """
+    Imports the habits or the completions of the file in one transaction.
+
+    Raises:
+        CommandError: The chunk size, the file or a record is not valid.
+    """
+    if args.chunk_size < 1:
+        raise CommandError("The chunk size must be a positive integer.")
+    input_format = args.format or bulk_transfer.get_format(args.file)
+    with open_file(args.file, "r") as input_file:
+        try:
+            if args.table == "habits":
+                report = bulk_transfer.import_habits(
+                    Habit.DEFAULT_STORAGE_STRATEGY, input_file, input_format=input_format,
+                    chunk_size=args.chunk_size)
+            else:
+                report = bulk_transfer.import_completions(
+                    Habit.DEFAULT_STORAGE_STRATEGY, input_file, input_format=input_format,
+                    chunk_size=args.chunk_size, defer_indexes=args.defer_indexes)
+        except (ValueError, csv.Error) as exc:
+            raise CommandError(str(exc)) from exc
+    print_report("imported", args.table, report)
+
+
+def get_parser():
+    """
+    Returns the argument parser of the command line interface.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog="habits-cli",
+                                     description="Headless bulk operations on the habits.")
+    parser.add_argument("--db", default=SQLiteStorage.DB_NAME,
+                        help="the database file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list the habits with their streaks")
+    list_parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    list_parser.add_argument("--frequency", type=parse_frequency,
+                             help="only habits with the frequency: daily, weekly or days")
+    list_parser.set_defaults(function=list_habits)
+
+    stats_parser = commands.add_parser("stats", help="print the streak statistics")
+    stats_parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    stats_parser.set_defaults(function=write_stats)
+
+    create_parser = commands.add_parser("create", help="create habits with the names")
+    create_parser.add_argument("names", nargs="+", metavar="NAME")
+    create_parser.add_argument("--description", default=None)
+    create_parser.add_argument("--frequency", type=parse_frequency, default=Completion.DAILY,
+                               help="daily, weekly or days (default: daily)")
+    create_parser.set_defaults(function=create_habits)
+
+    delete_parser = commands.add_parser("delete", help="delete the habits with the ids")
+    delete_parser.add_argument("habit_ids", nargs="+", type=int, metavar="HABIT_ID")
+    delete_parser.set_defaults(function=delete_habits)
+
+    mark_parser = commands.add_parser("mark", help="mark the habits as completed")
+    mark_parser.add_argument("habit_ids", nargs="+", type=int, metavar="HABIT_ID")
+    mark_parser.add_argument("--date", dest="dates", action="append", type=parse_date,
+                             metavar="DATE", help="YYYY-MM-DD, repeatable (default: today)")
+    mark_parser.set_defaults(function=mark_habits)
+
+    export_parser = commands.add_parser("export", help="stream the habits or the completions")
+    export_parser.add_argument("table", choices=("habits", "completions"))
+    export_parser.add_argument("--output", metavar="FILE",
+                               help="the output file (default: standard output)")
+    export_parser.add_argument("--format", choices=bulk_transfer.FORMATS,
+                               help="default: jsonl for .jsonl files, else csv")
+    export_parser.set_defaults(function=export_table)
+
+    import_parser = commands.add_parser("import", help="import the habits or the completions")
+    import_parser.add_argument("table", choices=("habits", "completions"))
+    import_parser.add_argument("file", metavar="FILE", help="the input file, - for standard input")
+    import_parser.add_argument("--format", choices=bulk_transfer.FORMATS,
+                               help="default: jsonl for .jsonl files, else csv")
+    import_parser.add_argument("--chunk-size", type=int, default=bulk_transfer.CHUNK_SIZE,
+                               help="rows per executemany (default: %(default)s)")
+    import_parser.add_argument("--defer-indexes", action="store_true",
+                               help="rebuild the tracking index after the import")
+    import_parser.set_defaults(function=import_table)
+    return parser
+
+
+def main(argv=None, output=None):
+    """
+    Runs the command line interface.
+
+    Args:
+        argv (list): The arguments. Default is None for sys.argv[1:].
+        output (file): The output of the command. Default is None for sys.stdout.
+
+    Returns:
+        int: The exit status, 0 on success and 1 on errors.
+    """
+    args = get_parser().parse_args(argv)
+    output = sys.stdout if output is None else output
+    storage = SQLiteStorage(data_base=args.db)
+    default_storage = Habit.DEFAULT_STORAGE_STRATEGY
+    Habit.DEFAULT_STORAGE_STRATEGY = storage
+    try:
+        args.function(args, output)
+    except CommandError as exc:
+        print(f"habits-cli: error: {exc}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        #the reader of the output is closed, for example head
+        return 1
+    finally:
+        Habit.DEFAULT_STORAGE_STRATEGY = default_storage
+        storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
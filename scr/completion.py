@@ -8,8 +8,19 @@ DESCRIPTION
 
 CLASSES
     Completion
+    CompletedDates
 """
+from collections import namedtuple
+from heapq import merge
 from datetime import  datetime, date, timedelta
+from scr.analytics import compute_streak_statistics
+
+#the positions of the set bits of every byte value
+BIT_POSITIONS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+#the streak state of the completed periods, independent of today:
+#the last completed period, the streak which ends with it and the longest streak
+StreakState = namedtuple("StreakState", ["last_period", "last_streak", "longest_streak"])
 
 class Completion:
     """
@@ -19,12 +30,21 @@ class Completion:
         frequency (int):
         completed_dates (list):
         creation_time (datetime.datetime):
+        streak_state (StreakState): The stored streak state of the completed dates.
+                                    Default is None.
+        loader (function): Returns the stored completed dates. If it is given, the completed
+                           dates are loaded on the first access of self["completed_dates"]
+                           and the streaks are read from the streak state until then.
+                           Default is None.
+        summary (bool): The completed dates of a lazy completion can not be accessed.
+                        The loader is only used if the streaks can not be read from
+                        the streak state. Default is False.
 
     Attributes:
         WEEKLY (int): The frequency for a weekly habit. Is set to 7.
         Daily (int): The frequency for a daily habit. Is set to 1.
         self["frequency"] (int): The frequency of the complition
-        self["completed_dates"] (list): The list of the completed dates.
+        self["completed_dates"] (CompletedDates): The completed dates.
         self["creation_time"] (datetime): The datetime when the completion is created.
 
     Raises:
@@ -35,17 +55,18 @@ class Completion:
     WEEKLY = 7
     DAILY = 1
 
-    def __init__(self, frequency = DAILY, completed_dates = None, creation_time = None):
+    def __init__(self, frequency = DAILY, completed_dates = None, creation_time = None,
+                 streak_state = None, loader = None, summary = False):
         #checkes if the frequency a positiv integer
         if not isinstance(frequency, int) or frequency < Completion.DAILY:
             raise ValueError("Frequency must be a positiv integer.")
 
-        #set default completed_dates
-        if completed_dates is None:
+        #set default completed_dates, the dates of a lazy completion are loaded later
+        if completed_dates is None or loader is not None:
             completed_dates=[]
 
         #checks if completed dates is list, and if not creats a list
-        if not isinstance(completed_dates,list):
+        if not isinstance(completed_dates,(list, CompletedDates)):
             completed_dates = [completed_dates]
 
         #sets creation time to now if not seted and check if o type datetime.
@@ -61,13 +82,67 @@ class Completion:
 
         #set the properties of the class to a dictonary
         self.record = {"frequency": frequency,
-                  "completed_dates": completed_dates,
+                  "completed_dates": None,
                   "creation_time": creation_time}
+        self.__streak_state = streak_state
+        self.__loader = loader
+        self.__summary = summary and loader is not None
+        if loader is None:
+            self.record["completed_dates"] = CompletedDates(creation_day=creation_time.date(),
+                                                            frequency=frequency,
+                                                            completed_dates=completed_dates,
+                                                            streak_state=streak_state)
+
+        #the completed dates which are not saved by the storage strategy yet
+        self.__unsaved_dates = list(completed_dates)
 
     #set the __getitem__ function that the properties are callable with self["property"]
     def __getitem__(self, name):
+        if name == "completed_dates" and not self.is_loaded():
+            if self.__summary:
+                raise ValueError("The completed dates of a summary habit are not loaded.")
+            self.load_completed_dates()
         return self.record[name]
 
+    def is_loaded(self):
+        """
+        Returns if the completed dates are loaded.
+
+        Returns:
+            bool: False if the completed dates of a lazy completion are not loaded yet.
+        """
+        return self.record["completed_dates"] is not None
+
+    def load_completed_dates(self):
+        """
+        Loads the completed dates of a lazy completion with its loader. The loaded dates
+        are stored dates, so they are not validated again.
+        """
+        completed_dates = self.__loader()
+        self.record["completed_dates"] = CompletedDates(
+            creation_day=self.record["creation_time"].date(),
+            frequency=self.record["frequency"],
+            completed_dates=completed_dates,
+            streak_state=self.__streak_state)
+        self.__loader = None
+
+    def get_streak_dates(self):
+        """
+        Returns the completed dates which are needed to compute the streaks. The dates of
+        a summary are loaded for the computation only and are not kept.
+
+        Returns:
+            CompletedDates: The completed dates.
+        """
+        if self.is_loaded():
+            return self.record["completed_dates"]
+        if self.__summary:
+            return CompletedDates(creation_day=self.record["creation_time"].date(),
+                                  frequency=self.record["frequency"],
+                                  completed_dates=self.__loader())
+        self.load_completed_dates()
+        return self.record["completed_dates"]
+
     def mark_completed(self, checked_date=None):
         """
         The habit is been completed today or at a special date.
@@ -99,5 +174,269 @@ class Completion:
             %timedelta(days=self.record["frequency"])
 
         #append completed_dates only if checked_date is a new date
-        if checked_date not in self.record["completed_dates"]:
-            self.record["completed_dates"].append(checked_date)
+        if self["completed_dates"].add(checked_date):
+            self.__unsaved_dates.append(checked_date)
+
+    def get_streaks(self, today=None):
+        """
+        Returns the current and the longest streak from the incrementally maintained
+        streak state. Falls back to the streak engine if dates after today are completed.
+        The completed dates of a lazy completion are not loaded if its streak state is known.
+
+        Args:
+            today (datetime.date): The day of the current period.
+                                   Default is datetime.date.today().
+
+        Returns:
+            (int, int): The current streak and the longest streak.
+        """
+        if today is None:
+            today = date.today()
+        current_period = (today - self.record["creation_time"].date()).days\
+            // self.record["frequency"]
+        if self.is_loaded() or self.__streak_state is None:
+            state = self.get_streak_dates().get_streak_state()
+        else:
+            state = StreakState(*self.__streak_state)
+        if state.last_period is not None and state.last_period > current_period:
+            statistics = compute_streak_statistics(
+                period_indexes=self.get_streak_dates().get_period_indexes(),
+                current_period=current_period)
+            return statistics.current_streak, statistics.longest_streak
+        current_streak = state.last_streak if state.last_period == current_period else 0
+        return current_streak, state.longest_streak
+
+    def get_unsaved_dates(self):
+        """
+        Returns the completed dates which are not saved by the storage strategy yet.
+
+        Returns:
+            [datetime.date]: The unsaved completed dates.
+        """
+        return list(self.__unsaved_dates)
+
+    def mark_saved(self):
+        """
+        Marks all completed dates as saved by the storage strategy.
+        """
+        self.__unsaved_dates.clear()
+
+
+
+class CompletedDates:
+    """
+    The completed dates of a completion, stored as a bitset of the period indexes
+    since the creation day. Dates which are not the first day of a period or which
+    are before the creation day are kept in a set beside the bitset.
+    Membership and insertion are O(1). Iteration and indexing use a sorted view,
+    so the class can be used like the list of completed dates.
+
+    The streak state is updated in O(1) when a period after the last completed period
+    is added and recomputed on demand after a period before it is added.
+
+    Args:
+        creation_day (datetime.date): The day on which the completion is created.
+        frequency (int): The periodicity of the completion.
+        completed_dates (iterable): The completed dates. Default is ().
+        streak_state (StreakState): The stored streak state of the completed dates.
+                                    It is ignored if it does not fit the dates.
+                                    Default is None.
+    """
+
+    def __init__(self, creation_day, frequency, completed_dates=(), streak_state=None):
+        self.__creation_ordinal = creation_day.toordinal()
+        self.__frequency = frequency
+        self.__bits = bytearray()
+        self.__count = 0
+        self.__irregular_dates = set()
+        #sorted list of the dates, created on demand
+        self.__sorted_dates = None
+        #streak state, computed on demand
+        self.__streak_state = None
+        for completed_date in completed_dates:
+            self.add(completed_date)
+        if streak_state is not None and streak_state.last_period == self.get_last_period():
+            self.__streak_state = StreakState(*streak_state)
+
+    def period_index(self, completed_date):
+        """
+        Returns the index of the period which starts on the date.
+
+        Args:
+            completed_date (datetime.date): The date.
+
+        Returns:
+            int: The period index or None if the date is not the first day of a period
+                 between the creation day and the future.
+        """
+        offset = completed_date.toordinal() - self.__creation_ordinal
+        if offset < 0 or offset % self.__frequency:
+            return None
+        return offset // self.__frequency
+
+    def period_start(self, period_index):
+        """
+        Returns the first day of the period with the index.
+
+        Args:
+            period_index (int): The index of the period.
+
+        Returns:
+            datetime.date: The first day of the period.
+        """
+        return date.fromordinal(self.__creation_ordinal + period_index * self.__frequency)
+
+    def add(self, completed_date):
+        """
+        Adds the date to the completed dates.
+
+        Args:
+            completed_date (datetime.date): The completed date.
+
+        Returns:
+            bool: True if the date is new, False if it was already completed.
+        """
+        index = self.period_index(completed_date)
+        if index is None:
+            if completed_date in self.__irregular_dates:
+                return False
+            self.__irregular_dates.add(completed_date)
+        else:
+            byte_index, mask = index >> 3, 1 << (index & 7)
+            if byte_index >= len(self.__bits):
+                self.__bits.extend(bytes(byte_index + 1 - len(self.__bits)))
+            if self.__bits[byte_index] & mask:
+                return False
+            self.__bits[byte_index] |= mask
+            self.__count += 1
+            self.update_streak_state(index)
+        self.__sorted_dates = None
+        return True
+
+    def update_streak_state(self, period_index):
+        """
+        Updates the streak state after the period with the index is added.
+
+        Args:
+            period_index (int): The index of the added period.
+        """
+        state = self.__streak_state
+        if state is None:
+            return
+        if state.last_period is None or period_index > state.last_period + 1:
+            #a new streak starts after a gap
+            self.__streak_state = StreakState(period_index, 1, max(state.longest_streak, 1))
+        elif period_index == state.last_period + 1:
+            #the last streak is continued
+            last_streak = state.last_streak + 1
+            self.__streak_state = StreakState(period_index, last_streak,
+                                              max(state.longest_streak, last_streak))
+        else:
+            #a period before the last period is added, the state is recomputed on demand
+            self.__streak_state = None
+
+    def get_streak_state(self):
+        """
+        Returns the streak state of the completed periods.
+
+        Returns:
+            StreakState: (last_period, last_streak, longest_streak)
+        """
+        if self.__streak_state is None:
+            last_period = self.get_last_period()
+            if last_period is None:
+                self.__streak_state = StreakState(None, 0, 0)
+            else:
+                statistics = compute_streak_statistics(period_indexes=self.get_period_indexes(),
+                                                       current_period=last_period)
+                self.__streak_state = StreakState(last_period, statistics.current_streak,
+                                                  statistics.longest_streak)
+        return self.__streak_state
+
+    def get_last_period(self):
+        """
+        Returns the index of the last completed period.
+
+        Returns:
+            int: The index of the last completed period or None if no period is completed.
+        """
+        for byte_index in range(len(self.__bits) - 1, -1, -1):
+            value = self.__bits[byte_index]
+            if value:
+                return (byte_index << 3) + BIT_POSITIONS[value][-1]
+        return None
+
+    def has_period(self, period_index):
+        """
+        Checks if the period with the index is completed.
+
+        Args:
+            period_index (int): The index of the period.
+
+        Returns:
+            bool: True if the period is completed.
+        """
+        byte_index = period_index >> 3
+        return 0 <= byte_index < len(self.__bits)\
+            and bool(self.__bits[byte_index] >> (period_index & 7) & 1)
+
+    def get_period_indexes(self):
+        """
+        Returns the indexes of the completed periods.
+
+        Returns:
+            [int]: The sorted period indexes.
+        """
+        indexes = []
+        for byte_index, value in enumerate(self.__bits):
+            if value:
+                offset = byte_index << 3
+                indexes.extend(offset + bit for bit in BIT_POSITIONS[value])
+        return indexes
+
+    def get_bitset(self):
+        """
+        Returns the bitset of the completed periods.
+        The bit i of the byte n is set if the period 8*n+i is completed.
+
+        Returns:
+            bytes: The copy of the bitset.
+        """
+        return bytes(self.__bits)
+
+    def get_sorted_dates(self):
+        """
+        Returns the sorted list of the completed dates.
+
+        Returns:
+            [datetime.date]: The completed dates.
+        """
+        if self.__sorted_dates is None:
+            period_starts = [self.period_start(index) for index in self.get_period_indexes()]
+            self.__sorted_dates = list(merge(period_starts, sorted(self.__irregular_dates)))
+        return self.__sorted_dates
+
+    def __contains__(self, completed_date):
+        if not isinstance(completed_date, date):
+            return False
+        index = self.period_index(completed_date)
+        if index is None:
+            return completed_date in self.__irregular_dates
+        return self.has_period(index)
+
+    def __len__(self):
+        return self.__count + len(self.__irregular_dates)
+
+    def __iter__(self):
+        return iter(self.get_sorted_dates())
+
+    def __getitem__(self, index):
+        return self.get_sorted_dates()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (list, CompletedDates)):
+            return self.get_sorted_dates() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CompletedDates({self.get_sorted_dates()!r})"
@@ -11,6 +11,7 @@ CLASSES
 import tkinter as tk
 from tkinter import ttk
 import tkinter.messagebox as mb
+from bisect import bisect_left, bisect_right
 from datetime import date, datetime, timedelta
 from tkcalendar import Calendar
 from scr.pop_up_window import PopUpWindow
@@ -134,10 +135,10 @@ class EntryPopUp(PopUpWindow):
     def click_okay_new_habit(self):
         """
         Handle the creation of a new habit.
+        The habit is saved by the storage executor of the main window.
 
         Raises:
-            AttributeError: Main window has no attribute all_habits
-            AttributeError: Main window has no attribute reload center frame
+            AttributeError: Main window has no attribute storage executor or add habit
         """
         #Habit must have a name, description or frequency
         if not (self.entry_habit_name.get() and self.entry_habit_description.get()\
@@ -153,32 +154,24 @@ class EntryPopUp(PopUpWindow):
             habit = Habit(name=self.entry_habit_name.get(),
                          description=self.entry_habit_description.get(),
                          frequency=self.habit_frequency.get())
-            habit.save()
             try:
-                #append the list all_habits of the main window
-                self.main_window.all_habits.append(habit)
+                #save the habit in the worker thread, then add it to the main window
+                self.main_window.storage_executor.submit(
+                    habit.save, callback=self.main_window.add_habit,
+                    error_callback=self.main_window.show_storage_error)
             except AttributeError as exc:
                 self.destroy()
-                raise AttributeError("Main window has no attribute all_habits"
-                                     ) from exc
-
-
-            try:
-                #reload the center_frame of the main window
-                self.main_window.reload_center_frame(self.main_window.all_habits)
-            except AttributeError as exc:
-                self.destroy()
-                raise AttributeError("Main window has no attribute reload center frame"
+                raise AttributeError("Main window has no attribute storage executor or add habit"
                                      ) from exc
             self.destroy()
 
     def click_okay_change_habit(self):
         """
         Handle the modification of an existing habit.
+        The habit is loaded, changed and saved by the storage executor of the main window.
 
         Raises:
-            AttributeError: Main window has no attribute center frame or selected habid id.
-            AttributeError: Main window has no attribute load habits or all habits.
+            AttributeError: Main window has no attribute storage executor or update habit.
         """
         #Habit must have a name or description
         if not (self.entry_habit_name.get() or self.entry_habit_description.get()):
@@ -189,28 +182,40 @@ class EntryPopUp(PopUpWindow):
             message.show()
         else:
             try:
-                #change the name or the description of the habit
-                habit = Habit.change_habit_name_description\
-                    (habit_id=self.habit_id,
+                #change the habit in the worker thread, then update it in the main window
+                self.main_window.storage_executor.submit(
+                    EntryPopUp.save_changed_habit, habit_id=self.habit_id,
                     habit_name=self.entry_habit_name.get(),
-                    habit_description=self.entry_habit_description.get())
+                    habit_description=self.entry_habit_description.get(),
+                    callback=self.main_window.update_habit,
+                    error_callback=self.main_window.show_storage_error)
             except AttributeError as exc:
                 self.destroy()
-                raise AttributeError("""Main window has no attribute center frame
-                                     or selected habid id.""") from exc
-            #save changes to database
-            habit.save()
-            try:
-                #reload all_habits
-                self.main_window.all_habits=Habit.load_all()
-                #reload the center_frame
-                self.main_window.reload_center_frame(self.main_window.all_habits)
-            except AttributeError as exc:
-                self.destroy()
-                raise AttributeError("""Main window has no attribute load habits or
-                                    all habits.""") from exc
+                raise AttributeError("Main window has no attribute storage executor "\
+                                     "or update habit.") from exc
         self.destroy()
 
+    @staticmethod
+    def save_changed_habit(habit_id, habit_name, habit_description):
+        """
+        Changes the name or the description of the stored habit and saves it.
+        It runs in the worker thread of the storage executor.
+
+        Args:
+            habit_id (int): The id of the habit which should be changed.
+            habit_name (str): The new name of the habit.
+            habit_description (str): The new description of the habit.
+
+        Returns:
+            Habit: The saved habit.
+
+        Raises:
+            ValueError: There is no habit with habit id in the database.
+        """
+        habit = Habit.change_habit_name_description(habit_id=habit_id, habit_name=habit_name,
+                                                    habit_description=habit_description)
+        return habit.save()
+
 
 class DatePicker(PopUpWindow):
 
@@ -248,7 +253,7 @@ class DatePicker(PopUpWindow):
 
         Raises:
             AttributeError: Main window has no attribute selected habit id.
-            AttributeError: Main window has no attribute load habits or all habits.
+            AttributeError: Main window has no attribute storage executor or update habit.
         """
         self.mark_date()
 
@@ -259,7 +264,7 @@ class DatePicker(PopUpWindow):
 
         Raises:
             AttributeError: Main window has no attribute selected habit id.
-            AttributeError: Main window has no attribute load habits or all habits.
+            AttributeError: Main window has no attribute storage executor or update habit.
 
         """
         date_str = self.calendar.get_date()
@@ -277,7 +282,7 @@ class DatePicker(PopUpWindow):
 
         Raises:
             AttributeError: Main window has no attribute selected habit id.
-            AttributeError: Main window has no attribute load habits or all habits.
+            AttributeError: Main window has no attribute storage executor or update habit.
         """
         
         try:
@@ -295,21 +300,20 @@ class DatePicker(PopUpWindow):
             #shows error message if picked date not between createn date and today.
             message = mb.Message(self,icon=mb.ERROR,type=mb.OK,title="INPUT ERROR",
                             message="Selected date must be between "\
-                                f"{habit["creation_time"].strftime('%d.%m.%Y')} "\
+                                f"{habit['creation_time'].strftime('%d.%m.%Y')} "\
                                 f"and {datetime.now().strftime('%d.%m.%Y')}."
                             )
             message.show()
         else:
-            #save changes
-            habit.save()
             try:
-                #reload all_habits and center frame of main window
-                self.main_window.all_habits = Habit.load_all()
-                self.main_window.reload_center_frame(self.main_window.all_habits)
+                #save the changes in the worker thread, then update the main window
+                self.main_window.storage_executor.submit(
+                    habit.save, callback=self.main_window.update_habit,
+                    error_callback=self.main_window.show_storage_error)
             except AttributeError as exc:
                 self.destroy()
-                raise AttributeError("Main window has no attribute load habits or all habits."
-                                    ) from exc
+                raise AttributeError("Main window has no attribute storage executor "\
+                                     "or update habit.") from exc
             self.destroy()
 
 
@@ -317,6 +321,10 @@ class PopUpCalendar(PopUpWindow):
     """
         Initialize a pop-up calendar window that displays a calendar
         with completed dates highlighted.
+
+        Only the completed dates of the displayed month are tagged. The dates of another
+        month are loaded when the month is changed, so opening the calendar does not
+        depend on the length of the history of the habit.
         
         Args:
             main_window (Tk): The main application window.
@@ -324,13 +332,18 @@ class PopUpCalendar(PopUpWindow):
                 A list of dates that have been completed. Default is None.
             frequency (int, optional): The frequency of the habit. Default is 1.
             creation_date: The date the habit is created. Default is datetime.date.today().
+            habit_id (int, optional): The id of the stored habit. If it is given, the
+                completed dates of the displayed month are loaded from the database by
+                the storage executor of the main window instead of taken from
+                completed_dates. Default is None.
 
         Raises:
             TypeError: Frequency must be integer.
             TypeError: Creation date must be of type datetime.date.
             TypeError: Completed dates must be list or None.
         """
-    def __init__(self, main_window, completed_dates=None, frequency=1, creation_date = date.today):
+    def __init__(self, main_window, completed_dates=None, frequency=1, creation_date = date.today,
+                 habit_id=None):
         super().__init__(main_window=main_window)
 
         if not isinstance(frequency, int):
@@ -345,13 +358,99 @@ class PopUpCalendar(PopUpWindow):
         if completed_dates is None:
             self.completed_dates = []
         self.creation_date = creation_date
+        self.habit_id = habit_id
+        #the sorted ordinals of the completed dates to find the dates of a month
+        self.__ordinals = sorted(completed.toordinal() for completed in self.completed_dates
+                                 if isinstance(completed, date))
+        #the months whose dates are loaded and the completed dates which are tagged
+        self.__loaded_months = set()
+        self.__tagged_dates = set()
 
         self.geometry("300x200")
         self.title("completed dates")
         self.calendar = Calendar(master=self, selectmode="day")
         self.calendar.pack()
-        self.check_dates(completed_dates=self.completed_dates,
-                         frequency=self.frequency,
+        self.create_tags(creation_date=self.creation_date)
+        self.calendar.bind("<<CalendarMonthChanged>>", self.month_changed)
+        self.month_changed()
+
+    def create_tags(self, creation_date):
+        """
+        Configure the tags of the completed dates and highlight the creation date.
+
+        Args:
+            creation_date (datetime.date): The date the habit is created.
+        """
+        #set beckgroundcolor for the creation day to red
+        self.calendar.calevent_create(date=creation_date,text="Calendar",
+                                      tags= "Creation date")
+        self.calendar.tag_config("Creation date", background="red",
+                                foreground="white")
+        #set foreground color of the creation day to green if it is checked
+        self.calendar.tag_config("Day one equal creation date", background="red",
+                                 foreground="green")
+        #set backgroundcolor of the first day of a period to green
+        self.calendar.tag_config("Day one", background="green", foreground="white")
+        #set backgroundcolor of the other days of a period to lightgreen
+        self.calendar.tag_config("The other days", background="#49cc6c", foreground="white")
+
+    def get_displayed_range(self):
+        """
+        Returns the first and the last date of the periods which are displayed
+        in the current month of the calendar, including the days of the previous
+        and the next month shown in the weeks of the month.
+
+        Returns:
+            (datetime.date, datetime.date): The first and the last date of the range.
+        """
+        month, year = self.calendar.get_displayed_month()
+        first_day = date(year=year, month=month, day=1)
+        first_weekday = 6 if self.calendar.cget("firstweekday") == "sunday" else 0
+        first_shown = first_day - timedelta(days=(first_day.weekday() - first_weekday) % 7)
+        #the calendar always shows six weeks, a period which starts before them
+        #can reach into them
+        return (first_shown - timedelta(days=max(self.frequency - 1, 0)),
+                first_shown + timedelta(days=6 * 7 - 1))
+
+    def month_changed(self, *args):
+        """
+        Load and tag the completed dates of the displayed month, if they are not loaded yet.
+        """
+        month = self.calendar.get_displayed_month()
+        if month in self.__loaded_months:
+            return
+        self.__loaded_months.add(month)
+        start, end = self.get_displayed_range()
+        if self.habit_id is None:
+            first = bisect_left(self.__ordinals, start.toordinal())
+            last = bisect_right(self.__ordinals, end.toordinal())
+            self.show_completed_dates(list(map(date.fromordinal, self.__ordinals[first:last])))
+        else:
+            try:
+                #load the dates in the worker thread, then tag them in the main window
+                self.main_window.storage_executor.submit(
+                    Habit.get_completions_between, self.habit_id, start, end,
+                    callback=self.show_completed_dates,
+                    error_callback=self.main_window.show_storage_error)
+            except AttributeError as exc:
+                self.destroy()
+                raise AttributeError("Main window has no attribute storage executor "\
+                                     "or show storage error.") from exc
+
+    def show_completed_dates(self, completed_dates):
+        """
+        Tag the loaded completed dates, which are not tagged yet.
+
+        Args:
+            completed_dates (list): The completed dates of the displayed month.
+        """
+        #the window can be closed while the dates are loaded
+        if not self.winfo_exists():
+            return
+        completed_dates = [completed for completed in completed_dates
+                           if completed not in self.__tagged_dates]
+        self.__tagged_dates.update(completed_dates)
+        self.check_dates(completed_dates=completed_dates, frequency=self.frequency,
                          creation_date=self.creation_date)
 
     def check_dates(self,completed_dates,frequency,creation_date):
@@ -361,15 +460,11 @@ class PopUpCalendar(PopUpWindow):
         Args:
             completed_dates (list): A list of dates that have been completed.
             frequency (int): The frequency of the habit.
+            creation_date (datetime.date): The date the habit is created.
 
         Raises:
             TypeError: Completed dates is not iterable.
         """
-        #set beckgroundcolor for the creation day to red
-        self.calendar.calevent_create(date=creation_date,text="Calendar",
-                                      tags= "Creation date")
-        self.calendar.tag_config("Creation date", background="red",
-                                foreground="white")
         try:
             for completed in completed_dates:
                 for i in range(frequency):
@@ -377,25 +472,15 @@ class PopUpCalendar(PopUpWindow):
                     if isinstance(completed,date):
                         if i==0:
                             if completed == creation_date:
-                                #set foreground color of the creation day to green if it is checked
                                 self.calendar.calevent_create(date=completed+timedelta(days=i),
                                                     text="Calendar",
                                                     tags= "Day one equal creation date")
-                                self.calendar.tag_config("Day one equal creation date",
-                                                        background="red",
-                                                        foreground="green")
                             else:
-                            #set backgroundcolor of the first day of a period to green
                                 self.calendar.calevent_create(date=completed+timedelta(days=i),
                                                     text="Calendar", tags= "Day one")
-                                self.calendar.tag_config("Day one", background="green",
-                                                        foreground="white")
                         else:
-                            #set backgroundcolor of the other days of a period to lightgreen
                             self.calendar.calevent_create(date=completed+timedelta(days=i),
                                                     text="Calendar", tags= "The other days")
-                            self.calendar.tag_config("The other days", background="#49cc6c",
-                                                    foreground="white")
         except TypeError as exc:
             self.destroy()
             raise TypeError("Completed dates is not iterable.") from exc
@@ -5,10 +5,15 @@ NAME
 DESCRIPTION
     Contains the habit class
 
+    Habits are loaded with all completed dates by default. For views which show only the
+    name, the description and the streaks, the completed dates can be loaded lazily on
+    first access, or not at all by summary habits which carry the stored streaks.
+
 CLASSES
     Habit
 """
-import scr.analytics as ana
+from datetime import date
+from functools import partial
 from scr.sqlite_storage import SQLiteStorage
 from scr.completion import Completion
 
@@ -24,21 +29,39 @@ class Habit():
         completed_dates (list): List of the completed dates. Default is None.
         creation_time (datetime.datetime): The time when the habit is created. Default is None.
         habit_id (int): The id with which is the habit stored in the database. Default is None.
+        streak_state (StreakState): The stored streak state of the completed dates.
+                                    Default is None.
+        completed_dates_loader (function): Loads the completed dates on first access
+                                           instead of completed_dates. Default is None.
+        summary (bool): The completed dates loaded by completed_dates_loader can not be
+                        accessed, they are only loaded if the stored streaks are out of
+                        date. Default is False.
 
     Attributes:
         DEFAULT_STORAGE_STRATEGY (SQLiteStorge): The strategy which saves
-                                                and loads habits to the database
+                                                and loads habits to the database.
+                                                It opens the database on first use.
+        COMPLETIONS_EAGER (str): Load the habits with their completed dates.
+        COMPLETIONS_LAZY (str): Load the completed dates on first access
+                                of habit["completed_dates"] or by the analytics.
+        COMPLETIONS_SUMMARY (str): Load only the habit data and the stored streaks,
+                                   the completed dates can not be accessed.
         self["name"] (str): The name of the habit.
         self["description"] (str): The description of the habit.
         self["habit_id"] (int): The id with which is the habit stored in the database.
         completion (Completion): Class which processes the habit data.  
     """
     DEFAULT_STORAGE_STRATEGY = SQLiteStorage()
+    COMPLETIONS_EAGER = "eager"
+    COMPLETIONS_LAZY = "lazy"
+    COMPLETIONS_SUMMARY = "summary"
 
     def __init__(self, name, description, habit_id=None, frequency = Completion.DAILY,
-                 completed_dates=None, creation_time = None):
+                 completed_dates=None, creation_time = None, streak_state = None,
+                 completed_dates_loader = None, summary = False):
 
-        self.completion = Completion(frequency, completed_dates, creation_time)
+        self.completion = Completion(frequency, completed_dates, creation_time, streak_state,
+                                     completed_dates_loader, summary)
         name = name or "new habit"
         description = description or "new description"
         self.__record = {"name": name,
@@ -72,25 +95,36 @@ class Habit():
         """
         Save the habit into the database
 
+        Returns:
+            Habit: The saved habit returned by the storage strategy.
+
         Raises:
             TypeError: Habit is not savable.
         """
         try:
-            Habit.DEFAULT_STORAGE_STRATEGY.save(self)
+            return Habit.DEFAULT_STORAGE_STRATEGY.save(self)
         except TypeError as exc:
             raise TypeError("Habit is not savable.")from exc
 
     @classmethod
-    def load(cls, habit_id):
+    def load(cls, habit_id, completions=COMPLETIONS_EAGER):
         """
         Load the habit from the database
         
         Args:
             habit_id (int): The id with which is the habit stored in the database.
+            completions (str): COMPLETIONS_EAGER, COMPLETIONS_LAZY or COMPLETIONS_SUMMARY.
+                               Default is COMPLETIONS_EAGER.
 
         Returns:
             Habit: The habit with the habit_id if existing.
+
+        Raises:
+            ValueError: Completions must be eager, lazy or summary.
         """
+        if completions != cls.COMPLETIONS_EAGER:
+            habits = cls.query(completions=completions, ids=[habit_id])
+            return habits[0] if habits else None
 
         #load data from database
         data = cls.DEFAULT_STORAGE_STRATEGY.load(habit_id)
@@ -99,20 +133,138 @@ class Habit():
             return None
 
         #create a habit from data and return it.
-        return Habit(frequency=data["frequency"], completed_dates=data["completed_dates"],
-                     name=data["name"], description=data["description"],
-                     creation_time=data["creation_time"], habit_id=data["habit_id"])
+        return cls.create_from_data(data)
+
+    @classmethod
+    def load_many(cls, habit_ids):
+        """
+        Load the habits with the ids from the database at once.
+
+        Args:
+            habit_ids (list): The ids with which the habits are stored in the database.
+
+        Returns:
+            [Habit]: The stored habits ordered by habit id.
+        """
+        return [cls.create_from_data(data)
+                for data in cls.DEFAULT_STORAGE_STRATEGY.load_many(habit_ids)]
 
     @classmethod
-    def load_all(cls):
+    def load_all(cls, completions=COMPLETIONS_EAGER):
         """
         Load all habits from the database
-        
+
+        Args:
+            completions (str): COMPLETIONS_EAGER, COMPLETIONS_LAZY or COMPLETIONS_SUMMARY.
+                               Default is COMPLETIONS_EAGER.
+
         Returns:
             [Habit]: A List of all habits stored in the database.
+
+        Raises:
+            ValueError: Completions must be eager, lazy or summary.
+        """
+        if completions != cls.COMPLETIONS_EAGER:
+            return cls.query(completions=completions)
+        return [cls.create_from_data(data)
+                for data in cls.DEFAULT_STORAGE_STRATEGY.load_all()]
+
+    @classmethod
+    def iter_all(cls):
+        """
+        Load all habits from the database in chunks. It is used to load the habits
+        in a worker thread and to show the first habits before all are loaded.
+
+        Yields:
+            [Habit]: The next chunk of the stored habits ordered by habit id.
+        """
+        for chunk in cls.DEFAULT_STORAGE_STRATEGY.iter_all():
+            yield [cls.create_from_data(data) for data in chunk]
+
+    @classmethod
+    def query(cls, completions=COMPLETIONS_EAGER, **filters):
+        """
+        Load the habits which match the filters from the database. The database
+        returns only the matching habits.
+
+        Args:
+            completions (str): COMPLETIONS_EAGER, COMPLETIONS_LAZY or COMPLETIONS_SUMMARY.
+                               Lazy and summary habits are loaded without tracking rows.
+                               Default is COMPLETIONS_EAGER.
+            **filters: The filters, the order and the paging of HabitQuery, for example
+                       frequency, ids, name_like, created_between, order_by, limit, offset.
+
+        Returns:
+            [Habit]: The matching habits.
+
+        Raises:
+            ValueError: Completions must be eager, lazy or summary.
+        """
+        storage = cls.DEFAULT_STORAGE_STRATEGY
+        if completions == cls.COMPLETIONS_EAGER:
+            return [cls.create_from_data(data) for data in storage.query(**filters)]
+        if completions not in (cls.COMPLETIONS_LAZY, cls.COMPLETIONS_SUMMARY):
+            raise ValueError("Completions must be eager, lazy or summary.")
+
+        habits = []
+        for data in storage.query(with_completions=False, **filters):
+            #the loader keeps the storage, which loaded the habit
+            loader = partial(storage.get_completions_between, data["habit_id"],
+                             date.min, date.max)
+            habits.append(cls.create_from_data(
+                data, completed_dates_loader=loader,
+                summary=completions == cls.COMPLETIONS_SUMMARY))
+        return habits
+
+    @classmethod
+    def get_completions_between(cls, habit_id, start, end):
+        """
+        Load the completed dates of the habit in the date range from the database.
+
+        Args:
+            habit_id (int): The id of the habit.
+            start (datetime.date): The first date of the range.
+            end (datetime.date): The last date of the range.
+
+        Returns:
+            [datetime.date]: The sorted completed dates.
+        """
+        return cls.DEFAULT_STORAGE_STRATEGY.get_completions_between(habit_id, start, end)
+
+    @classmethod
+    def count_all(cls):
+        """
+        Count the habits in the database.
+
+        Returns:
+            int: The number of stored habits.
+        """
+        return cls.DEFAULT_STORAGE_STRATEGY.count_habits()
+
+    @classmethod
+    def create_from_data(cls, data, completed_dates_loader=None, summary=False):
+        """
+        Create a habit from the data loaded by the storage strategy.
+
+        Args:
+            data (dict): {"name":, "description":, "frequency": , "completed_dates": ,
+                          "creation_time": , "habit_id": , "streak_state": (optional)}
+            completed_dates_loader (function): Loads the completed dates on first access,
+                                               if they are not in the data. Default is None.
+            summary (bool): The habit is a summary without accessible completed dates.
+                            Default is False.
+
+        Returns:
+            Habit: The habit with the data.
         """
-        all_id = cls.DEFAULT_STORAGE_STRATEGY.get_all_id()
-        return [cls.load(habit_id) for habit_id in all_id]
+        habit = Habit(frequency=data["frequency"], completed_dates=data["completed_dates"],
+                      name=data["name"], description=data["description"],
+                      creation_time=data["creation_time"], habit_id=data["habit_id"],
+                      streak_state=data.get("streak_state"),
+                      completed_dates_loader=completed_dates_loader, summary=summary)
+        #the loaded dates are already stored
+        habit.completion.mark_saved()
+        return habit
 
     @classmethod
     def delete(cls, habit_id):
@@ -157,6 +309,17 @@ class Habit():
             habit["description"] = habit_description
         return habit
 
+    @classmethod
+    def get_longest_streak_of_all(cls):
+        """
+        Get the longest streak of all habits stored in the database
+        without loading the completed dates.
+
+        Returns:
+            int: The value of the longest streak of all habits.
+        """
+        return cls.DEFAULT_STORAGE_STRATEGY.get_longest_streak_of_all()
+
     @classmethod
     def habit_data(cls, habit):
         """
@@ -173,9 +336,11 @@ class Habit():
         if not isinstance(habit,Habit):
             raise TypeError("Object not of type Habit.")
 
+        #the streaks are read from the incrementally maintained streak state
+        current_streak, longest_streak = habit.completion.get_streaks()
         return (habit["habit_id"],
                 habit["name"],
                 habit["description"],
                 habit["frequency"],
-                ana.get_current_streak(habit=habit),
-                ana.get_longest_streak(habit=habit))
+                current_streak,
+                longest_streak)
@@ -0,0 +1,219 @@
+"""
+NAME
+    habit_collection
+
+DESCRIPTION
+    Contains the collection of the loaded habits, which is indexed by habit id and
+    by frequency.
+
+CLASSES
+    HabitCollection
+"""
+
+
+class HabitCollection:
+    """
+    An ordered collection of habits with a dict by habit id and an index by frequency.
+    The habits are looked up by id in constant time and filtered by frequency
+    without a scan over all habits. Iteration and positional access follow the
+    insertion order like a list.
+
+    Args:
+        habits (iterable): The habits of the collection. Default is an empty collection.
+
+    Raises:
+        TypeError: Object not of type Habit.
+        ValueError: Habit has no id.
+        ValueError: There is already a habit with id habit_id in the collection.
+    """
+    def __init__(self, habits=()):
+        self.__habits = {}
+        self.__frequency_index = {}
+        #the habits as list for the positional access, None if changed
+        self.__habit_list = None
+        self.extend(habits)
+
+    def __len__(self):
+        return len(self.__habits)
+
+    def __iter__(self):
+        return iter(self.__habits.values())
+
+    def __contains__(self, habit):
+        try:
+            return self.__habits.get(habit["habit_id"]) is habit
+        except (KeyError,TypeError):
+            return False
+
+    def __getitem__(self, position):
+        if self.__habit_list is None:
+            self.__habit_list = list(self.__habits.values())
+        return self.__habit_list[position]
+
+    def __repr__(self):
+        return f"HabitCollection({list(self.__habits.values())!r})"
+
+    @staticmethod
+    def get_keys(habit):
+        """
+        Returns the habit id and the frequency of the habit.
+
+        Args:
+            habit (Habit): The habit.
+
+        Returns:
+            (int, int): The habit id and the frequency.
+
+        Raises:
+            TypeError: Object not of type Habit.
+            ValueError: Habit has no id.
+        """
+        try:
+            habit_id = habit["habit_id"]
+            frequency = habit["frequency"]
+        except (KeyError,TypeError) as exc:
+            raise TypeError("Object not of type Habit.") from exc
+        if habit_id is None:
+            raise ValueError("Habit has no id.")
+        return habit_id, frequency
+
+    def append(self, habit):
+        """
+        Adds the habit to the end of the collection.
+
+        Args:
+            habit (Habit): The saved habit.
+
+        Raises:
+            TypeError: Object not of type Habit.
+            ValueError: Habit has no id.
+            ValueError: There is already a habit with id habit_id in the collection.
+        """
+        habit_id, frequency = self.get_keys(habit)
+        if habit_id in self.__habits:
+            raise ValueError(f"There is already a habit with id {habit_id} in the collection.")
+        self.__habits[habit_id] = habit
+        self.__frequency_index.setdefault(frequency, {})[habit_id] = habit
+        self.__habit_list = None
+
+    def extend(self, habits):
+        """
+        Adds the habits to the end of the collection.
+
+        Args:
+            habits (iterable): The saved habits.
+
+        Raises:
+            TypeError: Object is not iterable.
+        """
+        try:
+            habits = iter(habits)
+        except TypeError as exc:
+            raise TypeError("Object is not iterable.") from exc
+        for habit in habits:
+            self.append(habit)
+
+    def remove(self, habit_id):
+        """
+        Removes the habit with the id from the collection.
+
+        Args:
+            habit_id (int): The id of the habit.
+
+        Returns:
+            Habit: The removed habit.
+
+        Raises:
+            ValueError: There is no habit with id habit_id in the collection.
+        """
+        try:
+            habit = self.__habits.pop(habit_id)
+        except KeyError as exc:
+            raise ValueError(f"There is no habit with id {habit_id} in the collection.") from exc
+        del self.__frequency_index[habit["frequency"]][habit_id]
+        self.__habit_list = None
+        return habit
+
+    def update(self, habit):
+        """
+        Replaces the habit with the same id at its position or appends the habit
+        if its id is not in the collection.
+
+        Args:
+            habit (Habit): The saved habit.
+
+        Raises:
+            TypeError: Object not of type Habit.
+            ValueError: Habit has no id.
+        """
+        habit_id, frequency = self.get_keys(habit)
+        old_habit = self.__habits.get(habit_id)
+        if old_habit is None:
+            self.append(habit)
+            return
+        self.__habits[habit_id] = habit
+        self.__habit_list = None
+        if old_habit["frequency"] == frequency:
+            #replacing the value keeps the position in the frequency index
+            self.__frequency_index[frequency][habit_id] = habit
+        else:
+            del self.__frequency_index[old_habit["frequency"]][habit_id]
+            #restores the order of the collection in the index of the new frequency
+            self.__frequency_index[frequency] = {
+                key: value for key, value in self.__habits.items()
+                if value["frequency"] == frequency}
+
+    def get(self, habit_id, default=None):
+        """
+        Returns the habit with the id.
+
+        Args:
+            habit_id (int): The id of the habit.
+            default (object): The value if there is no habit with the id. Default is None.
+
+        Returns:
+            Habit: The habit with the id or the default.
+        """
+        return self.__habits.get(habit_id, default)
+
+    def get_many(self, id_list):
+        """
+        Returns the habits with the ids in the order of the ids.
+
+        Args:
+            id_list (list): The ids of the habits.
+
+        Returns:
+            [Habit]: The habits with the ids.
+
+        Raises:
+            ValueError: There is no habit with id habit_id in the collection.
+        """
+        result = []
+        for habit_id in id_list:
+            habit = self.__habits.get(habit_id)
+            if habit is None:
+                raise ValueError(f"There is no habit with id {habit_id} in the collection.")
+            result.append(habit)
+        return result
+
+    def with_frequency(self, frequency):
+        """
+        Returns the habits with the frequency in the order of the collection.
+
+        Args:
+            frequency (int): The periodicity of the habits.
+
+        Returns:
+            [Habit]: The habits with the frequency.
+        """
+        return list(self.__frequency_index.get(frequency, {}).values())
+
+    def get_ids(self):
+        """
+        Returns the ids of the habits.
+
+        Returns:
+            [int]: The ids in the order of the collection.
+        """
+        return list(self.__habits)
@@ -0,0 +1,207 @@
+"""
+NAME
+    habit_query
+
+DESCRIPTION
+    The filters, the order and the paging of a habit query. A query is compiled to the
+    WHERE, ORDER BY and LIMIT clauses of SQLiteStorage, so the database returns only the
+    matching habits, and it can be evaluated on loaded habit data by strategies without
+    database.
+
+CLASSES
+    HabitQuery
+"""
+import json
+import re
+from datetime import date, datetime, time, timedelta
+import scr.analytics as ana
+
+
+class HabitQuery:
+    """
+    The filters of a habit query. All given filters must match.
+
+    Args:
+        frequency (int): Only habits with the frequency. Default is None.
+        ids (iterable): Only habits with the ids. Default is None.
+        name_like (str): Only habits whose name matches the SQL LIKE pattern,
+                         % matches any text and _ one character, case-insensitive
+                         for ASCII letters. Default is None.
+        created_between (tuple): (start, end) of the creation time, datetime.datetime or
+                                 datetime.date which includes the whole day, both inclusive.
+                                 None is open. Default is None.
+        order_by (str): One of ORDER_COLUMNS, descending with the prefix "-".
+                        Equal values are ordered by habit id. Default is "id".
+        limit (int): The maximal number of habits. Default is None for all.
+        offset (int): The number of skipped habits. Default is 0.
+        after_id (int): Only habits with a larger id, to page through the habits
+                        ordered by id without offset. Default is None.
+
+    Attributes:
+        ORDER_COLUMNS (dict): The SQL expression of every order key.
+
+    Raises:
+        ValueError: The order, the limit or the offset is not valid.
+    """
+    ORDER_COLUMNS = {"id": "habit.id",
+                     "name": "name",
+                     "frequency": "frequency",
+                     "creation_time": "creation_time",
+                     "longest_streak": "COALESCE(longest_streak, 0)"}
+
+    def __init__(self, frequency=None, ids=None, name_like=None, created_between=None,
+                 order_by="id", limit=None, offset=0, after_id=None):
+        self.frequency = frequency
+        self.ids = None if ids is None else sorted({int(habit_id) for habit_id in ids})
+        self.name_like = name_like
+        self.order_key = order_by.lstrip("-")
+        self.descending = order_by.startswith("-")
+        if self.order_key not in HabitQuery.ORDER_COLUMNS:
+            raise ValueError(f"Order must be one of {', '.join(HabitQuery.ORDER_COLUMNS)}.")
+        if limit is not None and limit < 0 or offset < 0:
+            raise ValueError("Limit and offset must not be negative.")
+        self.limit = limit
+        self.offset = offset
+        self.after_id = after_id
+        start, end = created_between or (None, None)
+        #the creation time must be >= created_after and < created_before
+        self.created_after = None if start is None else get_start_time(start)
+        self.created_before = None if end is None else get_end_time(end)
+
+    def to_sql(self):
+        """
+        Compiles the query to the clauses after the FROM clause of SQLiteStorage.HABIT_QUERY.
+
+        Returns:
+            (str, list): The WHERE, ORDER BY and LIMIT clauses and their parameters.
+        """
+        conditions, parameters = [], []
+        if self.frequency is not None:
+            conditions.append("frequency = ?")
+            parameters.append(self.frequency)
+        if self.ids is not None:
+            #one parameter for any number of ids
+            conditions.append("habit.id IN (SELECT value FROM json_each(?))")
+            parameters.append(json.dumps(self.ids))
+        if self.name_like is not None:
+            conditions.append("name LIKE ?")
+            parameters.append(self.name_like)
+        if self.created_after is not None:
+            conditions.append("creation_time >= ?")
+            parameters.append(self.created_after.isoformat())
+        if self.created_before is not None:
+            conditions.append("creation_time < ?")
+            parameters.append(self.created_before.isoformat())
+        if self.after_id is not None:
+            conditions.append("habit.id > ?")
+            parameters.append(self.after_id)
+
+        sql = " WHERE " + " AND ".join(conditions) if conditions else ""
+        sql += f" ORDER BY {HabitQuery.ORDER_COLUMNS[self.order_key]}"
+        sql += " DESC" if self.descending else ""
+        sql += ", habit.id" if self.order_key != "id" else ""
+        if self.limit is not None or self.offset:
+            sql += " LIMIT ? OFFSET ?"
+            parameters.extend((-1 if self.limit is None else self.limit, self.offset))
+        return sql, parameters
+
+    def matches(self, data):
+        """
+        Checks the filters against loaded habit data.
+
+        Args:
+            data (dict): The habit data of a storage strategy.
+
+        Returns:
+            bool: True if all filters match.
+        """
+        creation_time = data["creation_time"]
+        return (self.frequency is None or data["frequency"] == self.frequency)\
+            and (self.ids is None or data["habit_id"] in self.ids)\
+            and (self.name_like is None or like_pattern(self.name_like).match(data["name"]))\
+            and (self.created_after is None or creation_time >= self.created_after)\
+            and (self.created_before is None or creation_time < self.created_before)\
+            and (self.after_id is None or data["habit_id"] > self.after_id)
+
+    def apply(self, habit_data):
+        """
+        Filters, orders and pages loaded habit data like the compiled SQL.
+
+        Args:
+            habit_data (list): The habit data of a storage strategy ordered by habit id.
+
+        Returns:
+            [dict]: The matching habit data.
+        """
+        habit_data = [data for data in habit_data if self.matches(data)]
+        if self.order_key == "longest_streak":
+            #the sort is stable, so equal streaks stay ordered by habit id
+            habit_data.sort(key=get_longest_streak, reverse=self.descending)
+        else:
+            key = "habit_id" if self.order_key == "id" else self.order_key
+            habit_data.sort(key=lambda data: data[key], reverse=self.descending)
+        end = None if self.limit is None else self.offset + self.limit
+        return habit_data[self.offset:end]
+
+
+def get_start_time(start):
+    """
+    Returns the first creation time of the range.
+
+    Args:
+        start (datetime.date): The start, a date starts at midnight.
+
+    Returns:
+        datetime.datetime: The start time.
+    """
+    if isinstance(start, datetime):
+        return start
+    return datetime.combine(start, time.min)
+
+
+def get_end_time(end):
+    """
+    Returns the first creation time after the range.
+
+    Args:
+        end (datetime.date): The inclusive end, a date includes the whole day.
+
+    Returns:
+        datetime.datetime: The exclusive end time.
+    """
+    if isinstance(end, datetime):
+        return end + timedelta(microseconds=1)
+    if isinstance(end, date):
+        return datetime.combine(end + timedelta(days=1), time.min)
+    raise TypeError("The range of the creation time must be of type datetime.date.")
+
+
+def like_pattern(pattern):
+    """
+    Translates the SQL LIKE pattern to a regular expression.
+
+    Args:
+        pattern (str): The LIKE pattern.
+
+    Returns:
+        re.Pattern: The regular expression which matches the whole text.
+    """
+    expression = "".join(".*" if char == "%" else "." if char == "_" else re.escape(char)
+                         for char in pattern)
+    return re.compile(expression + r"\Z", re.DOTALL | re.IGNORECASE | re.ASCII)
+
+
+def get_longest_streak(data):
+    """
+    Returns the longest streak of the habit data from its streak state or its dates.
+
+    Args:
+        data (dict): The habit data.
+
+    Returns:
+        int: The longest streak.
+    """
+    state = data.get("streak_state")
+    if state is not None:
+        return state.longest_streak
+    return ana.get_streak_statistics(habit=data).longest_streak
@@ -0,0 +1,122 @@
+"""
+NAME
+    habit_stats
+
+DESCRIPTION
+    Computes, checks and rebuilds the habit_stats table of the habit database from the
+    raw tracking rows. The streaks are computed with the same streak state as the
+    completions, so the stored summary matches the analytics of the loaded habits.
+
+FUNCTIONS
+    compute_habit_stats
+    rebuild_habit_stats
+    check_habit_stats
+"""
+from datetime import date, datetime
+from scr.completion import CompletedDates
+
+STATS_COLUMNS = ("habit_id", "last_period", "last_streak", "longest_streak", "completion_count")
+MAX_VARIABLES = 500
+
+
+def compute_habit_stats(cursor, habit_ids=None):
+    """
+    Computes the stats of the habits from the tracking rows.
+
+    Args:
+        cursor (sqlite3.Cursor): A cursor of the database.
+        habit_ids (list): The ids of the habits. Default is None for all habits.
+
+    Returns:
+        [tuple]: The rows (habit_id, last_period, last_streak, longest_streak,
+                 completion_count) ordered by habit_id.
+    """
+    if habit_ids is None:
+        return query_habit_stats(cursor=cursor, condition="", parameters=())
+    habit_ids = sorted(set(habit_ids))
+    stats = []
+    for start in range(0, len(habit_ids), MAX_VARIABLES):
+        chunk = habit_ids[start:start + MAX_VARIABLES]
+        placeholders = ", ".join("?" * len(chunk))
+        stats.extend(query_habit_stats(cursor=cursor,
+                                       condition=f"WHERE {{column}} IN ({placeholders})",
+                                       parameters=chunk))
+    return stats
+
+
+def query_habit_stats(cursor, condition, parameters):
+    """
+    Queries the habit rows and the tracking rows with the condition and merges them
+    in one pass to the stats of the habits.
+
+    Args:
+        cursor (sqlite3.Cursor): A cursor of the database.
+        condition (str): The WHERE clause with the placeholder {column} for the habit id column.
+        parameters (list): The parameters of the condition.
+
+    Returns:
+        [tuple]: The stats rows ordered by habit_id.
+    """
+    cursor.execute(f"""
+        SELECT id, frequency, creation_time FROM habit {condition.format(column="id")}
+        ORDER BY id
+    """, parameters)
+    habit_rows = cursor.fetchall()
+    cursor.execute(f"""
+        SELECT habit_id, completed_dates FROM tracking {condition.format(column="habit_id")}
+        ORDER BY habit_id, completed_dates
+    """, parameters)
+    completions = {row[0]: [] for row in habit_rows}
+    for habit_id, completed_date in cursor.fetchall():
+        if habit_id in completions:
+            completions[habit_id].append(completed_date)
+
+    stats = []
+    for habit_id, frequency, creation_time in habit_rows:
+        completed_dates = CompletedDates(creation_day=datetime.fromisoformat(creation_time).date(),
+                                         frequency=frequency,
+                                         completed_dates=map(date.fromordinal,
+                                                             completions[habit_id]))
+        stats.append((habit_id,) + tuple(completed_dates.get_streak_state())
+                     + (len(completed_dates),))
+    return stats
+
+
+def rebuild_habit_stats(cursor, habit_ids=None):
+    """
+    Replaces the stats of the habits with the stats computed from the tracking rows.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of a running transaction.
+        habit_ids (list): The ids of the habits. Default is None for all habits.
+    """
+    cursor.executemany(f"""
+        INSERT OR REPLACE INTO habit_stats ({", ".join(STATS_COLUMNS)}) VALUES (?, ?, ?, ?, ?)
+    """, compute_habit_stats(cursor=cursor, habit_ids=habit_ids))
+
+
+def check_habit_stats(cursor, repair=False):
+    """
+    Compares the stored stats of all habits with the stats computed from the tracking rows.
+    Stats without habit are inconsistent, too.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of a running transaction if repair is True.
+        repair (bool): Rebuilds the stats of the inconsistent habits. Default is False.
+
+    Returns:
+        [int]: The ids of the habits with missing or wrong stats.
+    """
+    cursor.execute(f"""
+        SELECT {", ".join(STATS_COLUMNS)} FROM habit_stats ORDER BY habit_id
+    """)
+    stored_stats = {row[0]: row for row in cursor.fetchall()}
+    inconsistent_ids = [row[0] for row in compute_habit_stats(cursor=cursor)
+                        if stored_stats.pop(row[0], None) != row]
+    #the remaining stats belong to no habit
+    orphaned_ids = list(stored_stats)
+    if repair:
+        rebuild_habit_stats(cursor=cursor, habit_ids=inconsistent_ids)
+        cursor.executemany("DELETE FROM habit_stats WHERE habit_id = ?",
+                           [(habit_id,) for habit_id in orphaned_ids])
+    return sorted(inconsistent_ids + orphaned_ids)
@@ -0,0 +1,411 @@
+"""
+NAME
+    memory_storage
+
+DESCRIPTION
+    Strategy to save and load habit data in memory, without database and file system.
+    It follows the semantics of SQLiteStorage, so tests and benchmarks of the model and
+    the analytics can run on it and give the same results.
+
+CLASSES
+    StorageStrategy
+        MemoryStorage
+"""
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime
+from scr.storage_strategy import StorageStrategy
+from scr.completion import CompletedDates, StreakState
+
+#the types which sqlite3 can bind as parameter
+SAVABLE_TYPES = (str, int, float, bytes, type(None))
+
+#the stored streak state and the number of completed dates, like a row of habit_stats
+StoredState = namedtuple("StoredState", StreakState._fields + ("completion_count",))
+
+
+class MemoryStorage(StorageStrategy):
+    """
+    MemoryStorage class saves and loads habit data in dictionaries.
+
+    Like SQLiteStorage, a new habit gets the largest stored id plus one, a saved habit only
+    updates its name and description, completed dates which are already stored are
+    skipped and the streak state of every habit is kept beside its completed dates.
+    The completed dates of a habit are a sorted array of ordinals of datetime.date.
+
+    All calls hold one lock, so the storage can be shared between threads. A transaction
+    holds the lock until its end and restores the stored data on errors from an undo log
+    of the habits which it changed.
+
+    Attributes:
+        MAX_VARIABLES = 500: The default number of habits in a chunk.
+    """
+    MAX_VARIABLES = 500
+
+    def __init__(self):
+        #habit_id: [name, description, frequency, creation_time]
+        self.__habits = {}
+        #habit_id: array of the sorted ordinals of the completed dates
+        self.__completions = {}
+        #habit_id: StoredState of the completed dates
+        self.__stats = {}
+        #sorted habit ids for the chunks
+        self.__habit_ids = []
+        #habit_id: the data of the habit before the transaction, None for new habits,
+        #one log for every open transaction
+        self.__undo_logs = []
+        self.__lock = threading.RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Does nothing, the data stays in memory until the storage is garbage collected.
+        """
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager which runs the calls of the block in one transaction.
+        The data is restored on errors. Nested transactions restore their own changes.
+        Only the habits which are changed in the transaction are copied.
+
+        Yields:
+            MemoryStorage: The storage.
+        """
+        with self.__lock:
+            undo_log = {}
+            self.__undo_logs.append(undo_log)
+            try:
+                yield self
+            except BaseException:
+                self.__undo_logs.pop()
+                self.undo(undo_log)
+                raise
+            self.__undo_logs.pop()
+            if self.__undo_logs:
+                #the changes of a nested transaction are undone with the outer transaction
+                for habit_id, data in undo_log.items():
+                    self.__undo_logs[-1].setdefault(habit_id, data)
+
+    def remember(self, habit_id):
+        """
+        Copies the data of the habit into the undo log of the innermost transaction,
+        before the habit is changed the first time in the transaction.
+
+        Args:
+            habit_id (int): The id of the habit which is changed.
+        """
+        if not self.__undo_logs or habit_id in self.__undo_logs[-1]:
+            return
+        data = None
+        if habit_id in self.__habits:
+            data = (list(self.__habits[habit_id]), array("l", self.__completions[habit_id]),
+                    self.__stats[habit_id])
+        self.__undo_logs[-1][habit_id] = data
+
+    def undo(self, undo_log):
+        """
+        Restores the habits of the undo log.
+
+        Args:
+            undo_log (dict): The data of the habits before the transaction.
+        """
+        for habit_id, data in undo_log.items():
+            if habit_id in self.__habits:
+                self.__habit_ids.pop(bisect_left(self.__habit_ids, habit_id))
+            self.__habits.pop(habit_id, None)
+            self.__completions.pop(habit_id, None)
+            self.__stats.pop(habit_id, None)
+            if data is not None:
+                self.__habits[habit_id], self.__completions[habit_id],\
+                    self.__stats[habit_id] = data
+                insort(self.__habit_ids, habit_id)
+
+    def save(self, habit):
+        """
+        Saves the habit data. Only the completed dates which are not saved yet are inserted.
+
+        Args:
+            habit (habit): The habit which should be saved
+
+        Returns:
+            Habit: The saved habit with its habit id.
+
+        Raises:
+            TypeError: Object is not of type Habit.
+            TypeError: Habit data has wronge type and is not savable.
+            ValueError: ID is not in database.
+        """
+        try:
+            with self.__lock:
+                habit_id = habit["habit_id"]
+                if not isinstance(habit["name"], SAVABLE_TYPES)\
+                   or not isinstance(habit["description"], SAVABLE_TYPES):
+                    raise TypeError("Habit data has wronge type and is not savable.")
+                unsaved_dates = [completed_date.toordinal()
+                                 for completed_date in habit.completion.get_unsaved_dates()
+                                 if isinstance(completed_date, date)]
+                if habit_id:
+                    #Update existing habit data
+                    if habit_id in self.__habits:
+                        self.remember(habit_id)
+                        self.__habits[habit_id][:2] = [habit["name"], habit["description"]]
+                    elif unsaved_dates:
+                        raise ValueError("ID is not in database.")
+                    else:
+                        return habit
+                else:
+                    #Insert new habit data
+                    if not isinstance(habit["creation_time"], datetime):
+                        raise TypeError("Habit data has wronge type and is not savable.")
+                    habit_id = self.__habit_ids[-1] + 1 if self.__habit_ids else 1
+                    self.remember(habit_id)
+                    self.__habits[habit_id] = [habit["name"], habit["description"],
+                                               habit["frequency"], habit["creation_time"]]
+                    self.__completions[habit_id] = array("l")
+                    self.__stats[habit_id] = StoredState(None, 0, 0, 0)
+                    self.__habit_ids.append(habit_id)
+                    habit["habit_id"] = habit_id
+
+                inserted_count = self.insert_completions(habit_id, unsaved_dates)
+                self.update_stats(habit=habit, inserted_count=inserted_count)
+            habit.completion.mark_saved()
+
+        except AttributeError as exc:
+            raise TypeError("Object is not of type Habit.") from exc
+        return habit
+
+    def insert_completions(self, habit_id, ordinals):
+        """
+        Inserts the ordinals into the sorted completions of the habit and skips the
+        ordinals which are already stored.
+
+        Args:
+            habit_id (int): The id of the habit.
+            ordinals (list): The ordinals of the completed dates.
+
+        Returns:
+            int: The number of inserted completions.
+        """
+        completions = self.__completions[habit_id]
+        inserted_count = 0
+        for ordinal in ordinals:
+            #the dates are mostly added in order, so the search starts at the end
+            if not completions or ordinal > completions[-1]:
+                completions.append(ordinal)
+                inserted_count += 1
+                continue
+            index = bisect_left(completions, ordinal)
+            if completions[index] != ordinal:
+                completions.insert(index, ordinal)
+                inserted_count += 1
+        return inserted_count
+
+    def update_stats(self, habit, inserted_count):
+        """
+        Stores the streak state of the saved habit. The state of the habit is only used
+        if the habit holds all stored completed dates, else it is computed from the
+        stored completions.
+
+        Args:
+            habit (Habit): The saved habit.
+            inserted_count (int): The number of completions inserted by the save.
+        """
+        habit_id = habit["habit_id"]
+        completions = self.__completions[habit_id]
+        if not habit.completion.is_loaded():
+            #the dates of a lazy habit are not loaded, so no dates are added by the save
+            return
+        if self.__stats[habit_id].completion_count + inserted_count\
+                == len(habit["completed_dates"]):
+            state = habit["completed_dates"].get_streak_state()
+        else:
+            _, _, frequency, creation_time = self.__habits[habit_id]
+            state = CompletedDates(creation_day=creation_time.date(), frequency=frequency,
+                                   completed_dates=map(date.fromordinal, completions)
+                                   ).get_streak_state()
+        self.__stats[habit_id] = StoredState(*state, len(completions))
+
+    def get_longest_streak_of_all(self):
+        """
+        Returns the longest streak of all habits from the stored streak states.
+
+        Returns:
+            int: The value of the longest streak of all habits.
+        """
+        with self.__lock:
+            return max((state.longest_streak for state in self.__stats.values()), default=0)
+
+    def load_streaks(self):
+        """
+        Returns the current and the longest streak of all habits from the stored
+        streak states, without copying the completed dates.
+
+        Returns:
+            {int: (int, int)}: The current and the longest streak by habit_id.
+        """
+        today = date.today()
+        with self.__lock:
+            streaks = {}
+            for habit_id in self.__habit_ids:
+                _, _, frequency, creation_time = self.__habits[habit_id]
+                state = self.__stats[habit_id]
+                current_period = (today - creation_time.date()).days // frequency
+                streaks[habit_id] = (state.last_streak if state.last_period == current_period
+                                     else 0, state.longest_streak)
+            return streaks
+
+    def load(self, habit_id):
+        """
+        Loads the data of the habit.
+
+        Args: habit_id (int): Id of the habit which should be loaded.
+
+        Returns:
+            habit_data (dict): {"name":, "description":, "frequency": , "completed_dates": ,
+                                "creation_time": , "habit_id": , "streak_state": }
+        """
+        with self.__lock:
+            if habit_id not in self.__habits:
+                return None
+            return self.get_habit_data(habit_id)
+
+    def load_all(self):
+        """
+        Loads the data of all habits.
+
+        Returns:
+            [dict]: The habit data of all habits ordered by habit_id.
+        """
+        with self.__lock:
+            return [self.get_habit_data(habit_id) for habit_id in self.__habit_ids]
+
+    def load_many(self, habit_ids):
+        """
+        Loads the data of the habits with the habit ids.
+
+        Args:
+            habit_ids (list): The ids of the habits which should be loaded.
+
+        Returns:
+            [dict]: The habit data ordered by habit_id. Missing ids are skipped.
+        """
+        with self.__lock:
+            return [self.get_habit_data(habit_id) for habit_id in sorted(set(habit_ids))
+                    if habit_id in self.__habits]
+
+    def iter_all(self, chunk_size=MAX_VARIABLES):
+        """
+        Loads the data of all habits in chunks with load_chunk.
+
+        Args:
+            chunk_size (int): The number of habits in a chunk. Default is MAX_VARIABLES.
+
+        Yields:
+            [dict]: The habit data of the next chunk ordered by habit_id.
+        """
+        chunk = self.load_chunk(chunk_size=chunk_size)
+        while chunk:
+            yield chunk
+            chunk = self.load_chunk(after_id=chunk[-1]["habit_id"], chunk_size=chunk_size)
+
+    def load_chunk(self, after_id=None, chunk_size=MAX_VARIABLES):
+        """
+        Loads the data of the next habits after the habit id.
+
+        Args:
+            after_id (int): The habit id before the chunk. Default is None for the first chunk.
+            chunk_size (int): The maximal number of habits. Default is MAX_VARIABLES.
+
+        Returns:
+            [dict]: The habit data ordered by habit_id, empty after the last habit.
+        """
+        with self.__lock:
+            start = 0 if after_id is None else bisect_left(self.__habit_ids, after_id + 1)
+            return [self.get_habit_data(habit_id)
+                    for habit_id in self.__habit_ids[start:start + chunk_size]]
+
+    def get_completions_between(self, habit_id, start, end):
+        """
+        Returns the completed dates of the habit in the date range by bisecting
+        the sorted ordinals.
+
+        Args:
+            habit_id (int): The id of the habit.
+            start (datetime.date): The first date of the range.
+            end (datetime.date): The last date of the range.
+
+        Returns:
+            [datetime.date]: The sorted completed dates, empty if the habit is not stored.
+        """
+        with self.__lock:
+            ordinals = self.__completions.get(habit_id, ())
+            first = bisect_left(ordinals, start.toordinal())
+            last = bisect_right(ordinals, end.toordinal())
+            return list(map(date.fromordinal, ordinals[first:last]))
+
+    def count_habits(self):
+        """
+        Returns the number of stored habits.
+
+        Returns:
+            int: The number of habits.
+        """
+        return len(self.__habit_ids)
+
+    def get_habit_data(self, habit_id):
+        """
+        Returns a copy of the stored data of the habit.
+
+        Args:
+            habit_id (int): The id of a stored habit.
+
+        Returns:
+            dict: The habit data.
+        """
+        name, description, frequency, creation_time = self.__habits[habit_id]
+        state = self.__stats[habit_id]
+        return {"name" : name,
+                "description" : description,
+                "frequency" : frequency,
+                "completed_dates" : list(map(date.fromordinal, self.__completions[habit_id])),
+                "creation_time" : creation_time,
+                "habit_id" : habit_id,
+                "streak_state" : StreakState(*state[:3])}
+
+    def delete(self, habit_id):
+        """
+        Deletes the habit with its completed dates.
+
+        Args:
+            habit_id (int): Id of the habit which should be deleted.
+
+        Raises:
+            ValueError: ID is not in database.
+        """
+        with self.__lock:
+            if habit_id not in self.__habits:
+                raise ValueError("ID is not in database.")
+            self.remember(habit_id)
+            del self.__habits[habit_id]
+            del self.__completions[habit_id]
+            del self.__stats[habit_id]
+            self.__habit_ids.pop(bisect_left(self.__habit_ids, habit_id))
+
+    def get_all_id(self):
+        """
+        Get the list of all habit_ids of the stored habits.
+
+        Returns:
+            [int]: List of the habit_ids
+        """
+        with self.__lock:
+            return list(self.__habit_ids)
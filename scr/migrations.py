@@ -0,0 +1,281 @@
+"""
+NAME
+    migrations
+
+DESCRIPTION
+    Versioned schema migrations of the habit database.
+
+    The schema version is stored in PRAGMA user_version. Every function in MIGRATIONS
+    upgrades the schema by one version, so a database with user_version n gets the
+    migrations MIGRATIONS[n:]. A database with the current version runs no DDL at all.
+
+FUNCTIONS
+    get_schema_version
+    migrate
+"""
+from contextlib import closing
+from scr.habit_stats import rebuild_habit_stats
+
+
+def create_tables(cursor):
+    """
+    Version 1: Creates the habit and the tracking table, if not exists.
+    Databases created before the versioning already have these tables.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the migration transaction.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS habit (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            frequency INT NOT NULL,
+            creation_time TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tracking (
+            ID INTEGER PRIMARY KEY,
+            habit_id INTEGER,
+            completed_dates TEXT,
+            FOREIGN KEY(habit_id) REFERENCES habit (id)
+        )
+    """)
+
+
+def add_tracking_constraints(cursor):
+    """
+    Version 2: Rebuilds the tracking table with ON DELETE CASCADE and a unique covering
+    index on (habit_id, completed_dates). Duplicated rows, rows without date and rows
+    without habit are removed, the first inserted row of duplicates is kept.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the migration transaction.
+    """
+    cursor.execute("""
+        CREATE TABLE tracking_new (
+            ID INTEGER PRIMARY KEY,
+            habit_id INTEGER NOT NULL,
+            completed_dates TEXT NOT NULL,
+            FOREIGN KEY(habit_id) REFERENCES habit (id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO tracking_new (ID, habit_id, completed_dates)
+        SELECT MIN(ID), habit_id, completed_dates FROM tracking
+        WHERE completed_dates IS NOT NULL AND habit_id IN (SELECT id FROM habit)
+        GROUP BY habit_id, completed_dates
+    """)
+    cursor.execute("DROP TABLE tracking")
+    cursor.execute("ALTER TABLE tracking_new RENAME TO tracking")
+    cursor.execute("""
+        CREATE UNIQUE INDEX tracking_habit_date ON tracking (habit_id, completed_dates)
+    """)
+
+
+def store_dates_as_ordinals(cursor):
+    """
+    Version 3: Stores the completed dates as integer ordinals of datetime.date instead of
+    iso-format text. Texts which are no valid iso-format dates are removed.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the migration transaction.
+    """
+    cursor.execute("""
+        CREATE TABLE tracking_new (
+            ID INTEGER PRIMARY KEY,
+            habit_id INTEGER NOT NULL,
+            completed_dates INTEGER NOT NULL,
+            FOREIGN KEY(habit_id) REFERENCES habit (id) ON DELETE CASCADE
+        )
+    """)
+    #the julian day of 0001-01-01 is 1721425.5 and its ordinal is 1
+    cursor.execute("""
+        INSERT OR IGNORE INTO tracking_new (ID, habit_id, completed_dates)
+        SELECT ID, habit_id, CAST(julianday(completed_dates) - 1721424.5 AS INTEGER)
+        FROM tracking WHERE date(completed_dates) = completed_dates
+    """)
+    cursor.execute("DROP TABLE tracking")
+    cursor.execute("ALTER TABLE tracking_new RENAME TO tracking")
+    cursor.execute("""
+        CREATE UNIQUE INDEX tracking_habit_date ON tracking (habit_id, completed_dates)
+    """)
+
+
+def add_habit_stats(cursor):
+    """
+    Version 4: Creates the habit_stats table, which stores the streak state of every habit
+    beside the habit. Habits without row get their streak state computed on load.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the migration transaction.
+    """
+    cursor.execute("""
+        CREATE TABLE habit_stats (
+            habit_id INTEGER PRIMARY KEY,
+            last_period INTEGER,
+            last_streak INTEGER NOT NULL,
+            longest_streak INTEGER NOT NULL,
+            FOREIGN KEY(habit_id) REFERENCES habit (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def add_completion_count(cursor):
+    """
+    Version 5: Adds the completion count to habit_stats and an index for the longest streak,
+    and rebuilds the stats of all habits from the tracking rows.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the migration transaction.
+    """
+    cursor.execute("""
+        ALTER TABLE habit_stats ADD COLUMN completion_count INTEGER NOT NULL DEFAULT 0
+    """)
+    cursor.execute("""
+        CREATE INDEX habit_stats_longest_streak ON habit_stats (longest_streak)
+    """)
+    rebuild_habit_stats(cursor=cursor)
+
+
+def add_habit_revision(cursor):
+    """
+    Version 6: Adds the revision to the habit table. Triggers set the revision of a habit
+    to the largest revision plus one, when the habit is inserted, its name or description
+    is updated or its stats are written. Every save changes the stats, so the habits
+    changed after a revision are found with the index habit_revision.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the migration transaction.
+    """
+    cursor.execute("""
+        ALTER TABLE habit ADD COLUMN revision INTEGER NOT NULL DEFAULT 0
+    """)
+    cursor.execute("""
+        CREATE INDEX habit_revision ON habit (revision)
+    """)
+    next_revision = "UPDATE habit SET revision = (SELECT MAX(revision) FROM habit) + 1"
+    for name, event, habit_id in (("habit_insert_revision", "INSERT ON habit", "NEW.id"),
+                                  ("habit_update_revision",
+                                   "UPDATE OF name, description ON habit", "NEW.id"),
+                                  ("habit_stats_insert_revision", "INSERT ON habit_stats",
+                                   "NEW.habit_id"),
+                                  ("habit_stats_update_revision", "UPDATE ON habit_stats",
+                                   "NEW.habit_id")):
+        cursor.execute(f"""
+            CREATE TRIGGER {name} AFTER {event}
+            BEGIN {next_revision} WHERE id = {habit_id}; END
+        """)
+
+
+def add_query_indexes(cursor):
+    """
+    Version 7: Adds the indexes of the habit queries by frequency and by creation time.
+    Every index ends with the habit id, so the habits of a frequency are read in the order
+    of their ids.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the migration transaction.
+    """
+    cursor.execute("""
+        CREATE INDEX habit_frequency ON habit (frequency)
+    """)
+    cursor.execute("""
+        CREATE INDEX habit_creation_time ON habit (creation_time)
+    """)
+
+
+def add_revision_counter(cursor):
+    """
+    Version 8: Adds the table habit_revision_counter with one row, which holds the last
+    given revision. The triggers of version 6 are replaced by triggers which increase
+    the counter and set the revision of the habit to it. The largest revision of the
+    habits decreases when the last changed habit is deleted, the counter never does,
+    so a change after the deletion always gets a new revision.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the migration transaction.
+    """
+    cursor.execute("""
+        CREATE TABLE habit_revision_counter (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            revision INTEGER NOT NULL)
+    """)
+    cursor.execute("""
+        INSERT INTO habit_revision_counter (id, revision)
+        SELECT 1, IFNULL(MAX(revision), 0) FROM habit
+    """)
+    next_revision = """
+        UPDATE habit_revision_counter SET revision = revision + 1;
+        UPDATE habit SET revision = (SELECT revision FROM habit_revision_counter)"""
+    for name, event, habit_id in (("habit_insert_revision", "INSERT ON habit", "NEW.id"),
+                                  ("habit_update_revision",
+                                   "UPDATE OF name, description ON habit", "NEW.id"),
+                                  ("habit_stats_insert_revision", "INSERT ON habit_stats",
+                                   "NEW.habit_id"),
+                                  ("habit_stats_update_revision", "UPDATE ON habit_stats",
+                                   "NEW.habit_id")):
+        cursor.execute(f"""
+            DROP TRIGGER IF EXISTS {name}
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER {name} AFTER {event}
+            BEGIN {next_revision} WHERE id = {habit_id}; END
+        """)
+
+
+MIGRATIONS = (create_tables, add_tracking_constraints, store_dates_as_ordinals,
+              add_habit_stats, add_completion_count, add_habit_revision, add_query_indexes,
+              add_revision_counter)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(connection):
+    """
+    Returns the schema version of the database.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database.
+
+    Returns:
+        int: The value of PRAGMA user_version.
+    """
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection):
+    """
+    Upgrades the database to SCHEMA_VERSION in one transaction.
+    Foreign keys are switched off during the migration, because tables are rebuilt.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+                                         in autocommit mode.
+
+    Returns:
+        int: The schema version of the database after the migration.
+    """
+    version = get_schema_version(connection)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    foreign_keys = connection.execute("PRAGMA foreign_keys").fetchone()[0]
+    connection.execute("PRAGMA foreign_keys = OFF")
+    try:
+        with closing(connection.cursor()) as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                #another connection could have migrated the database in the meantime
+                version = get_schema_version(connection)
+                for migration in MIGRATIONS[version:]:
+                    migration(cursor)
+                version = max(version, SCHEMA_VERSION)
+                cursor.execute(f"PRAGMA user_version = {version}")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+    finally:
+        connection.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+    return version
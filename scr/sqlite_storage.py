@@ -8,113 +8,307 @@ DESCRIPTION
 CLASSES
     StorageStrategy
         SQLiteStorage
+    ThreadConnection
 """
 import sqlite3
-from contextlib import closing
+import threading
+import weakref
+from contextlib import closing, contextmanager
 from datetime import date, datetime
 from scr.storage_strategy import StorageStrategy
+from scr.completion import StreakState
+from scr.habit_query import HabitQuery
+from scr import habit_stats, migrations
 
 class SQLiteStorage(StorageStrategy):
     """ SQLiteStorage class save and load habit data to the database.
 
-        Create the tables in the database, if not exists:
+        Creates or upgrades the tables in the database with the migrations module:
             
-            habit (habit (id INTEGER PRIMARY KEY, name TEXT NOT NULL,
-            description TEXT NOT NULL, frequency INT NOT NULL)
+            habit (id INTEGER PRIMARY KEY, name TEXT NOT NULL,
+            description TEXT NOT NULL, frequency INT NOT NULL, creation_time TEXT NOT NULL,
+            revision INTEGER NOT NULL DEFAULT 0)
+            with the indexes habit_revision (revision), habit_frequency (frequency)
+            and habit_creation_time (creation_time) and triggers which set
+            the revision of a habit to the increased counter on every change
+
+            habit_revision_counter (id INTEGER PRIMARY KEY CHECK (id = 1),
+            revision INTEGER NOT NULL)
+            with one row that holds the last given revision
+
+            tracking (ID INTEGER PRIMARY KEY, habit_id INTEGER NOT NULL,
+             completed_dates INTEGER NOT NULL,
+             FOREIGN KEY(habit_id) REFERENCES habit (id) ON DELETE CASCADE)
+             with the unique index tracking_habit_date (habit_id, completed_dates)
+
+            habit_stats (habit_id INTEGER PRIMARY KEY, last_period INTEGER,
+             last_streak INTEGER NOT NULL, longest_streak INTEGER NOT NULL,
+             completion_count INTEGER NOT NULL,
+             FOREIGN KEY(habit_id) REFERENCES habit (id) ON DELETE CASCADE)
+             with the index habit_stats_longest_streak (longest_streak)
+
+        The completed dates are stored as ordinals of datetime.date.
+
+        Every thread gets its own long-lived connection, which is opened on first use
+        and configured with the pragmas. Creating the storage does not touch the database.
+        The connections are closed with close() or when the storage is used as context
+        manager. The connection of a thread is also closed when the thread ends.
 
-            tracking (ID INTEGER PRIMARY KEY, habit_id INTEGER, completed_dates TEXT,
-             FOREIGN KEY(habit_id) REFERENCES habit (id))
-    
         Args:
             data_base (str): The name of the used database. Default is DB_NAME
+            pragmas (dict): Pragmas which override DEFAULT_PRAGMAS. Default is None.
+            cached_statements (int): The size of the statement cache of each connection.
+                                     Default is CACHED_STATEMENTS.
         Attributes:
             DB_NAME = "scr/habits.db"
+            MAX_VARIABLES = 500: The maximal number of ids bound to one query.
+            HABIT_QUERY (str): The query of the habit rows with their streak state.
+            DEFAULT_PRAGMAS (dict): The pragmas set on every new connection.
+            CACHED_STATEMENTS = 128: The default size of the statement cache.
     """
 
     DB_NAME = "scr/habits.db"
+    MAX_VARIABLES = 500
+    HABIT_QUERY = """
+        SELECT habit.id, name, description, frequency, creation_time,
+               last_period, last_streak, longest_streak
+        FROM habit LEFT JOIN habit_stats ON habit_stats.habit_id = habit.id
+    """
+    DEFAULT_PRAGMAS = {"journal_mode": "WAL",
+                       "synchronous": "NORMAL",
+                       "cache_size": -8000,
+                       "mmap_size": 67108864,
+                       "foreign_keys": "ON"}
+    CACHED_STATEMENTS = 128
 
-
-    def __init__(self, data_base = DB_NAME):
+    def __init__(self, data_base = DB_NAME, pragmas = None,
+                 cached_statements = CACHED_STATEMENTS):
         self.__data_base = data_base
-        with closing(sqlite3.connect(self.__data_base)) as connect:
-            with closing(connect.cursor()) as cursor:
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS habit (
-                        id INTEGER PRIMARY KEY,
-                        name TEXT NOT NULL,
-                        description TEXT NOT NULL,
-                        frequency INT NOT NULL,
-                        creation_time TEXT NOT NULL
-                    )
-                """)
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS tracking (
-                        ID INTEGER PRIMARY KEY,
-                        habit_id INTEGER,
-                        completed_dates TEXT,
-                        FOREIGN KEY(habit_id) REFERENCES habit (id)
-                    )"""
-                )
-            connect.commit()
+        self.__pragmas = dict(SQLiteStorage.DEFAULT_PRAGMAS)
+        if pragmas:
+            self.__pragmas.update(pragmas)
+        self.__cached_statements = cached_statements
+        #the open connections of all threads, a connection is removed when its thread ends
+        self.__connections = weakref.WeakSet()
+        self.__lock = threading.Lock()
+        #the connection and the transaction depth of the current thread
+        self.__local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_connection(self):
+        """
+        Returns the connection of the current thread and opens it if not exists.
+        A new connection migrates the database to the current schema, so the database
+        is neither opened nor created before the first use of the storage.
+
+        Returns:
+            sqlite3.Connection: The connection in autocommit mode. Transactions are
+                                started with transaction().
+        """
+        connection = getattr(self.__local, "connection", None)
+        if connection is not None and not connection.closed:
+            return connection.connect
+        connect = sqlite3.connect(self.__data_base, isolation_level=None,
+                                  check_same_thread=False,
+                                  cached_statements=self.__cached_statements)
+        for name, value in self.__pragmas.items():
+            connect.execute(f"PRAGMA {name} = {value}")
+        try:
+            #a current database runs only one PRAGMA
+            migrations.migrate(connect)
+        except BaseException:
+            connect.close()
+            raise
+        #the thread local storage is released when the thread ends, which closes the connection
+        self.__local.connection = ThreadConnection(connect)
+        with self.__lock:
+            self.__connections.add(self.__local.connection)
+        return connect
+
+    def close(self):
+        """
+        Closes the connections of all threads. The next call opens new connections.
+        """
+        with self.__lock:
+            connections = list(self.__connections)
+            self.__connections.clear()
+        for connection in connections:
+            connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager which runs the statements of the block in one transaction.
+        The transaction is committed at the end of the block and rolled back on errors.
+        Nested transactions of the same thread are run as savepoints.
+
+        Yields:
+            sqlite3.Cursor: The cursor of the connection of the current thread.
+        """
+        connect = self.get_connection()
+        depth = getattr(self.__local, "depth", 0)
+        savepoint = f"level_{depth}"
+        with closing(connect.cursor()) as cursor:
+            cursor.execute(f"SAVEPOINT {savepoint}" if depth else "BEGIN IMMEDIATE")
+            self.__local.depth = depth + 1
+            try:
+                yield cursor
+            except BaseException:
+                if depth:
+                    cursor.execute(f"ROLLBACK TO {savepoint}")
+                    cursor.execute(f"RELEASE {savepoint}")
+                else:
+                    cursor.execute("ROLLBACK")
+                raise
+            else:
+                cursor.execute(f"RELEASE {savepoint}" if depth else "COMMIT")
+            finally:
+                self.__local.depth = depth
 
     def save(self, habit):
         """
-        Saves the habit data to the database.
+        Saves the habit data to the database. Only the completed dates which are
+        not saved yet are inserted, so the cost grows with the new dates and not
+        with the stored history.
         
         Args:
             habit (habit): The habit which should be saved
 
+        Returns:
+            Habit: The saved habit with its habit id.
+
         Raises:
             TypeError: Object is not of type Habit.
             TypeError: Habit data has wronge type and is not savable.
+            ValueError: ID is not in database.
         """
         try:
-            with closing(sqlite3.connect(self.__data_base)) as connect:
-                with closing(connect.cursor()) as cursor:
-                    if habit["habit_id"]:
-                        #Update existing habit data
-                        try:
-                            cursor.execute("""
-                                        UPDATE habit SET name = ?, description = ? WHERE id = ?
-                                        """,(habit["name"],
-                                             habit["description"],
-                                             habit["habit_id"]))
-                        except sqlite3.ProgrammingError as exc:
-                            raise TypeError\
-                                ("Habit data has wronge type and is not savable.")from exc
-
-                    else:
-                        #Insert new habit data
-                        try:
-                            cursor.execute("""
-                                        INSERT INTO habit (name, description, frequency, creation_time) VALUES (?, ?, ?, ?)
-                                        """,
-                                        (habit["name"], habit["description"], habit["frequency"],
-                                        habit["creation_time"].isoformat()))
-                            habit["habit_id"] = cursor.lastrowid
-                        except sqlite3.ProgrammingError as exc:
-                            raise TypeError\
-                                ("Habit data has wronge type and is not savable.") from exc
-
-                    #get existing completions
-                    cursor.execute("""
-                                SELECT completed_dates FROM tracking WHERE habit_id = ?
-                                """, (habit["habit_id"],))
-                    existing_dates = {row[0] for row in cursor.fetchall()}
-
-                    #Insert new completions in the database
-                    for date_value in [d for d in habit["completed_dates"]
-                                    if d not in self.isoformat_to_datetime(existing_dates)\
-                                        and isinstance(d, date)]:
+            with self.transaction() as cursor:
+                if habit["habit_id"]:
+                    #Update existing habit data
+                    try:
                         cursor.execute("""
-                                    INSERT INTO tracking (habit_id, completed_dates) VALUES (?, ?)
-                                    """, (habit["habit_id"], date_value.isoformat()))
+                                    UPDATE habit SET name = ?, description = ? WHERE id = ?
+                                    """,(habit["name"],
+                                         habit["description"],
+                                         habit["habit_id"]))
+                    except sqlite3.ProgrammingError as exc:
+                        raise TypeError\
+                            ("Habit data has wronge type and is not savable.")from exc
 
-                connect.commit()
+                else:
+                    #Insert new habit data
+                    try:
+                        cursor.execute("""
+                                    INSERT INTO habit (name, description, frequency, creation_time) VALUES (?, ?, ?, ?)
+                                    """,
+                                    (habit["name"], habit["description"], habit["frequency"],
+                                    habit["creation_time"].isoformat()))
+                        habit["habit_id"] = cursor.lastrowid
+                    except sqlite3.ProgrammingError as exc:
+                        raise TypeError\
+                            ("Habit data has wronge type and is not savable.") from exc
+
+                #only the dates added since the last save or load have to be inserted,
+                #the unique index skips the dates which are already stored
+                try:
+                    cursor.executemany("""
+                            INSERT OR IGNORE INTO tracking (habit_id, completed_dates) VALUES (?, ?)
+                            """, [(habit["habit_id"], d.toordinal())
+                                  for d in habit.completion.get_unsaved_dates()
+                                  if isinstance(d, date)])
+                except sqlite3.IntegrityError as exc:
+                    #the foreign key fails if the habit id is not stored
+                    raise ValueError("ID is not in database.") from exc
+                self.update_stats(cursor=cursor, habit=habit, inserted_count=cursor.rowcount)
+            habit.completion.mark_saved()
 
         except AttributeError as exc:
             raise TypeError("Object is not of type Habit.") from exc
+        return habit
+
+
+    def update_stats(self, cursor, habit, inserted_count):
+        """
+        Stores the streak state and the completion count of the saved habit in habit_stats.
+        The state of the habit is only used if the habit holds all stored completed dates,
+        else the stats are rebuilt from the tracking rows.
 
+        Args:
+            cursor (sqlite3.Cursor): The cursor of the save transaction.
+            habit (Habit): The saved habit.
+            inserted_count (int): The number of completions inserted by the save.
+        """
+        cursor.execute("""
+            SELECT completion_count FROM habit_stats WHERE habit_id = ?
+        """, (habit["habit_id"],))
+        row = cursor.fetchone()
+        if row and not habit.completion.is_loaded():
+            #the dates of a lazy habit are not loaded, so no dates are added by the save
+            return
+        if row and row[0] + inserted_count == len(habit["completed_dates"]):
+            cursor.execute("""
+                UPDATE habit_stats SET last_period = ?, last_streak = ?, longest_streak = ?,
+                completion_count = ? WHERE habit_id = ?
+            """, tuple(habit["completed_dates"].get_streak_state())
+                 + (len(habit["completed_dates"]), habit["habit_id"]))
+        else:
+            habit_stats.rebuild_habit_stats(cursor=cursor, habit_ids=[habit["habit_id"]])
+
+    def get_longest_streak_of_all(self):
+        """
+        Returns the longest streak of all habits with one indexed query on habit_stats.
+
+        Returns:
+            int: The value of the longest streak of all habits.
+        """
+        with closing(self.get_connection().cursor()) as cursor:
+            cursor.execute("""
+                SELECT MAX(longest_streak) FROM habit_stats
+            """)
+            return cursor.fetchone()[0] or 0
+
+    def load_streaks(self):
+        """
+        Returns the current and the longest streak of all habits from habit_stats
+        with one query, without loading the completed dates.
+
+        Returns:
+            {int: (int, int)}: The current and the longest streak by habit_id.
+        """
+        today = date.today()
+        with closing(self.get_connection().cursor()) as cursor:
+            cursor.execute("""
+                SELECT habit.id, frequency, creation_time, last_period, last_streak,
+                       longest_streak
+                FROM habit JOIN habit_stats ON habit_stats.habit_id = habit.id
+            """)
+            streaks = {}
+            for habit_id, frequency, creation_time, last_period, last_streak, longest_streak\
+                    in cursor.fetchall():
+                current_period = (today - datetime.fromisoformat(creation_time).date()).days\
+                    // frequency
+                streaks[habit_id] = (last_streak if last_period == current_period else 0,
+                                     longest_streak)
+            return streaks
+
+    def check_stats(self, repair=False):
+        """
+        Checks the stats of all habits against the tracking rows.
+
+        Args:
+            repair (bool): Rebuilds the inconsistent stats. Default is False.
+
+        Returns:
+            [int]: The ids of the habits with missing or wrong stats.
+        """
+        with self.transaction() as cursor:
+            return habit_stats.check_habit_stats(cursor=cursor, repair=repair)
 
     def load(self, habit_id):
         """
@@ -123,74 +317,267 @@ class SQLiteStorage(StorageStrategy):
         Args: habit_id (int): Id of the habit which should be loaded.
 
         Returns:
-            habit_data (dict): {"name":, "description":,
-                                "frequency": , "completed_dates": , "habit_id": }
-        """
-        with closing(sqlite3.connect(self.__data_base)) as connect:
-            with closing(connect.cursor()) as cursor:
-                #fetch habit data
-                cursor.execute("""
-                    SELECT name, description, frequency, creation_time FROM habit WHERE id = ?
-                """, (habit_id,))
-                result = cursor.fetchone()
-                if not result:
-                    return None
-
-                cursor.execute("""
-                    SELECT completed_dates FROM tracking WHERE habit_id = ?
-                """, (habit_id,))
-                completed_dates = self.isoformat_to_datetime([row[0] for row in cursor.fetchall()])
-                return {"name" : result[0],
-                        "description" : result[1],
-                        "frequency" : result[2],
-                        "completed_dates" : completed_dates,
-                        "creation_time" : datetime.fromisoformat(result[3]),
-                        "habit_id" : habit_id
-                        }
+            habit_data (dict): {"name":, "description":, "frequency": , "completed_dates": ,
+                                "creation_time": , "habit_id": , "streak_state": }
+        """
+        with closing(self.get_connection().cursor()) as cursor:
+            #fetch habit data
+            cursor.execute(SQLiteStorage.HABIT_QUERY + """
+                WHERE habit.id = ?
+            """, (habit_id,))
+            habit_rows = cursor.fetchall()
+            if not habit_rows:
+                return None
 
+            cursor.execute("""
+                SELECT habit_id, completed_dates FROM tracking WHERE habit_id = ?
+                ORDER BY completed_dates
+            """, (habit_id,))
+            return self.group_habit_data(habit_rows, cursor.fetchall())[0]
 
-    def delete(self, habit_id):
+    def load_all(self):
         """
-        Deletes the data with this habit_id
+        Loads the data of all habits from the database with two queries.
+
+        Returns:
+            [dict]: The habit data of all habits ordered by habit_id.
+        """
+        with closing(self.get_connection().cursor()) as cursor:
+            cursor.execute(SQLiteStorage.HABIT_QUERY + """
+                ORDER BY habit.id
+            """)
+            habit_rows = cursor.fetchall()
+            cursor.execute("""
+                SELECT habit_id, completed_dates FROM tracking ORDER BY habit_id, completed_dates
+            """)
+            return self.group_habit_data(habit_rows, cursor.fetchall())
+
+    def load_many(self, habit_ids):
+        """
+        Loads the data of the habits with the habit ids from the database.
+        The ids are fetched in chunks of MAX_VARIABLES with two queries per chunk.
 
         Args:
-            habit_id (int): Id of the habit which should be deleted.
+            habit_ids (list): The ids of the habits which should be loaded.
+
+        Returns:
+            [dict]: The habit data ordered by habit_id. Missing ids are skipped.
+        """
+        habit_ids = sorted(set(habit_ids))
+        habit_data = []
+        with closing(self.get_connection().cursor()) as cursor:
+            for start in range(0, len(habit_ids), SQLiteStorage.MAX_VARIABLES):
+                chunk = habit_ids[start:start + SQLiteStorage.MAX_VARIABLES]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(SQLiteStorage.HABIT_QUERY + f"""
+                    WHERE habit.id IN ({placeholders}) ORDER BY habit.id
+                """, chunk)
+                habit_rows = cursor.fetchall()
+                cursor.execute(f"""
+                    SELECT habit_id, completed_dates FROM tracking
+                    WHERE habit_id IN ({placeholders}) ORDER BY habit_id, completed_dates
+                """, chunk)
+                habit_data.extend(self.group_habit_data(habit_rows, cursor.fetchall()))
+        return habit_data
+
+    def iter_all(self, chunk_size=MAX_VARIABLES):
+        """
+        Loads the data of all habits in chunks with load_chunk, so the first chunk
+        is available before the others are read.
+
+        Args:
+            chunk_size (int): The number of habits in a chunk. Default is MAX_VARIABLES.
+
+        Yields:
+            [dict]: The habit data of the next chunk ordered by habit_id.
+        """
+        chunk = self.load_chunk(chunk_size=chunk_size)
+        while chunk:
+            yield chunk
+            chunk = self.load_chunk(after_id=chunk[-1]["habit_id"], chunk_size=chunk_size)
+
+    def load_chunk(self, after_id=None, chunk_size=MAX_VARIABLES):
+        """
+        Loads the data of the next habits after the habit id with two queries,
+        the habit rows and the completed dates in the range of their ids.
+
+        Args:
+            after_id (int): The habit id before the chunk. Default is None for the first chunk.
+            chunk_size (int): The maximal number of habits. Default is MAX_VARIABLES.
+
+        Returns:
+            [dict]: The habit data ordered by habit_id, empty after the last habit.
+        """
+        with closing(self.get_connection().cursor()) as cursor:
+            if after_id is None:
+                cursor.execute(SQLiteStorage.HABIT_QUERY + """
+                    ORDER BY habit.id LIMIT ?
+                """, (chunk_size,))
+            else:
+                cursor.execute(SQLiteStorage.HABIT_QUERY + """
+                    WHERE habit.id > ? ORDER BY habit.id LIMIT ?
+                """, (after_id, chunk_size))
+            habit_rows = cursor.fetchall()
+            if not habit_rows:
+                return []
+            cursor.execute("""
+                SELECT habit_id, completed_dates FROM tracking
+                WHERE habit_id BETWEEN ? AND ? ORDER BY habit_id, completed_dates
+            """, (habit_rows[0][0], habit_rows[-1][0]))
+            return self.group_habit_data(habit_rows, cursor.fetchall())
+
+    def query(self, with_completions=True, **filters):
+        """
+        Loads the habits which match the filters with one query. The filters, the order and
+        the paging are compiled to SQL, so only the matching habits are read.
+
+        Args:
+            with_completions (bool): Loads the completed dates of the habits, else they are
+                                     None. Default is True.
+            **filters: The filters, the order and the paging of HabitQuery.
+
+        Returns:
+            [dict]: The habit data of the matching habits.
 
         Raises:
-            ValueError: ID is not in database.
+            ValueError: The order, the limit or the offset is not valid.
         """
-        if not habit_id in self.get_all_id():
-            raise ValueError("ID is not in database.")
-        with closing(sqlite3.connect(self.__data_base)) as connect:
-            with closing(connect.cursor()) as cursor:
-                cursor.execute("""
-                    DELETE FROM tracking WHERE habit_id = ?
-                """, (habit_id,))
-                cursor.execute("""
-                    DELETE FROM habit WHERE id = ?
-                """, (habit_id,))
-            connect.commit()
+        condition, parameters = HabitQuery(**filters).to_sql()
+        with closing(self.get_connection().cursor()) as cursor:
+            cursor.execute(SQLiteStorage.HABIT_QUERY + condition, parameters)
+            habit_rows = cursor.fetchall()
+            if not with_completions:
+                return [dict(data, completed_dates=None)
+                        for data in self.group_habit_data(habit_rows, [])]
+            habit_ids = sorted(row[0] for row in habit_rows)
+            tracking_rows = []
+            for start in range(0, len(habit_ids), SQLiteStorage.MAX_VARIABLES):
+                chunk = habit_ids[start:start + SQLiteStorage.MAX_VARIABLES]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT habit_id, completed_dates FROM tracking
+                    WHERE habit_id IN ({placeholders}) ORDER BY habit_id, completed_dates
+                """, chunk)
+                tracking_rows.extend(cursor.fetchall())
+            return self.group_habit_data(habit_rows, tracking_rows)
 
-    def isoformat_to_datetime(self, completed_dates):
+    def get_completions_between(self, habit_id, start, end):
         """
-        Transform the dates of the list from iso-format into datetime.date-format.
+        Loads the completed dates of the habit in the date range with the index
+        tracking_habit_date, so the cost depends on the size of the range and not
+        on the history of the habit.
 
         Args:
-            completed_dates (list): The list of the dates that should
-                                    be transformed into datetime.date.
+            habit_id (int): The id of the habit.
+            start (datetime.date): The first date of the range.
+            end (datetime.date): The last date of the range.
 
         Returns:
-            [datetime.date]: The list of the dates in datetime.date-format.
+            [datetime.date]: The sorted completed dates, empty if the habit is not stored.
         """
-        transformed_dates = []
-        for date_value in completed_dates:
-            try:
-                transformed_dates.append(date.fromisoformat(date_value))
-            except (TypeError, ValueError):
-                #Continues because invalide data should be deleted from the insert data.
-                continue
-        return transformed_dates
+        cursor = self.get_connection().execute("""
+            SELECT completed_dates FROM tracking
+            WHERE habit_id = ? AND completed_dates BETWEEN ? AND ?
+            ORDER BY completed_dates
+        """, (habit_id, start.toordinal(), end.toordinal()))
+        with closing(cursor):
+            return [date.fromordinal(row[0]) for row in cursor.fetchall()]
+
+    def count_habits(self):
+        """
+        Returns the number of habits in the database.
+
+        Returns:
+            int: The number of habits.
+        """
+        return self.get_connection().execute("SELECT COUNT(*) FROM habit").fetchone()[0]
+
+    def get_data_version(self):
+        """
+        Returns the data version of the connection of the current thread. It changes when
+        another connection commits changes, even from another process, but not with the
+        changes of the connection itself.
+
+        Returns:
+            int: The value of PRAGMA data_version.
+        """
+        return self.get_connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def get_revision(self):
+        """
+        Returns the last given revision from the one row of habit_revision_counter.
+
+        Returns:
+            int: The revision of the last change, 0 if no habit is changed.
+        """
+        return self.get_connection().execute("SELECT revision FROM habit_revision_counter"
+                                             ).fetchone()[0]
+
+    def load_changed(self, after_revision):
+        """
+        Loads the habits which are changed after the revision.
 
+        Args:
+            after_revision (int): The revision of the last known change.
+
+        Returns:
+            (int, [dict]): The current revision and the habit data of the changed habits
+                           ordered by habit_id. The changes after the current revision
+                           are loaded by the next call.
+        """
+        revision = self.get_revision()
+        if revision <= after_revision:
+            return after_revision, []
+        with closing(self.get_connection().cursor()) as cursor:
+            cursor.execute("""
+                SELECT id FROM habit WHERE revision > ? AND revision <= ?
+            """, (after_revision, revision))
+            habit_ids = [row[0] for row in cursor.fetchall()]
+        return revision, self.load_many(habit_ids)
+
+    def group_habit_data(self, habit_rows, tracking_rows):
+        """
+        Groups the tracking rows to their habit rows in a single pass.
+
+        Args:
+            habit_rows (list): Rows of HABIT_QUERY.
+            tracking_rows (list): Rows of (habit_id, completed_dates).
+
+        Returns:
+            [dict]: The habit data in the order of the habit rows.
+        """
+        completions = {row[0]: [] for row in habit_rows}
+        for habit_id, completed_date in tracking_rows:
+            #tracking rows without habit are ignored
+            if habit_id in completions:
+                completions[habit_id].append(completed_date)
+
+        return [{"name" : name,
+                 "description" : description,
+                 "frequency" : frequency,
+                 "completed_dates" : list(map(date.fromordinal, completions[habit_id])),
+                 "creation_time" : datetime.fromisoformat(creation_time),
+                 "habit_id" : habit_id,
+                 "streak_state" : None if state[1] is None else StreakState(*state)
+                 } for habit_id, name, description, frequency, creation_time, *state in habit_rows]
+
+    def delete(self, habit_id):
+        """
+        Deletes the data with this habit_id
+
+        Args:
+            habit_id (int): Id of the habit which should be deleted.
+
+        Raises:
+            ValueError: ID is not in database.
+        """
+        with self.transaction() as cursor:
+            #the completions are deleted by ON DELETE CASCADE
+            cursor.execute("""
+                DELETE FROM habit WHERE id = ?
+            """, (habit_id,))
+            if not cursor.rowcount:
+                raise ValueError("ID is not in database.")
 
     def get_all_id(self):
         """
@@ -199,9 +586,36 @@ class SQLiteStorage(StorageStrategy):
         Returns:
             [int]: List of the habit_ids
         """
-        with closing(sqlite3.connect(self.__data_base)) as connect:
-            with closing(connect.cursor()) as cursor:
-                cursor.execute("""
-                    SELECT id FROM habit
-                """)
-                return [row[0] for row in cursor.fetchall()]
+        with closing(self.get_connection().cursor()) as cursor:
+            cursor.execute("""
+                SELECT id FROM habit
+            """)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class ThreadConnection:
+    """
+    The connection of a thread, which is kept in the thread local storage of SQLiteStorage.
+    It is closed when the thread ends and releases its local storage.
+
+    Args:
+        connect (sqlite3.Connection): The connection.
+
+    Attributes:
+        connect (sqlite3.Connection): The connection.
+        closed (bool): True after the connection is closed.
+    """
+    def __init__(self, connect):
+        self.connect = connect
+        self.closed = False
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        if not self.closed:
+            self.closed = True
+            self.connect.close()
@@ -0,0 +1,162 @@
+"""
+NAME
+    storage_executor
+
+DESCRIPTION
+    Runs the storage calls of the GUI in one worker thread, so a slow disk or a locked
+    database does not freeze the Tk main loop. The requests are executed in the order
+    of submission by a single writer thread. Every request returns a
+    concurrent.futures.Future and its callbacks are delivered on the Tk thread by
+    polling with after().
+
+CLASSES
+    StorageExecutor
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class StorageExecutor:
+    """
+    A single worker thread with a request queue for the storage calls of the GUI.
+
+    Args:
+        master (tkinter.Misc): The widget whose after() delivers the callbacks on the Tk thread.
+        on_pending (function): Called on the Tk thread with the number of pending requests
+                               whenever it changes. Default is None.
+        poll_interval (int): The milliseconds between two polls of the finished requests.
+                             Default is POLL_INTERVAL.
+
+    Attributes:
+        POLL_INTERVAL (int): The default milliseconds between two polls.
+        pending (int): The number of submitted requests whose callbacks are not delivered yet,
+                       without the background requests.
+    """
+    POLL_INTERVAL = 20
+
+    def __init__(self, master, on_pending=None, poll_interval=POLL_INTERVAL):
+        self.__master = master
+        self.__on_pending = on_pending
+        self.__poll_interval = poll_interval
+        self.__requests = queue.Queue()
+        self.__finished = queue.Queue()
+        self.__after_id = None
+        self.__closed = False
+        self.pending = 0
+        #all requests whose callbacks are not delivered yet, with the background requests
+        self.__unfinished = 0
+        self.__thread = threading.Thread(target=self.run, name="storage-executor", daemon=True)
+        self.__thread.start()
+
+    def submit(self, function, *args, callback=None, error_callback=None, background=False,
+               **kwargs):
+        """
+        Queues the storage call for the worker thread.
+
+        Args:
+            function (function): The storage call.
+            *args: The positional arguments of the call.
+            callback (function): Called on the Tk thread with the result. Default is None.
+            error_callback (function): Called on the Tk thread with the exception of the call.
+                                       Default is None, then the exception is raised
+                                       in the Tk thread.
+            background (bool): The request is not counted in pending, so periodic checks
+                               do not show the app as busy. Default is False.
+            **kwargs: The keyword arguments of the call.
+
+        Returns:
+            concurrent.futures.Future: The future of the result.
+
+        Raises:
+            RuntimeError: The storage executor is shut down.
+        """
+        if self.__closed:
+            raise RuntimeError("The storage executor is shut down.")
+        future = Future()
+        self.__requests.put((future, function, args, kwargs, callback, error_callback,
+                             background))
+        self.__unfinished += 1
+        if not background:
+            self.set_pending(self.pending + 1)
+        if self.__after_id is None:
+            self.__after_id = self.__master.after(self.__poll_interval, self.poll)
+        return future
+
+    def run(self):
+        """
+        Executes the queued requests one after another. It runs in the worker thread
+        and must not use any widget.
+        """
+        while True:
+            request = self.__requests.get()
+            if request is None:
+                return
+            future, function, args, kwargs, callback, error_callback, background = request
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function(*args, **kwargs))
+                except BaseException as exc: #pylint: disable=broad-exception-caught
+                    future.set_exception(exc)
+            self.__finished.put((future, callback, error_callback, background))
+
+    def poll(self):
+        """
+        Delivers the callbacks of the finished requests on the Tk thread and polls again
+        while requests are pending.
+
+        Raises:
+            Exception: The exception of a request without error callback.
+        """
+        self.__after_id = None
+        try:
+            while True:
+                try:
+                    future, callback, error_callback, background = self.__finished.get_nowait()
+                except queue.Empty:
+                    break
+                self.__unfinished -= 1
+                if not background:
+                    self.set_pending(self.pending - 1)
+                if future.cancelled():
+                    continue
+                exception = future.exception()
+                if exception is None:
+                    if callback is not None:
+                        callback(future.result())
+                elif error_callback is not None:
+                    error_callback(exception)
+                else:
+                    raise exception
+        finally:
+            if self.__unfinished and self.__after_id is None:
+                self.__after_id = self.__master.after(self.__poll_interval, self.poll)
+
+    def set_pending(self, pending):
+        """
+        Sets the number of pending requests and reports it to on_pending.
+
+        Args:
+            pending (int): The number of pending requests.
+        """
+        self.pending = pending
+        if self.__on_pending is not None:
+            self.__on_pending(pending)
+
+    def shutdown(self, wait=True):
+        """
+        Stops the worker thread after the queued requests. The callbacks of the requests
+        which finish after the shutdown are not delivered.
+
+        Args:
+            wait (bool): Waits until the queued requests are executed. Default is True.
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        if self.__after_id is not None:
+            self.__master.after_cancel(self.__after_id)
+            self.__after_id = None
+        self.__requests.put(None)
+        if wait:
+            self.__thread.join()
@@ -10,12 +10,15 @@ CLASSES
         StorageStrategy
 """
 from abc import ABC, abstractmethod
+import scr.analytics as ana
+from scr.completion import CompletedDates
+from scr.habit_query import HabitQuery
 
 class StorageStrategy(ABC):
     """abstract class to set the methods for the storag strategy"""
     @abstractmethod
     def save(self, habit):
-        """save the habit"""
+        """save the habit and return the saved habit"""
 
     @abstractmethod
     def load(self, habit_id):
@@ -24,3 +27,96 @@ class StorageStrategy(ABC):
     @abstractmethod
     def delete(self, habit_id):
         """delete the habit"""
+
+    @abstractmethod
+    def load_all(self):
+        """load the data of all habits ordered by habit id"""
+
+    def load_many(self, habit_ids):
+        """
+        Load the data of the habits with the habit ids ordered by habit id.
+        Ids which are not stored are skipped.
+
+        Strategies which can fetch several habits at once should override this method.
+        """
+        habits = [self.load(habit_id) for habit_id in sorted(set(habit_ids))]
+        return [data for data in habits if data]
+
+    def iter_all(self, chunk_size=500):
+        """
+        Yields the data of all habits ordered by habit id in lists of chunk_size habits.
+
+        Strategies which can read the habits in chunks should override this method.
+        """
+        habits = self.load_all()
+        for start in range(0, len(habits), chunk_size):
+            yield habits[start:start + chunk_size]
+
+    def load_chunk(self, after_id=None, chunk_size=500):
+        """
+        Load the data of at most chunk_size habits with an id greater than after_id
+        ordered by habit id. The first chunk is loaded with after_id None.
+
+        Strategies which can read a range of habits should override this method.
+        """
+        habits = [data for data in self.load_all()
+                  if after_id is None or data["habit_id"] > after_id]
+        return habits[:chunk_size]
+
+    def query(self, with_completions=True, **filters):
+        """
+        Load the data of the habits which match the filters of HabitQuery, ordered and
+        paged by it. Without completions the completed dates are None and the streak
+        state is computed from them, if it is not stored.
+
+        Strategies which can filter the habits without loading all of them should override
+        this method.
+        """
+        habits = HabitQuery(**filters).apply(self.load_all())
+        if with_completions:
+            return habits
+        return [dict(data, completed_dates=None,
+                     streak_state=data.get("streak_state") or CompletedDates(
+                         creation_day=data["creation_time"].date(), frequency=data["frequency"],
+                         completed_dates=data["completed_dates"]).get_streak_state())
+                for data in habits]
+
+    def get_completions_between(self, habit_id, start, end):
+        """
+        Returns the sorted completed dates of the habit from start to end, both inclusive.
+
+        Strategies which can read a range of dates without loading the habit should override
+        this method.
+        """
+        data = self.load(habit_id)
+        if not data:
+            return []
+        return [completed for completed in data["completed_dates"] if start <= completed <= end]
+
+    def count_habits(self):
+        """
+        Returns the number of stored habits.
+
+        Strategies which can count the habits without loading them should override this method.
+        """
+        return len(self.load_all())
+
+    def get_longest_streak_of_all(self):
+        """
+        Returns the longest streak of all habits.
+
+        Strategies which store streak summaries should override this method.
+        """
+        return ana.get_longest_streak_of_all(habit_list=self.load_all())
+
+    def load_streaks(self):
+        """
+        Returns the current and the longest streak of all habits by habit id.
+
+        Strategies which store streak summaries should override this method.
+        """
+        streaks = {}
+        for data in self.load_all():
+            statistics = ana.get_streak_statistics(habit=data)
+            streaks[data["habit_id"]] = (statistics.current_streak, statistics.longest_streak)
+        return streaks
@@ -26,9 +26,11 @@ setup(
     py_modules=["main"],
     packages=find_packages(),
     install_requires=finding_requirements(),
+    extras_require={"batch": ["numpy>=1.17"]},
     python_requires=">=3.7",
     entry_points="""
         [console_scripts]
         habits=scr.main:main
+        habits-cli=scr.cli:main
     """,
 )
@@ -5,11 +5,13 @@ NAME
 DESCRIPTION
     module to test the analytics module
 """
-from datetime import datetime
+from datetime import datetime, timedelta
+from random import Random
 import pytest
 from freezegun import freeze_time
 import scr.analytics as ana
 from scr.habit import Habit
+from scr.habit_collection import HabitCollection
 
 
 @pytest.mark.parametrize("habit_id",[1,2,3,4,5])
@@ -17,6 +19,21 @@ def test_get_current_tracked_habit(create_habits,habit_id):
     currend_tracked_habit = ana.get_current_tracked_habit(habit_id=habit_id,habit_list=create_habits)
     assert currend_tracked_habit == create_habits[habit_id-1]
 
+def test_analytics_with_habit_collection(create_habits):
+    collection = HabitCollection(create_habits)
+    assert ana.get_current_tracked_habit(habit_id=4,habit_list=collection) is create_habits[3]
+    assert ana.get_all_current_tracked_habits(id_list=[5,2],habit_list=collection)\
+        == [create_habits[4],create_habits[1]]
+    assert ana.get_habit_with_frequency(habit_list=collection,frequency=7)\
+        == ana.get_habit_with_frequency(habit_list=create_habits,frequency=7)
+    with pytest.raises(ValueError,match="There is no habit with id 0 in the list."):
+        ana.get_current_tracked_habit(habit_id=0,habit_list=collection)
+    with pytest.raises(ValueError,match="There is no habit with id 0 in the habit list."):
+        ana.get_all_current_tracked_habits(id_list=[1,0],habit_list=collection)
+    habit_list = Habit.load_all()
+    assert ana.get_longest_streak_of_all(habit_list=HabitCollection(habit_list))\
+        == ana.get_longest_streak_of_all(habit_list=habit_list)
+
 def test_get_current_tracked_habit_errors(create_habits):
     missing_id = 0
     with pytest.raises(ValueError,match=f"There is no habit with id {missing_id} in the list."):
@@ -96,3 +113,48 @@ def test_def_get_longest_streak_of_all(result):
 def test_def_get_longest_streak_of_all_errors():
     with pytest.raises(TypeError,match="Habit list is not a list."):
         ana.get_longest_streak_of_all(object())
+
+@pytest.mark.parametrize("period_indexes,current_period,result",
+                         [([],5,(0,0,0,0,1,6,6)),
+                          ([0,1,2,4,5],5,(2,3,2,5,1,1,1)),
+                          ([1,2,6,7,8],9,(0,3,2,5,3,3,5)),
+                          ([0,0,1,3,12],4,(0,2,2,3,2,1,2)),
+                          ([0],-1,(0,0,0,0,0,0,0))])
+def test_compute_streak_statistics(period_indexes,current_period,result):
+    assert ana.compute_streak_statistics(period_indexes=period_indexes,
+                                         current_period=current_period) == result
+
+@freeze_time("2024-10-27")
+@pytest.mark.parametrize("position",[0,1,2,3,4])
+def test_get_streak_statistics(position):
+    habit = Habit.load_all()[position]
+    statistics = ana.get_streak_statistics(habit=habit)
+    assert statistics.current_streak == ana.get_current_streak(habit=habit)
+    assert statistics.longest_streak == ana.get_longest_streak(habit=habit)
+    fake_habit = {"frequency": habit["frequency"], "creation_time": habit["creation_time"],
+                  "completed_dates": list(habit["completed_dates"])}
+    assert ana.get_streak_statistics(habit=fake_habit) == statistics
+
+@freeze_time("2024-10-27")
+def test_get_streak_statistics_random_habits():
+    random = Random(7)
+    for _ in range(200):
+        frequency = random.choice([1,2,7])
+        creation_time = datetime(year=2024,month=9,day=30) - timedelta(days=random.randrange(60))
+        completed_dates = [creation_time.date() + timedelta(days=random.randrange(100))
+                           for _ in range(random.randrange(40))]
+        habit = Habit(name="name",description="description",frequency=frequency,
+                      completed_dates=completed_dates,creation_time=creation_time)
+        statistics = ana.get_streak_statistics(habit=habit)
+        assert statistics.current_streak == ana.get_current_streak(habit=habit)
+        assert statistics.longest_streak == ana.get_longest_streak(habit=habit)
+
+def test_get_streak_statistics_errors():
+    fake_habit1 ={"frequency": 1, "creation_time":"No datetime object.", "completed_dates":[]}
+    fake_habit2 ={"frequency": 1, "creation_time":datetime.now(), "completed_dates":object()}
+    with pytest.raises(TypeError,match="Habit not of type Habit."):
+        ana.get_streak_statistics(habit="Not a habit object")
+    with pytest.raises(TypeError,match="Creation time not of type datetime.datetime."):
+        ana.get_streak_statistics(habit=fake_habit1)
+    with pytest.raises(TypeError,match="Completed dates is not iterable."):
+        ana.get_streak_statistics(habit=fake_habit2)
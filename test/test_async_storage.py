@@ -0,0 +1,84 @@
+"""
+NAME
+    test_async_storage
+
+DESCRIPTION
+    module to test the async_storage_strategy and the async_sqlite_storage module
+"""
+import asyncio
+import threading
+import pytest
+from scr.async_sqlite_storage import AsyncSQLiteStorage
+from scr.async_storage_strategy import AsyncStorageAdapter
+from scr.habit import Habit
+
+
+def test_concurrent_saves_and_loads(tmp_path, create_habit):
+    async def run():
+        async with AsyncSQLiteStorage(data_base=str(tmp_path / "async.db")) as storage:
+            habits = await asyncio.gather(*(
+                storage.save(create_habit(number, days=range(number % 5)))
+                for number in range(50)))
+            assert sorted(habit["habit_id"] for habit in habits) == list(range(1,51))
+            loaded = await asyncio.gather(*(storage.load(habit["habit_id"]) for habit in habits))
+            for habit, data in zip(habits, loaded):
+                assert data["name"] == habit["name"]
+                assert data["completed_dates"] == list(habit["completed_dates"])
+            assert [data["habit_id"] for data in await storage.load_many([7,3,99])] == [3,7]
+            assert await storage.count_habits() == 50
+            assert await storage.get_longest_streak_of_all() == 4
+            await storage.delete(1)
+            assert await storage.load(1) is None
+            with pytest.raises(ValueError,match="ID is not in database."):
+                await storage.delete(1)
+    asyncio.run(run())
+
+@pytest.mark.parametrize("chunk_size",[1,7,500])
+def test_iter_all(tmp_path, chunk_size, create_habit):
+    async def run():
+        async with AsyncSQLiteStorage(data_base=str(tmp_path / "async.db")) as storage:
+            for number in range(20):
+                await storage.save(create_habit(number, days=range(number % 5)))
+            chunks = [chunk async for chunk in storage.iter_all(chunk_size=chunk_size)]
+            assert all(0 < len(chunk) <= chunk_size for chunk in chunks)
+            assert [data for chunk in chunks for data in chunk] == await storage.load_all()
+    asyncio.run(run())
+
+def test_adapter_of_sync_strategy():
+    async def run():
+        adapter = AsyncStorageAdapter(storage=Habit.DEFAULT_STORAGE_STRATEGY)
+        habit_ids = Habit.DEFAULT_STORAGE_STRATEGY.get_all_id()
+        chunks = [chunk async for chunk in adapter.iter_all(chunk_size=2)]
+        assert [data["habit_id"] for chunk in chunks for data in chunk] == sorted(habit_ids)
+        assert (await adapter.load(1))["name"] == "Go for a walk"
+        await adapter.close()
+        #the shared storage stays open
+        assert Habit.load(habit_id=1)
+    asyncio.run(run())
+
+def test_writes_are_serialized(tmp_path):
+    class RecordingStorage:
+        def __init__(self):
+            self.running = 0
+            self.max_running = 0
+            self.threads = set()
+            self.lock = threading.Lock()
+        def save(self, habit):
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+                self.threads.add(threading.current_thread())
+            threading.Event().wait(0.01)
+            with self.lock:
+                self.running -= 1
+            return habit
+
+    async def run():
+        storage = RecordingStorage()
+        adapter = AsyncStorageAdapter(storage=storage)
+        await asyncio.gather(*(adapter.save(number) for number in range(10)))
+        assert storage.max_running == 1
+        assert len(storage.threads) == 1
+        assert threading.current_thread() not in storage.threads
+        await adapter.close()
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+"""
+NAME
+    test_batch_analytics
+
+DESCRIPTION
+    module to test the batch_analytics module against the analytics module
+"""
+from datetime import datetime, timedelta
+from random import Random
+import pytest
+from freezegun import freeze_time
+import scr.analytics as ana
+from scr.habit import Habit
+
+np = pytest.importorskip("numpy")
+import scr.batch_analytics as batch
+
+
+def get_random_habits(seed, count):
+    """
+    Returns random habits with random completed dates.
+    """
+    random = Random(seed)
+    habits = []
+    for _ in range(count):
+        frequency = random.choice([1,2,7])
+        creation_time = datetime(year=2024,month=9,day=30) - timedelta(days=random.randrange(60))
+        completed_dates = [creation_time.date() + timedelta(days=random.randrange(-5,100))
+                           for _ in range(random.randrange(40))]
+        habits.append(Habit(name="name",description="description",frequency=frequency,
+                            completed_dates=completed_dates,creation_time=creation_time))
+    return habits
+
+@freeze_time("2024-10-27")
+@pytest.mark.parametrize("as_list",[False,True])
+def test_get_batch_statistics(as_list):
+    habit_list = Habit.load_all() + get_random_habits(seed=3, count=300)
+    if as_list:
+        #completed dates without bitset
+        habit_list = [{"frequency": habit["frequency"], "creation_time": habit["creation_time"],
+                       "completed_dates": list(habit["completed_dates"])}
+                      for habit in habit_list]
+    statistics = batch.get_batch_statistics(habit_list=habit_list)
+    for position, habit in enumerate(habit_list):
+        reference = ana.get_streak_statistics(habit=habit)
+        assert statistics.current_streak[position] == ana.get_current_streak(habit=habit)
+        assert statistics.longest_streak[position] == ana.get_longest_streak(habit=habit)
+        assert statistics.completed_periods[position] == reference.completed_periods
+        assert statistics.completion_rate[position] == pytest.approx(
+            reference.completed_periods / max(reference.completed_periods
+                                              + reference.missed_periods, 1))
+
+@freeze_time("2024-10-27")
+def test_get_longest_streak_of_all():
+    habit_list = Habit.load_all()
+    assert batch.get_longest_streak_of_all(habit_list=habit_list) == 28
+    habit_list += get_random_habits(seed=5, count=100) + ["Not a habit object"]
+    assert batch.get_longest_streak_of_all(habit_list=habit_list)\
+        == ana.get_longest_streak_of_all(habit_list=habit_list)
+    assert batch.get_longest_streak_of_all(habit_list=[]) == 0
+
+def test_compute_batch_statistics():
+    statistics = batch.compute_batch_statistics(period_indexes=[0,1,2,4,5,1,2,6,7,8],
+                                                habit_rows=[0,0,0,0,0,2,2,2,2,2],
+                                                current_periods=[5,3,9])
+    assert statistics.current_streak.tolist() == [2,0,0]
+    assert statistics.longest_streak.tolist() == [3,0,3]
+    assert statistics.completed_periods.tolist() == [5,0,5]
+    assert statistics.completion_rate.tolist() == pytest.approx([5/6,0,0.5])
+
+def test_get_batch_statistics_errors():
+    fake_habit1 ={"frequency": 1, "creation_time":"No datetime object.", "completed_dates":[]}
+    fake_habit2 ={"frequency": 1, "creation_time":datetime.now(), "completed_dates":object()}
+    with pytest.raises(TypeError,match="Habit list is not a list."):
+        batch.get_batch_statistics(habit_list=object())
+    with pytest.raises(TypeError,match="Habit not of type Habit."):
+        batch.get_batch_statistics(habit_list=["Not a habit object"])
+    with pytest.raises(TypeError,match="Creation time not of type datetime.datetime."):
+        batch.get_batch_statistics(habit_list=[fake_habit1])
+    with pytest.raises(TypeError,match="Completed dates is not iterable."):
+        batch.get_batch_statistics(habit_list=[fake_habit2])
@@ -0,0 +1,142 @@
+"""
+NAME
+    test_bulk_transfer
+
+DESCRIPTION
+    module to test the bulk_transfer module
+"""
+import io
+import json
+from datetime import date, timedelta
+import pytest
+from scr import bulk_transfer, cli
+from scr.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def create_storage(create_habit):
+    """
+    Returns a function which creates a storage with weekly and daily habits.
+    """
+    def create(data_base, count=5):
+        storage = SQLiteStorage(data_base=data_base)
+        for number in range(count):
+            storage.save(create_habit(number, days=[7 * day for day in range(number * 3)],
+                                      frequency=1 if number % 2 else 7))
+        return storage
+    return create
+
+def export(storage, output_format):
+    habits, completions = io.StringIO(), io.StringIO()
+    bulk_transfer.export_habits(storage, habits, output_format=output_format)
+    bulk_transfer.export_completions(storage, completions, output_format=output_format)
+    habits.seek(0)
+    completions.seek(0)
+    return habits, completions
+
+
+@pytest.mark.parametrize("output_format",["csv","jsonl"])
+@pytest.mark.parametrize("defer_indexes",[False,True])
+def test_round_trip(tmp_path, output_format, defer_indexes, create_storage):
+    with create_storage(str(tmp_path / "source.db")) as source:
+        habits, completions = export(source, output_format)
+        expected = source.load_all()
+        expected_streaks = source.load_streaks()
+    with SQLiteStorage(data_base=str(tmp_path / "target.db")) as target:
+        report = bulk_transfer.import_habits(target, habits, input_format=output_format,
+                                             chunk_size=2)
+        assert report.rows == 5
+        report = bulk_transfer.import_completions(target, completions,
+                                                  input_format=output_format, chunk_size=4,
+                                                  defer_indexes=defer_indexes)
+        assert report.rows == sum(number * 3 for number in range(5))
+        assert report.rows_per_second > 0
+        assert target.load_all() == expected
+        assert target.load_streaks() == expected_streaks
+        assert target.check_stats() == []
+
+def test_export_jsonl(tmp_path, create_storage):
+    with create_storage(str(tmp_path / "source.db"), count=2) as storage:
+        habits, completions = export(storage, "jsonl")
+    assert json.loads(habits.readline()) == {"habit_id": 1, "name": "habit 0",
+                                             "description": "description 0", "frequency": 7,
+                                             "creation_time": "2024-09-30T00:00:00"}
+    assert [json.loads(line) for line in completions][:2] ==\
+        [{"habit_id": 2, "completed_date": "2024-09-30"},
+         {"habit_id": 2, "completed_date": "2024-10-07"}]
+
+def test_import_skips_stored_completions(tmp_path, create_storage):
+    records = "habit_id,completed_date\n2,2024-10-01\n2,2024-10-01\n2,2024-10-02\n"
+    for defer_indexes in (False, True):
+        with create_storage(str(tmp_path / f"{defer_indexes}.db"), count=2) as storage:
+            report = bulk_transfer.import_completions(storage, io.StringIO(records),
+                                                      defer_indexes=defer_indexes)
+            assert report.rows == 2
+            report = bulk_transfer.import_completions(storage, io.StringIO(records),
+                                                      defer_indexes=defer_indexes)
+            assert report.rows == 0
+            assert storage.load(2)["completed_dates"] == [date(2024,9,30), date(2024,10,1),
+                                                          date(2024,10,2), date(2024,10,7),
+                                                          date(2024,10,14)]
+            assert storage.check_stats() == []
+
+def test_import_sets_completions_to_period_starts(tmp_path, create_storage):
+    records = "habit_id,completed_date\n1,2024-10-01\n1,2024-10-02\n1,2024-10-08\n"
+    for defer_indexes in (False, True):
+        with create_storage(str(tmp_path / f"{defer_indexes}.db"), count=2) as storage:
+            report = bulk_transfer.import_completions(storage, io.StringIO(records),
+                                                      defer_indexes=defer_indexes)
+            assert report.rows == 2
+            assert storage.load(1)["completed_dates"] == [date(2024,9,30), date(2024,10,7)]
+            assert storage.load_streaks()[1] == (0, 2)
+            assert storage.check_stats() == []
+
+@pytest.mark.parametrize("records,message",
+                         [("habit_id,completed_date\n1,2024-10-01\n99,2024-10-01\n",
+                           "The completions can not be imported"),
+                          ("habit_id,completed_date\n1,2024-10-01\n1,yesterday\n",
+                           "Invalid completion record"),
+                          ("habit_id,completed_date\n1,2024-10-01\n2,2024-09-29\n",
+                           "Invalid completion record \\(2, '2024-09-29'\\), the date is not"),
+                          (f"habit_id,completed_date\n1,2024-10-01\n1,{date.today() + timedelta(days=1)}\n",
+                           "not between the creation day of the habit and today")])
+def test_import_completions_rolls_back(tmp_path, records, message, create_storage):
+    with create_storage(str(tmp_path / "target.db"), count=2) as storage:
+        with pytest.raises(ValueError, match=message):
+            bulk_transfer.import_completions(storage, io.StringIO(records), defer_indexes=True)
+        assert storage.load(1)["completed_dates"] == []
+        #the dropped index is restored by the rollback
+        assert storage.get_connection().execute("""
+            SELECT COUNT(*) FROM sqlite_master WHERE name = 'tracking_habit_date'
+        """).fetchone()[0] == 1
+
+def test_import_habits_errors(tmp_path, create_storage):
+    with create_storage(str(tmp_path / "target.db"), count=2) as storage:
+        records = "habit_id,name,description,frequency,creation_time\n,new,,1,2024-10-01\n" \
+                  "2,habit,description,1,2024-10-01\n"
+        with pytest.raises(ValueError, match="The habits can not be imported"):
+            bulk_transfer.import_habits(storage, io.StringIO(records))
+        with pytest.raises(ValueError, match="Invalid habit record"):
+            bulk_transfer.import_habits(storage, io.StringIO(
+                '{"name": "habit", "frequency": 0, "creation_time": "2024-10-01"}\n'),
+                                        input_format="jsonl")
+        assert storage.count_habits() == 2
+        report = bulk_transfer.import_habits(storage, io.StringIO(records.split("2,")[0]))
+        assert report.rows == 1
+        assert storage.load(3)["description"] == "new description"
+        assert storage.load_streaks()[3] == (0, 0)
+
+def test_cli_export_import(tmp_path, capsys, create_storage):
+    create_storage(str(tmp_path / "source.db")).close()
+    for table in ("habits", "completions"):
+        assert cli.main(["--db", str(tmp_path / "source.db"), "export", table,
+                         "--output", str(tmp_path / f"{table}.jsonl")]) == 0
+        assert cli.main(["--db", str(tmp_path / "target.db"), "import", table,
+                         str(tmp_path / f"{table}.jsonl"), "--defer-indexes"]) == 0
+    errors = capsys.readouterr().err
+    assert "exported 30 completions" in errors
+    assert "imported 30 completions" in errors
+    with SQLiteStorage(data_base=str(tmp_path / "target.db")) as storage:
+        assert storage.count_habits() == 5
+    assert cli.main(["--db", str(tmp_path / "target.db"), "import", "habits",
+                     str(tmp_path / "missing.csv")]) == 1
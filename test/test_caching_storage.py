@@ -0,0 +1,134 @@
+"""
+NAME
+    test_caching_storage
+
+DESCRIPTION
+    module to test the caching_storage module
+"""
+from datetime import timedelta
+import pytest
+from scr.caching_storage import CachingStorage, CacheStats
+from scr.habit import Habit
+from scr.memory_storage import MemoryStorage
+
+
+class CountingStorage(MemoryStorage):
+    """MemoryStorage which counts the loads."""
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+
+    def load(self, habit_id):
+        self.loads += 1
+        return super().load(habit_id)
+
+    def load_many(self, habit_ids):
+        self.loads += 1
+        return super().load_many(habit_ids)
+
+
+@pytest.fixture
+def storage(create_habit):
+    storage = CountingStorage()
+    for number in range(5):
+        storage.save(create_habit(number, days=range(number)))
+    return storage
+
+
+def test_repeated_load_is_cached(storage):
+    cache = CachingStorage(storage=storage)
+    data = cache.load(2)
+    assert cache.load(2) == data
+    assert storage.loads == 1
+    assert cache.get_stats() == CacheStats(hits=1, misses=1, evictions=0, habits=1,
+                                           size=CachingStorage.HABIT_SIZE
+                                           + CachingStorage.DATE_SIZE)
+    #the returned data is a copy
+    data["completed_dates"].clear()
+    assert len(cache.load(2)["completed_dates"]) == 1
+    assert cache.load(99) is None
+    assert cache.load(99) is None
+    assert cache.get_stats().misses == 3
+
+def test_save_and_delete_invalidate(storage):
+    cache = CachingStorage(storage=storage)
+    habit = Habit.create_from_data(cache.load(1))
+    habit["name"] = "new name"
+    habit.completion.mark_completed(habit["creation_time"].date() + timedelta(days=3))
+    assert cache.save(habit) is habit
+    data = cache.load(1)
+    assert data["name"] == "new name"
+    assert len(data["completed_dates"]) == 1
+    assert storage.loads == 2
+    cache.delete(1)
+    assert cache.load(1) is None
+    with pytest.raises(ValueError,match="ID is not in database."):
+        cache.delete(1)
+
+def test_lru_eviction(storage):
+    cache = CachingStorage(storage=storage, max_habits=2)
+    cache.load(1)
+    cache.load(2)
+    cache.load(1)
+    cache.load(3)
+    assert cache.get_stats().evictions == 1
+    loads = storage.loads
+    cache.load(1)
+    cache.load(3)
+    assert storage.loads == loads
+    cache.load(2)
+    assert storage.loads == loads + 1
+
+def test_memory_budget(storage):
+    cache = CachingStorage(storage=storage,
+                           max_size=2 * CachingStorage.HABIT_SIZE + 4 * CachingStorage.DATE_SIZE)
+    cache.load_all()
+    stats = cache.get_stats()
+    assert stats.size <= 2 * CachingStorage.HABIT_SIZE + 4 * CachingStorage.DATE_SIZE
+    #the most recently loaded habit 5 with 4 dates fits, the older ones are evicted
+    assert stats.habits == 1
+    assert stats.evictions == 4
+    cache = CachingStorage(storage=storage, max_size=CachingStorage.HABIT_SIZE)
+    cache.load(1)
+    cache.load(2)
+    assert cache.get_stats().habits == 1
+
+def test_load_many_fetches_the_misses(storage):
+    cache = CachingStorage(storage=storage)
+    cache.load(2)
+    storage.loads = 0
+    assert [data["habit_id"] for data in cache.load_many([4,2,99,1])] == [1,2,4]
+    assert storage.loads == 1
+    assert [data["habit_id"] for data in cache.load_many([1,2,4])] == [1,2,4]
+    assert storage.loads == 1
+
+def test_chunks_are_cached(storage):
+    cache = CachingStorage(storage=storage)
+    assert [len(chunk) for chunk in cache.iter_all(chunk_size=2)] == [2,2,1]
+    storage.loads = 0
+    cache.load(5)
+    assert storage.loads == 0
+
+def test_rolled_back_transaction_clears_the_cache(storage):
+    cache = CachingStorage(storage=storage)
+    with pytest.raises(ValueError):
+        with cache.transaction():
+            habit = Habit.create_from_data(cache.load(1))
+            habit["name"] = "new name"
+            cache.save(habit)
+            assert cache.load(1)["name"] == "new name"
+            cache.delete(99)
+    assert cache.load(1)["name"] == "habit 0"
+
+def test_habit_model_uses_the_cache(storage):
+    default_storage = Habit.DEFAULT_STORAGE_STRATEGY
+    Habit.DEFAULT_STORAGE_STRATEGY = CachingStorage(storage=storage)
+    try:
+        Habit.load_all()
+        storage.loads = 0
+        habit = Habit.change_habit_name_description(habit_id=3, habit_name="changed")
+        assert storage.loads == 0
+        habit.save()
+        assert Habit.load(3)["name"] == "changed"
+    finally:
+        Habit.DEFAULT_STORAGE_STRATEGY = default_storage
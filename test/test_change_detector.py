@@ -0,0 +1,109 @@
+"""
+NAME
+    test_change_detector
+
+DESCRIPTION
+    module to test the change_detector module and the revisions of the sqlite_storage module
+"""
+from datetime import timedelta
+import pytest
+from scr.caching_storage import CachingStorage
+from scr.change_detector import ChangeDetector
+from scr.habit import Habit
+from scr.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def data_base(tmp_path, create_habit):
+    data_base = str(tmp_path / "changes.db")
+    with SQLiteStorage(data_base=data_base) as storage:
+        for number in range(3):
+            storage.save(create_habit(number, days=range(number)))
+    return data_base
+
+
+def test_revisions(data_base, create_habit):
+    with SQLiteStorage(data_base=data_base) as storage:
+        revision = storage.get_revision()
+        assert storage.load_changed(revision) == (revision, [])
+        habit = Habit.create_from_data(storage.load(2))
+        habit["name"] = "new name"
+        storage.save(habit)
+        assert storage.get_revision() > revision
+        revision, habit_data = storage.load_changed(revision)
+        assert [data["name"] for data in habit_data] == ["new name"]
+        habit.completion.mark_completed(habit["creation_time"].date() + timedelta(days=5))
+        storage.save(habit)
+        storage.save(create_habit(4))
+        revision, habit_data = storage.load_changed(revision)
+        assert [data["habit_id"] for data in habit_data] == [2,4]
+        assert storage.load_changed(0)[1] == storage.load_all()
+
+def test_check_ignores_own_changes(data_base, create_habit):
+    with SQLiteStorage(data_base=data_base) as storage,\
+         SQLiteStorage(data_base=data_base) as other_storage:
+        detector = ChangeDetector(storage=storage)
+        assert not detector.check()
+        storage.save(create_habit(4))
+        assert not detector.check()
+        other_storage.save(create_habit(5))
+        assert detector.check()
+        assert not detector.check()
+
+def test_poll_finds_changed_new_and_deleted_habits(data_base, create_habit):
+    with SQLiteStorage(data_base=data_base) as storage,\
+         SQLiteStorage(data_base=data_base) as other_storage:
+        detector = ChangeDetector(storage=storage)
+        detector.check()
+        detector.sync()
+        assert detector.poll() == ([], [])
+
+        habit = Habit.create_from_data(other_storage.load(1))
+        habit.completion.mark_completed(habit["creation_time"].date())
+        other_storage.save(habit)
+        other_storage.save(create_habit(4))
+        other_storage.delete(3)
+        assert detector.check()
+        changes = detector.poll()
+        assert [habit["habit_id"] for habit in changes.habits] == [1,4]
+        assert changes.habits[0]["completed_dates"] == [habit["creation_time"].date()]
+        assert changes.deleted_ids == [3]
+        assert detector.poll() == ([], [])
+
+        #a deleted and a new habit do not hide each other
+        other_storage.delete(2)
+        other_storage.save(create_habit(5))
+        changes = detector.poll()
+        assert [habit["habit_id"] for habit in changes.habits] == [5]
+        assert changes.deleted_ids == [2]
+
+def test_poll_after_deleting_the_last_changed_habit(data_base):
+    with SQLiteStorage(data_base=data_base) as storage,\
+         SQLiteStorage(data_base=data_base) as other_storage:
+        detector = ChangeDetector(storage=storage)
+        detector.sync()
+        revision = storage.get_revision()
+        other_storage.delete(3)
+        assert storage.get_revision() == revision
+        habit = Habit.create_from_data(other_storage.load(1))
+        habit["name"] = "changed"
+        other_storage.save(habit)
+        assert storage.get_revision() > revision
+        changes = detector.poll()
+        assert [habit["name"] for habit in changes.habits] == ["changed"]
+        assert changes.deleted_ids == [3]
+
+def test_poll_invalidates_the_cache(data_base):
+    with CachingStorage(storage=SQLiteStorage(data_base=data_base)) as cache,\
+         SQLiteStorage(data_base=data_base) as other_storage:
+        detector = ChangeDetector(storage=cache)
+        detector.sync()
+        cache.load_all()
+        habit = Habit.create_from_data(other_storage.load(1))
+        habit["name"] = "changed"
+        other_storage.save(habit)
+        other_storage.delete(2)
+        assert cache.load(1)["name"] == "habit 0"
+        detector.poll()
+        assert cache.load(1)["name"] == "changed"
+        assert cache.load(2) is None
@@ -0,0 +1,111 @@
+"""
+NAME
+    test_cli
+
+DESCRIPTION
+    module to test the cli module
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+import pytest
+from scr import cli
+from scr.habit import Habit
+from scr.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def data_base(tmp_path, create_habit):
+    data_base = str(tmp_path / "cli.db")
+    creation_time = datetime.combine(date.today() - timedelta(days=10), datetime.min.time())
+    with SQLiteStorage(data_base=data_base) as storage:
+        for number in range(1,4):
+            storage.save(create_habit(number, days=range(11 - number, 11),
+                                      frequency=1 if number < 3 else 7,
+                                      creation_time=creation_time))
+    return data_base
+
+def run(data_base, *args):
+    output = io.StringIO()
+    return cli.main(["--db", data_base, *args], output=output), output.getvalue()
+
+
+def test_list_csv(data_base):
+    status, output = run(data_base, "list")
+    assert status == 0
+    rows = list(csv.reader(io.StringIO(output)))
+    assert rows[0] == list(cli.LIST_COLUMNS)
+    assert rows[1:] == [["1","habit 1","description 1","1","1","1"],
+                        ["2","habit 2","description 2","1","2","2"],
+                        ["3","habit 3","description 3","7","0","0"]]
+
+def test_list_json(data_base):
+    status, output = run(data_base, "list", "--format", "json", "--frequency", "daily")
+    assert status == 0
+    habits = json.loads(output)
+    assert [habit["habit_id"] for habit in habits] == [1,2]
+    assert habits[1]["current_streak"] == 2
+
+def test_stats_json(data_base):
+    status, output = run(data_base, "stats", "--format", "json")
+    assert status == 0
+    statistics = json.loads(output)
+    assert [row["habit_id"] for row in statistics] == [1,2,3]
+    assert statistics[1]["completed_periods"] == 2
+    assert statistics[1]["completion_rate"] == round(2 / 11, 4)
+
+def test_empty_json(tmp_path):
+    status, output = run(str(tmp_path / "empty.db"), "list", "--format", "json")
+    assert status == 0
+    assert json.loads(output) == []
+
+def test_create_and_delete(data_base):
+    status, output = run(data_base, "create", "read", "run", "--frequency", "weekly")
+    assert status == 0
+    assert output.split() == ["4","5"]
+    with SQLiteStorage(data_base=data_base) as storage:
+        assert storage.load(5)["frequency"] == 7
+    assert run(data_base, "delete", "4", "5") == (0, "deleted 2 habits\n")
+    with SQLiteStorage(data_base=data_base) as storage:
+        assert storage.count_habits() == 3
+
+def test_delete_rolls_back(data_base, capsys):
+    status, _ = run(data_base, "delete", "1", "99")
+    assert status == 1
+    assert "There is no habit with id 99." in capsys.readouterr().err
+    with SQLiteStorage(data_base=data_base) as storage:
+        assert storage.count_habits() == 3
+
+def test_mark(data_base):
+    dates = [date.today() - timedelta(days=day) for day in (1, 3)]
+    status, output = run(data_base, "mark", "1", "3",
+                         *(f"--date={checked_date.isoformat()}" for checked_date in dates))
+    assert status == 0
+    assert output == "marked 2 dates for 2 habits\n"
+    with SQLiteStorage(data_base=data_base) as storage:
+        assert dates[0] in storage.load(1)["completed_dates"]
+        assert dates[1] in storage.load(1)["completed_dates"]
+        assert storage.load_streaks()[1] == (2, 2)
+
+def test_mark_rolls_back(data_base, capsys):
+    too_early = (date.today() - timedelta(days=20)).isoformat()
+    status, _ = run(data_base, "mark", "1", "--date", date.today().isoformat(),
+                    "--date", too_early)
+    assert status == 1
+    assert f"Date {too_early} is out of the checkable interval" in capsys.readouterr().err
+    status, _ = run(data_base, "mark", "1", "99")
+    assert status == 1
+    with SQLiteStorage(data_base=data_base) as storage:
+        assert storage.load(1)["completed_dates"] == [date.today()]
+
+def test_invalid_arguments(data_base):
+    with pytest.raises(SystemExit):
+        run(data_base, "create", "name", "--frequency", "0")
+    with pytest.raises(SystemExit):
+        run(data_base, "mark", "1", "--date", "tomorrow")
+
+def test_default_storage_restored(data_base):
+    default_storage = Habit.DEFAULT_STORAGE_STRATEGY
+    run(data_base, "list")
+    assert Habit.DEFAULT_STORAGE_STRATEGY is default_storage
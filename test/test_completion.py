@@ -1,7 +1,7 @@
 from datetime import date, datetime,timedelta
 import pytest
 from freezegun import freeze_time
-from scr.completion import Completion
+from scr.completion import Completion, CompletedDates, StreakState
 
 def test_completion_error():
     with pytest.raises(ValueError,match="Frequency must be a positiv integer."):
@@ -43,3 +43,84 @@ def test_mark_completed_error():
     with pytest.raises(ValueError,match="Checked date is out of checkable intervall."):
         completion.mark_completed(date(year=2024,month=1,day=1))
         completion.mark_completed(date.today()+timedelta(days=1))
+
+@freeze_time("2024-10-28")
+def test_unsaved_dates():
+    completion = Completion(completed_dates=[date(day=21,month=10,year=2024)],
+                            creation_time=datetime(year=2024,month=9,day=30))
+    assert completion.get_unsaved_dates() == [date(day=21,month=10,year=2024)]
+    completion.mark_saved()
+    assert completion.get_unsaved_dates() == []
+    completion.mark_completed(date(day=22,month=10,year=2024))
+    completion.mark_completed(date(day=22,month=10,year=2024))
+    assert completion.get_unsaved_dates() == [date(day=22,month=10,year=2024)]
+
+@pytest.mark.parametrize("frequency,completed_dates,period_indexes,irregular_dates",
+            [(1,[date(day=2,month=10,year=2024),date(day=30,month=9,year=2024)],[0,2],[]),
+            (7,[date(day=14,month=10,year=2024),date(day=15,month=10,year=2024)],[2],
+             [date(day=15,month=10,year=2024)]),
+            (1,[date(day=1,month=9,year=2024),date(day=30,month=9,year=2024)],[0],
+             [date(day=1,month=9,year=2024)])])
+def test_completed_dates(frequency,completed_dates,period_indexes,irregular_dates):
+    completion = Completion(frequency=frequency,completed_dates=completed_dates,
+                            creation_time=datetime(year=2024,month=9,day=30))
+    dates = completion["completed_dates"]
+    assert isinstance(dates,CompletedDates)
+    assert dates.get_period_indexes() == period_indexes
+    assert len(dates) == len(completed_dates)
+    assert dates == sorted(completed_dates)
+    assert list(dates) == sorted(completed_dates)
+    assert dates[0] == min(completed_dates)
+    for completed_date in completed_dates:
+        assert completed_date in dates
+    for irregular_date in irregular_dates:
+        assert dates.period_index(irregular_date) is None
+    assert date(day=1,month=10,year=2024) not in dates
+    assert "no date" not in dates
+
+def test_completed_dates_add():
+    dates = CompletedDates(creation_day=date(day=30,month=9,year=2024),frequency=1)
+    assert dates.add(date(day=30,month=12,year=2024))
+    assert not dates.add(date(day=30,month=12,year=2024))
+    assert dates.add(date(day=1,month=10,year=2024))
+    #dates are only added with add, so the unsaved dates of the completion are not bypassed
+    assert not hasattr(dates, "append")
+    assert dates.has_period(1) and dates.has_period(91)
+    assert not dates.has_period(2) and not dates.has_period(-1) and not dates.has_period(1000)
+    assert dates.get_sorted_dates() == [date(day=1,month=10,year=2024),date(day=30,month=12,year=2024)]
+    assert dates.period_start(91) == date(day=30,month=12,year=2024)
+
+def test_streak_state():
+    dates = CompletedDates(creation_day=date(day=30,month=9,year=2024),frequency=1)
+    assert dates.get_streak_state() == StreakState(None,0,0)
+    state = None
+    for day in [0,1,2,5,6,3,4,9]:
+        dates.add(date(day=30,month=9,year=2024) + timedelta(days=day))
+        state = dates.get_streak_state()
+        recomputed = CompletedDates(creation_day=date(day=30,month=9,year=2024),frequency=1,
+                                    completed_dates=list(dates)).get_streak_state()
+        assert state == recomputed
+    assert state == StreakState(9,1,7)
+
+def test_stored_streak_state():
+    completed_dates = [date(day=30,month=9,year=2024),date(day=1,month=10,year=2024)]
+    dates = CompletedDates(creation_day=date(day=30,month=9,year=2024),frequency=1,
+                           completed_dates=completed_dates,streak_state=StreakState(1,5,5))
+    assert dates.get_streak_state() == StreakState(1,5,5)
+    #a stored state which does not fit the last period is ignored
+    dates = CompletedDates(creation_day=date(day=30,month=9,year=2024),frequency=1,
+                           completed_dates=completed_dates,streak_state=StreakState(4,5,5))
+    assert dates.get_streak_state() == StreakState(1,2,2)
+
+@freeze_time("2024-10-28")
+@pytest.mark.parametrize("frequency,days,today,result",
+            [(1,[0,1,2,5,6],date(day=6,month=10,year=2024),(2,3)),
+             (1,[0,1,2,5,6],date(day=7,month=10,year=2024),(0,3)),
+             (7,[0,7,21],date(day=21,month=10,year=2024),(1,2)),
+             (1,[0,1,2,3,10],date(day=2,month=10,year=2024),(3,3))])
+def test_get_streaks(frequency,days,today,result):
+    creation_time = datetime(year=2024,month=9,day=30)
+    completion = Completion(frequency=frequency,creation_time=creation_time,
+                            completed_dates=[creation_time.date() + timedelta(days=day)
+                                             for day in days])
+    assert completion.get_streaks(today=today) == result
@@ -9,15 +9,15 @@ def test_db_exist(data_base_path):
     assert os.path.exists(data_base_path)
 
 def test_table_exist(data_base_path):
-    expected_names = [('habit',),('tracking',)]
+    expected_names = [('habit',),('tracking',),('habit_stats',),('habit_revision_counter',)]
     with closing(sqlite3.connect(database=data_base_path)) as connect:
         with closing(connect.cursor()) as cursor:
-            cursor.execute("""SELECT name FROM sqlite_master;""")
+            cursor.execute("""SELECT name FROM sqlite_master WHERE type = 'table';""")
             table_names = cursor.fetchall()
     assert all(list(map(lambda x: x in table_names,expected_names)))
     assert len(table_names) == len(expected_names)
 
-@pytest.mark.parametrize("table_name, expected_names",[('habit',('id','name','description','frequency','creation_time')),
+@pytest.mark.parametrize("table_name, expected_names",[('habit',('id','name','description','frequency','creation_time','revision')),
                                                      ('tracking',('ID','habit_id','completed_dates'))])
 def test_column_names(data_base_path,table_name,expected_names):
     with closing(sqlite3.connect(database=data_base_path)) as connect:
@@ -1,4 +1,4 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 import pytest
 from freezegun import freeze_time
 from scr.habit import Habit
@@ -46,7 +46,7 @@ class TestHabits:
 
     def test_save_and_delete(self):
         habit = Habit(name=None,description=None)
-        habit.save()
+        assert habit.save() is habit
         assert habit == Habit.load(habit_id=habit["habit_id"])
         Habit.delete(habit_id=habit["habit_id"])
         assert not Habit.load(habit_id=habit["habit_id"])
@@ -101,3 +101,53 @@ class TestHabits:
         habit = Habit.load(habit_id=habit["habit_id"])
         assert len(habit["completed_dates"]) == 1
         habit.delete(habit_id=habit["habit_id"])
+
+    @pytest.mark.parametrize("habit_ids,expected_ids",[([3,1],[1,3]),([5,0,5],[5]),([],[])])
+    def test_load_many(self, create_habits, habit_ids, expected_ids):
+        habits = Habit.load_many(habit_ids=habit_ids)
+        assert [habit["habit_id"] for habit in habits] == expected_ids
+        for habit in habits:
+            assert habit in create_habits
+
+    def test_load_all_equals_load(self):
+        for habit in Habit.load_all():
+            loaded_habit = Habit.load(habit_id=habit["habit_id"])
+            assert habit == loaded_habit
+            assert habit["completed_dates"] == loaded_habit["completed_dates"]
+            assert habit["creation_time"] == loaded_habit["creation_time"]
+
+    @pytest.mark.parametrize("chunk_size",[1,2,500])
+    def test_iter_all(self, chunk_size):
+        chunks = list(Habit.DEFAULT_STORAGE_STRATEGY.iter_all(chunk_size=chunk_size))
+        assert all(0 < len(chunk) <= chunk_size for chunk in chunks)
+        assert [data for chunk in chunks for data in chunk] == Habit.DEFAULT_STORAGE_STRATEGY.load_all()
+        habits = [habit for chunk in Habit.iter_all() for habit in chunk]
+        assert habits == Habit.load_all()
+        assert Habit.count_all() == len(habits)
+
+    def test_save_inserts_only_new_dates(self):
+        creation_time = datetime(year=2014,month=9,day=30)
+        history = [creation_time.date() + timedelta(days=i) for i in range(3650)]
+        habit = Habit(name="name",description="description",
+                      completed_dates=history,creation_time=creation_time)
+        habit.save()
+        habit = Habit.load(habit_id=habit["habit_id"])
+        assert habit.completion.get_unsaved_dates() == []
+        habit.completion.mark_completed(date.today())
+        assert habit.completion.get_unsaved_dates() == [date.today()]
+        habit.save()
+        assert habit.completion.get_unsaved_dates() == []
+        habit = Habit.load(habit_id=habit["habit_id"])
+        assert len(habit["completed_dates"]) == len(history) + 1
+        Habit.delete(habit_id=habit["habit_id"])
+
+    @freeze_time("2024-10-27")
+    def test_save_stores_streak_state(self):
+        habit = Habit(name="name",description="description",
+                      completed_dates=[date(year=2024,month=10,day=day) for day in (20,21,26,27)],
+                      creation_time=datetime(year=2024,month=9,day=30))
+        habit.save()
+        data = Habit.DEFAULT_STORAGE_STRATEGY.load(habit_id=habit["habit_id"])
+        assert data["streak_state"] == (27,2,2)
+        assert Habit.habit_data(Habit.create_from_data(data))[4:] == (2,2)
+        Habit.delete(habit_id=habit["habit_id"])
@@ -0,0 +1,64 @@
+"""
+NAME
+    test_habit_collection
+
+DESCRIPTION
+    module to test the HabitCollection class
+"""
+import pytest
+from scr.habit import Habit
+from scr.habit_collection import HabitCollection
+
+
+def test_lookup(create_habits):
+    collection = HabitCollection(create_habits)
+    assert len(collection) == 5
+    assert list(collection) == create_habits
+    assert collection[0] is create_habits[0]
+    assert collection[-2:] == create_habits[-2:]
+    assert collection.get(3) is create_habits[2]
+    assert collection.get(0) is None
+    assert create_habits[4] in collection
+    assert collection.get_ids() == [1,2,3,4,5]
+    assert collection.get_many([5,1]) == [create_habits[4],create_habits[0]]
+
+@pytest.mark.parametrize("frequency,habit_ids",[(1,[1,3,4]),(7,[2,5]),(2,[])])
+def test_with_frequency(create_habits,frequency,habit_ids):
+    collection = HabitCollection(create_habits)
+    assert [habit["habit_id"] for habit in collection.with_frequency(frequency)] == habit_ids
+
+def test_append_remove_update(create_habits):
+    collection = HabitCollection(create_habits[:3])
+    collection.append(create_habits[3])
+    assert collection[3] is create_habits[3]
+    assert collection.remove(1) is create_habits[0]
+    assert create_habits[0] not in collection
+    assert [habit["habit_id"] for habit in collection.with_frequency(1)] == [3,4]
+    #the updated habit keeps its position
+    changed_habit = Habit(name="changed",description="changed",habit_id=3,frequency=1)
+    collection.update(changed_habit)
+    assert collection.get_ids() == [2,3,4]
+    assert collection[1] is changed_habit
+    assert collection.with_frequency(1) == [changed_habit,create_habits[3]]
+    #a habit with a new frequency keeps the order in the frequency index
+    weekly_habit = Habit(name="weekly",description="weekly",habit_id=4,frequency=7)
+    collection.update(weekly_habit)
+    assert collection.with_frequency(1) == [changed_habit]
+    assert collection.with_frequency(7) == [create_habits[1],weekly_habit]
+    collection.update(create_habits[4])
+    assert collection.get_ids() == [2,3,4,5]
+
+def test_errors(create_habits):
+    collection = HabitCollection(create_habits)
+    with pytest.raises(ValueError,match="There is already a habit with id 1 in the collection."):
+        collection.append(create_habits[0])
+    with pytest.raises(ValueError,match="Habit has no id."):
+        collection.append(Habit(name="name",description="description"))
+    with pytest.raises(TypeError,match="Object not of type Habit."):
+        collection.append("Not a habit object")
+    with pytest.raises(TypeError,match="Object is not iterable."):
+        HabitCollection(1)
+    with pytest.raises(ValueError,match="There is no habit with id 0 in the collection."):
+        collection.remove(0)
+    with pytest.raises(ValueError,match="There is no habit with id 0 in the collection."):
+        collection.get_many([1,0])
@@ -0,0 +1,69 @@
+"""
+NAME
+    test_habit_stats
+
+DESCRIPTION
+    module to test the habit_stats module and the stats of the sqlite storage
+"""
+from datetime import date, datetime, timedelta
+import pytest
+from freezegun import freeze_time
+import scr.analytics as ana
+from scr.habit import Habit
+from scr.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    default_storage = Habit.DEFAULT_STORAGE_STRATEGY
+    with SQLiteStorage(data_base=str(tmp_path / "stats.db")) as sqlite_storage:
+        Habit.DEFAULT_STORAGE_STRATEGY = sqlite_storage
+        creation_time = datetime(year=2024,month=9,day=30)
+        for frequency, days in [(1,range(10)),(1,[0,1,5,6,7,8,9,10,11,20,26]),(7,[0,7,21])]:
+            Habit(name="name",description="description",frequency=frequency,
+                  creation_time=creation_time,
+                  completed_dates=[creation_time.date() + timedelta(days=day)
+                                   for day in days]).save()
+        yield sqlite_storage
+    Habit.DEFAULT_STORAGE_STRATEGY = default_storage
+
+
+def test_stats_are_consistent(storage):
+    assert storage.check_stats() == []
+
+@freeze_time("2024-10-27")
+def test_load_streaks(storage):
+    expected = {}
+    for habit in Habit.load_all():
+        statistics = ana.get_streak_statistics(habit=habit)
+        expected[habit["habit_id"]] = (statistics.current_streak, statistics.longest_streak)
+    assert storage.load_streaks() == expected
+
+@freeze_time("2024-10-27")
+def test_get_longest_streak_of_all(storage):
+    assert storage.get_longest_streak_of_all() == 10
+    assert Habit.get_longest_streak_of_all() == ana.get_longest_streak_of_all(Habit.load_all())
+
+@freeze_time("2024-10-27")
+def test_stats_after_save(storage):
+    habit = Habit.load(habit_id=2)
+    habit.completion.mark_completed(date(year=2024,month=10,day=21))
+    habit.save()
+    #a stale habit does not hold the date of the first save
+    stale_habit = Habit.load(habit_id=2)
+    habit.completion.mark_completed(date(year=2024,month=10,day=27))
+    habit.save()
+    stale_habit.completion.mark_completed(date(year=2024,month=10,day=22))
+    stale_habit.save()
+    assert storage.check_stats() == []
+    assert storage.load_streaks()[2] == (2,7)
+
+def test_check_stats_repair(storage):
+    with storage.transaction() as cursor:
+        cursor.execute("UPDATE habit_stats SET longest_streak = 99 WHERE habit_id = 1")
+        cursor.execute("DELETE FROM habit_stats WHERE habit_id = 3")
+        cursor.execute("DELETE FROM tracking WHERE habit_id = 2")
+    assert storage.check_stats() == [1,2,3]
+    assert storage.check_stats(repair=True) == [1,2,3]
+    assert storage.check_stats() == []
+    assert storage.get_longest_streak_of_all() == 10
@@ -0,0 +1,46 @@
+"""
+NAME
+    test_import_time
+
+DESCRIPTION
+    module to test that the model is imported fast, without the GUI modules
+    and without touching the database
+"""
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_MODULES = ("tkinter", "_tkinter", "tkcalendar")
+#generous budget of the cumulative import time in microseconds
+IMPORT_TIME_BUDGET = 500000
+
+
+def import_times(module, cwd):
+    """
+    Imports the module in a new interpreter with -X importtime.
+
+    Returns:
+        {str: int}: The cumulative import time in microseconds by module name.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+@pytest.mark.parametrize("module",["scr.habit","scr.main","scr.analytics"])
+def test_import_without_gui(tmp_path, module):
+    times = import_times(module, cwd=tmp_path)
+    assert module in times
+    assert not [name for name in times if name.split(".")[0] in GUI_MODULES]
+    assert times[module] < IMPORT_TIME_BUDGET
+    #importing the model neither opens nor creates a database
+    assert not os.listdir(tmp_path)
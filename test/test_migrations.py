@@ -0,0 +1,85 @@
+"""
+NAME
+    test_migrations
+
+DESCRIPTION
+    module to test the migrations module
+"""
+import shutil
+from datetime import date
+import sqlite3
+from contextlib import closing
+import pytest
+from scr import migrations
+from scr.habit import Habit
+from scr.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def legacy_data_base(tmp_path):
+    """
+    Creates a database with the schema from before the versioning,
+    with duplicated, empty and orphaned completions.
+    """
+    data_base = str(tmp_path / "legacy.db")
+    with closing(sqlite3.connect(data_base)) as connect:
+        connect.executescript("""
+            CREATE TABLE habit (id INTEGER PRIMARY KEY, name TEXT NOT NULL,
+                description TEXT NOT NULL, frequency INT NOT NULL, creation_time TEXT NOT NULL);
+            CREATE TABLE tracking (ID INTEGER PRIMARY KEY, habit_id INTEGER, completed_dates TEXT,
+                FOREIGN KEY(habit_id) REFERENCES habit (id));
+            INSERT INTO habit VALUES (1, 'walk', 'walk', 1, '2024-09-30T00:00:00');
+            INSERT INTO tracking (habit_id, completed_dates) VALUES
+                (1, '2024-09-30'), (1, '2024-10-01'), (1, '2024-09-30'),
+                (1, NULL), (1, 'no date'), (2, '2024-09-30');
+        """)
+        connect.commit()
+    return data_base
+
+
+def test_migrate_legacy_data_base(legacy_data_base):
+    with closing(sqlite3.connect(legacy_data_base, isolation_level=None)) as connect:
+        assert migrations.migrate(connect) == migrations.SCHEMA_VERSION
+        assert migrations.get_schema_version(connect) == migrations.SCHEMA_VERSION
+        rows = connect.execute("SELECT ID, habit_id, completed_dates FROM tracking ORDER BY ID"
+                               ).fetchall()
+        assert rows == [(1, 1, date(2024, 9, 30).toordinal()), (2, 1, date(2024, 10, 1).toordinal())]
+        indexes = connect.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+        assert ("tracking_habit_date",) in indexes
+
+def test_migrate_current_data_base_runs_no_ddl(legacy_data_base):
+    with closing(sqlite3.connect(legacy_data_base, isolation_level=None)) as connect:
+        migrations.migrate(connect)
+        statements = []
+        connect.set_trace_callback(statements.append)
+        migrations.migrate(connect)
+    assert statements == ["PRAGMA user_version"]
+
+def test_unique_completions(legacy_data_base):
+    with closing(sqlite3.connect(legacy_data_base, isolation_level=None)) as connect:
+        migrations.migrate(connect)
+        with pytest.raises(sqlite3.IntegrityError):
+            connect.execute("INSERT INTO tracking (habit_id, completed_dates) VALUES (1, ?)",
+                            (date(2024, 9, 30).toordinal(),))
+
+def test_delete_cascade(legacy_data_base):
+    with SQLiteStorage(data_base=legacy_data_base) as storage:
+        storage.delete(habit_id=1)
+        count = storage.get_connection().execute("SELECT COUNT(*) FROM tracking").fetchone()[0]
+    assert count == 0
+
+def test_migrate_app_data_base_in_place(tmp_path):
+    data_base = str(tmp_path / "habits.db")
+    shutil.copyfile(SQLiteStorage.DB_NAME, data_base)
+    with closing(sqlite3.connect(data_base)) as connect:
+        expected = connect.execute("SELECT habit_id, COUNT(DISTINCT completed_dates) FROM tracking "
+                                   "GROUP BY habit_id").fetchall()
+    default_storage = Habit.DEFAULT_STORAGE_STRATEGY
+    try:
+        with SQLiteStorage(data_base=data_base) as storage:
+            Habit.DEFAULT_STORAGE_STRATEGY = storage
+            habits = Habit.load_all()
+    finally:
+        Habit.DEFAULT_STORAGE_STRATEGY = default_storage
+    assert [(habit["habit_id"], len(habit["completed_dates"])) for habit in habits
+            if habit["completed_dates"]] == expected
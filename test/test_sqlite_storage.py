@@ -0,0 +1,90 @@
+"""
+NAME
+    test_sqlite_storage
+
+DESCRIPTION
+    module to test the connection management of the sqlite_storage module
+"""
+import sqlite3
+import threading
+import pytest
+from scr.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    with SQLiteStorage(data_base=str(tmp_path / "storage.db")) as sqlite_storage:
+        yield sqlite_storage
+
+
+def test_connection_reused(storage):
+    assert storage.get_connection() is storage.get_connection()
+
+def test_connection_per_thread(storage):
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(storage.get_connection()))
+    thread.start()
+    thread.join()
+    assert connections[0] is not storage.get_connection()
+    #the connection is closed when its thread ends
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
+
+def test_close_connections_of_running_threads(storage):
+    connected, closed = threading.Event(), threading.Event()
+    connections = []
+    def run():
+        connections.append(storage.get_connection())
+        connected.set()
+        closed.wait(5)
+        #the thread opens a new connection after the storage is closed
+        connections.append(storage.get_connection())
+    thread = threading.Thread(target=run)
+    thread.start()
+    connected.wait(5)
+    storage.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
+    closed.set()
+    thread.join()
+    assert connections[1] is not connections[0]
+
+@pytest.mark.parametrize("pragma,expected",[("journal_mode","wal"),("synchronous",1),
+                                            ("cache_size",-8000)])
+def test_default_pragmas(storage,pragma,expected):
+    assert storage.get_connection().execute(f"PRAGMA {pragma}").fetchone()[0] == expected
+
+def test_configured_pragmas(tmp_path):
+    with SQLiteStorage(data_base=str(tmp_path / "storage.db"),
+                       pragmas={"journal_mode": "DELETE", "synchronous": "FULL"}) as storage:
+        connect = storage.get_connection()
+        assert connect.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert connect.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+def test_close(storage):
+    connect = storage.get_connection()
+    storage.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        connect.execute("SELECT 1")
+    #the storage opens a new connection after closing
+    assert storage.get_all_id() == []
+
+def test_transaction_rollback(storage):
+    with pytest.raises(RuntimeError):
+        with storage.transaction() as cursor:
+            cursor.execute("""INSERT INTO habit (name, description, frequency, creation_time)
+                           VALUES ('name', 'description', 1, '2024-09-30T00:00:00')""")
+            raise RuntimeError("rollback")
+    assert storage.get_all_id() == []
+
+def test_nested_transaction_rollback(storage):
+    with storage.transaction() as cursor:
+        cursor.execute("""INSERT INTO habit (name, description, frequency, creation_time)
+                       VALUES ('outer', 'description', 1, '2024-09-30T00:00:00')""")
+        with pytest.raises(RuntimeError):
+            with storage.transaction() as inner_cursor:
+                inner_cursor.execute("""INSERT INTO habit (name, description, frequency,
+                                     creation_time)
+                                     VALUES ('inner', 'description', 1, '2024-09-30T00:00:00')""")
+                raise RuntimeError("rollback")
+    assert len(storage.get_all_id()) == 1
@@ -0,0 +1,378 @@
+"""
+NAME
+    test_storage_contract
+
+DESCRIPTION
+    module to test that the storage strategies sqlite_storage, memory_storage and
+    caching_storage have the same semantics
+"""
+from datetime import date, datetime, timedelta
+from functools import partial
+from random import Random
+import pytest
+from freezegun import freeze_time
+from scr.caching_storage import CachingStorage
+from scr.habit import Habit
+from scr.habit_query import HabitQuery
+from scr.memory_storage import MemoryStorage
+from scr.sqlite_storage import SQLiteStorage
+from scr.storage_strategy import StorageStrategy
+
+CREATION_TIME = datetime(year=2024,month=9,day=30,hour=8,minute=15,second=3,microsecond=17)
+
+
+@pytest.fixture(params=["sqlite","memory","caching"])
+def storage(request, tmp_path):
+    if request.param == "sqlite":
+        storage = SQLiteStorage(data_base=str(tmp_path / "contract.db"))
+    elif request.param == "memory":
+        storage = MemoryStorage()
+    else:
+        storage = CachingStorage(storage=SQLiteStorage(data_base=str(tmp_path / "contract.db")),
+                                 max_habits=3)
+    with storage:
+        yield storage
+
+@pytest.fixture(name="create_habit")
+def fixture_create_habit(create_habit):
+    #the creation time has microseconds to test that they are stored
+    return partial(create_habit, creation_time=CREATION_TIME)
+
+
+def test_id_assignment(storage, create_habit):
+    habits = [storage.save(create_habit(number)) for number in range(3)]
+    assert [habit["habit_id"] for habit in habits] == [1,2,3]
+    storage.delete(3)
+    assert storage.save(create_habit(3))["habit_id"] == 3
+    storage.delete(1)
+    assert storage.save(create_habit(4))["habit_id"] == 4
+    assert storage.get_all_id() == [2,3,4]
+    assert storage.count_habits() == 3
+
+def test_save_and_load(storage, create_habit):
+    habit = create_habit(1, days=(2,0,1,5), frequency=1)
+    assert storage.save(habit) is habit
+    data = storage.load(habit["habit_id"])
+    assert data == {"name": "habit 1", "description": "description 1", "frequency": 1,
+                    "completed_dates": [CREATION_TIME.date() + timedelta(days=day)
+                                        for day in (0,1,2,5)],
+                    "creation_time": CREATION_TIME, "habit_id": 1,
+                    "streak_state": (5,1,3)}
+    assert habit.completion.get_unsaved_dates() == []
+    assert storage.load(99) is None
+
+def test_duplicate_dates(storage, create_habit):
+    habit = storage.save(create_habit(1, days=(0,1)))
+    loaded = Habit.create_from_data(storage.load(habit["habit_id"]))
+    loaded.completion.mark_completed(CREATION_TIME.date() + timedelta(days=2))
+    #a second instance of the habit saves a date, which is already stored
+    habit.completion.mark_completed(CREATION_TIME.date() + timedelta(days=2))
+    storage.save(loaded)
+    storage.save(habit)
+    storage.save(habit)
+    data = storage.load(habit["habit_id"])
+    assert data["completed_dates"] == [CREATION_TIME.date() + timedelta(days=day)
+                                       for day in range(3)]
+    assert data["streak_state"] == (2,3,3)
+
+def test_stale_habit_keeps_stats(storage, create_habit):
+    habit = storage.save(create_habit(1, days=(0,1)))
+    stale = Habit.create_from_data(storage.load(habit["habit_id"]))
+    habit.completion.mark_completed(CREATION_TIME.date() + timedelta(days=2))
+    storage.save(habit)
+    stale.completion.mark_completed(CREATION_TIME.date() + timedelta(days=4))
+    storage.save(stale)
+    assert storage.load(habit["habit_id"])["streak_state"] == (4,1,3)
+
+def test_update_changes_name_and_description_only(storage, create_habit):
+    habit = storage.save(create_habit(1))
+    changed = Habit(name="new name",description="new description",habit_id=habit["habit_id"],
+                    frequency=7,creation_time=datetime(year=2020,month=1,day=1))
+    storage.save(changed)
+    data = storage.load(habit["habit_id"])
+    assert (data["name"], data["description"]) == ("new name", "new description")
+    assert (data["frequency"], data["creation_time"]) == (1, CREATION_TIME)
+
+def test_save_errors(storage):
+    with pytest.raises(TypeError,match="Object is not of type Habit."):
+        storage.save({"habit_id": None, "name": "name", "description": "description",
+                      "frequency": 1, "creation_time": CREATION_TIME})
+    with pytest.raises(TypeError,match="Habit data has wronge type and is not savable."):
+        storage.save(Habit(name=["name"],description="description"))
+    assert storage.count_habits() == 0
+
+def test_load_many_and_chunks(storage, create_habit):
+    for number in range(7):
+        storage.save(create_habit(number, days=range(number)))
+    storage.delete(4)
+    assert [data["habit_id"] for data in storage.load_many([7,3,3,99,1])] == [1,3,7]
+    assert [data["habit_id"] for data in storage.load_chunk(after_id=3,chunk_size=2)] == [5,6]
+    assert storage.load_chunk(after_id=7) == []
+    chunks = list(storage.iter_all(chunk_size=4))
+    assert [[data["habit_id"] for data in chunk] for chunk in chunks] == [[1,2,3,5],[6,7]]
+    assert [data for chunk in chunks for data in chunk] == storage.load_all()
+
+def test_delete(storage, create_habit):
+    habit = storage.save(create_habit(1, days=(0,)))
+    storage.delete(habit["habit_id"])
+    assert storage.load(habit["habit_id"]) is None
+    with pytest.raises(ValueError,match="ID is not in database."):
+        storage.delete(habit["habit_id"])
+
+@freeze_time("2024-10-10")
+def test_streaks(storage, create_habit):
+    storage.save(create_habit(1, days=range(11)))
+    storage.save(create_habit(2, days=range(0,14,7), frequency=7))
+    storage.save(create_habit(3, days=(0,1,2,3,5)))
+    assert storage.get_longest_streak_of_all() == 11
+    assert storage.load_streaks() == {1: (11,11), 2: (2,2), 3: (0,4)}
+
+def test_empty_storage(storage):
+    assert storage.load_all() == []
+    assert storage.count_habits() == 0
+    assert storage.get_longest_streak_of_all() == 0
+    assert storage.load_streaks() == {}
+
+def test_transaction_rolls_back(storage, create_habit):
+    storage.save(create_habit(1, days=(0,)))
+    with pytest.raises(ValueError):
+        with storage.transaction():
+            storage.save(create_habit(2))
+            habit = Habit.create_from_data(storage.load(1))
+            habit.completion.mark_completed(CREATION_TIME.date() + timedelta(days=1))
+            storage.save(habit)
+            storage.delete(99)
+    assert storage.count_habits() == 1
+    assert storage.load(1)["completed_dates"] == [CREATION_TIME.date()]
+    with storage.transaction():
+        storage.save(create_habit(2))
+    assert storage.count_habits() == 2
+
+def test_nested_transactions(storage, create_habit):
+    storage.save(create_habit(1, days=(0,)))
+    storage.save(create_habit(2))
+    with pytest.raises(ValueError):
+        with storage.transaction():
+            storage.save(create_habit(3, days=(0,1)))
+            with pytest.raises(ValueError):
+                with storage.transaction():
+                    storage.delete(1)
+                    storage.delete(99)
+            assert storage.load(1)["completed_dates"] == [CREATION_TIME.date()]
+            with storage.transaction():
+                storage.delete(2)
+            habit = Habit.create_from_data(storage.load(1))
+            habit["name"] = "new name"
+            storage.save(habit)
+            raise ValueError("rollback")
+    assert storage.get_all_id() == [1,2]
+    assert storage.load(1)["name"] == "habit 1"
+    assert storage.save(create_habit(3))["habit_id"] == 3
+
+def test_save_unknown_id(storage):
+    habit = Habit(name="name",description="description",habit_id=42,
+                  creation_time=CREATION_TIME,completed_dates=[CREATION_TIME.date()])
+    with pytest.raises(ValueError,match="ID is not in database."):
+        storage.save(habit)
+    assert storage.count_habits() == 0
+
+def test_habit_model_on_storage(storage):
+    default_storage = Habit.DEFAULT_STORAGE_STRATEGY
+    Habit.DEFAULT_STORAGE_STRATEGY = storage
+    try:
+        habit = Habit(name="walk",description="walk",creation_time=datetime.now())
+        habit.completion.mark_completed()
+        habit.save()
+        loaded = Habit.load(habit["habit_id"])
+        assert loaded == habit
+        assert loaded["completed_dates"] == [date.today()]
+        assert Habit.habit_data(loaded)[4:] == (1,1)
+        assert Habit.count_all() == 1
+    finally:
+        Habit.DEFAULT_STORAGE_STRATEGY = default_storage
+
+@freeze_time("2024-12-31")
+def test_random_operations_match(tmp_path, create_habit):
+    random = Random(3)
+    with SQLiteStorage(data_base=str(tmp_path / "random.db")) as sqlite_storage:
+        memory_storage = MemoryStorage()
+        for _ in range(200):
+            habit_ids = memory_storage.get_all_id()
+            operation = random.random()
+            if operation < 0.3 or not habit_ids:
+                days = random.sample(range(60), random.randrange(10))
+                frequency = random.choice([1,7])
+                for storage in (sqlite_storage, memory_storage):
+                    storage.save(create_habit(len(habit_ids), days=days, frequency=frequency))
+            elif operation < 0.9:
+                habit_id = random.choice(habit_ids)
+                days = [random.randrange(90) for _ in range(3)]
+                for storage in (sqlite_storage, memory_storage):
+                    habit = Habit.create_from_data(storage.load(habit_id))
+                    for day in days:
+                        habit.completion.mark_completed(CREATION_TIME.date()
+                                                        + timedelta(days=day))
+                    storage.save(habit)
+            else:
+                habit_id = random.choice(habit_ids)
+                for storage in (sqlite_storage, memory_storage):
+                    storage.delete(habit_id)
+        assert memory_storage.load_all() == sqlite_storage.load_all()
+        assert memory_storage.load_streaks() == sqlite_storage.load_streaks()
+        assert memory_storage.get_longest_streak_of_all()\
+            == sqlite_storage.get_longest_streak_of_all()
+
+def test_query(storage):
+    for number in range(6):
+        storage.save(Habit(name=("walk","Read","walk the dog","swim","read books","run")[number],
+                           description="description",frequency=(1,7)[number % 2],
+                           creation_time=CREATION_TIME + timedelta(days=number),
+                           completed_dates=[CREATION_TIME.date() + timedelta(days=day)
+                                            for day in range(number, 2 * number)]))
+
+    def query(**filters):
+        return [data["habit_id"] for data in storage.query(**filters)]
+    assert query() == [1,2,3,4,5,6]
+    assert query(frequency=7) == [2,4,6]
+    assert query(ids=[6,1,3,99]) == [1,3,6]
+    assert query(name_like="read%") == [2,5]
+    assert query(name_like="walk") == [1]
+    assert query(created_between=(CREATION_TIME.date() + timedelta(days=1),
+                                  CREATION_TIME.date() + timedelta(days=3))) == [2,3,4]
+    assert query(created_between=(None, CREATION_TIME + timedelta(days=1))) == [1,2]
+    assert query(frequency=1, name_like="%a%") == [1,3,5]
+    assert query(order_by="-longest_streak", limit=3) == [5,3,2]
+    assert query(order_by="name") == [2,5,6,4,1,3]
+    assert query(order_by="-frequency", offset=1, limit=2) == [4,6]
+    assert query(after_id=2, limit=3) == [3,4,5]
+
+    data = storage.query(ids=[3])[0]
+    assert data == storage.load(3)
+    assert storage.query(ids=[3], with_completions=False)[0]\
+        == dict(data, completed_dates=None)
+    with pytest.raises(ValueError):
+        storage.query(order_by="description")
+
+def test_query_uses_the_frequency_index(tmp_path, create_habit):
+    with SQLiteStorage(data_base=str(tmp_path / "index.db")) as storage:
+        storage.save(create_habit(1))
+        condition, parameters = HabitQuery(frequency=7).to_sql()
+        plan = storage.get_connection().execute("EXPLAIN QUERY PLAN "
+                                                + SQLiteStorage.HABIT_QUERY + condition,
+                                                parameters).fetchall()
+        assert any("habit_frequency" in row[-1] for row in plan)
+
+def test_get_completions_between(storage, create_habit):
+    storage.save(create_habit(1, days=(0,3,4,10,40)))
+    storage.save(create_habit(2, days=(1,2)))
+    start = CREATION_TIME.date()
+    assert storage.get_completions_between(1, start + timedelta(days=3),
+                                           start + timedelta(days=10))\
+        == [start + timedelta(days=day) for day in (3,4,10)]
+    assert storage.get_completions_between(1, start - timedelta(days=9), start) == [start]
+    assert storage.get_completions_between(1, start + timedelta(days=11),
+                                           start + timedelta(days=39)) == []
+    storage.load(1)
+    assert storage.get_completions_between(1, start + timedelta(days=40),
+                                           start + timedelta(days=40))\
+        == [start + timedelta(days=40)]
+    assert storage.get_completions_between(99, start, start + timedelta(days=40)) == []
+
+def test_completions_between_use_the_tracking_index(tmp_path, create_habit):
+    with SQLiteStorage(data_base=str(tmp_path / "index.db")) as storage:
+        storage.save(create_habit(1, days=range(30)))
+        plan = storage.get_connection().execute("""
+            EXPLAIN QUERY PLAN SELECT completed_dates FROM tracking
+            WHERE habit_id = ? AND completed_dates BETWEEN ? AND ?
+            ORDER BY completed_dates
+        """, (1, 0, 1)).fetchall()
+        assert any("tracking_habit_date" in row[-1] for row in plan)
+
+@freeze_time("2024-10-06")
+def test_lazy_and_summary_habits(storage, monkeypatch, create_habit):
+    storage.save(create_habit(1, days=range(5)))
+    storage.save(create_habit(2, days=(0,2)))
+    calls = []
+    get_completions_between = storage.get_completions_between
+    def counting_get_completions_between(*args):
+        calls.append(args[0])
+        return get_completions_between(*args)
+    monkeypatch.setattr(storage, "get_completions_between", counting_get_completions_between)
+    monkeypatch.setattr(Habit, "DEFAULT_STORAGE_STRATEGY", storage)
+
+    habits = Habit.load_all(completions=Habit.COMPLETIONS_LAZY)
+    assert [Habit.habit_data(habit) for habit in habits]\
+        == [Habit.habit_data(habit) for habit in Habit.load_all()]
+    assert habits[0]["name"] == "habit 1" and calls == []
+    assert habits[1]["completed_dates"] == [CREATION_TIME.date(),
+                                            CREATION_TIME.date() + timedelta(days=2)]
+    assert calls == [2]
+
+    #a lazy habit is saved without loading its dates
+    habit = Habit.load(1, completions=Habit.COMPLETIONS_LAZY)
+    habit["name"] = "new name"
+    habit.save()
+    assert calls == [2]
+    habit.completion.mark_completed(CREATION_TIME.date() + timedelta(days=6))
+    habit.save()
+    assert calls == [2,1]
+    assert storage.load(1)["streak_state"] == (6,1,5)
+
+    summary = Habit.load(1, completions=Habit.COMPLETIONS_SUMMARY)
+    assert Habit.habit_data(summary) == (1, "new name", "description 1", 1, 1, 5)
+    with pytest.raises(ValueError,match="The completed dates of a summary habit are not loaded."):
+        summary["completed_dates"]
+    assert Habit.load(99, completions=Habit.COMPLETIONS_SUMMARY) is None
+    with pytest.raises(ValueError):
+        Habit.load_all(completions="all")
+
+
+class DictStorage(StorageStrategy):
+    """a minimal strategy which only implements the abstract methods and stores no streaks"""
+    def __init__(self):
+        self.habits = {}
+
+    def save(self, habit):
+        if not habit["habit_id"]:
+            habit["habit_id"] = max(self.habits, default=0) + 1
+        self.habits[habit["habit_id"]] = {
+            "name": habit["name"], "description": habit["description"],
+            "frequency": habit["frequency"], "creation_time": habit["creation_time"],
+            "completed_dates": list(habit["completed_dates"]), "habit_id": habit["habit_id"]}
+        habit.completion.mark_saved()
+        return habit
+
+    def load(self, habit_id):
+        data = self.habits.get(habit_id)
+        return None if data is None else dict(data, completed_dates=list(data["completed_dates"]))
+
+    def delete(self, habit_id):
+        del self.habits[habit_id]
+
+    def load_all(self):
+        return [self.load(habit_id) for habit_id in sorted(self.habits)]
+
+@freeze_time("2024-10-06")
+def test_summary_habits_on_the_base_strategy(monkeypatch, create_habit):
+    storage = DictStorage()
+    storage.save(create_habit(1, days=range(7)))
+    storage.save(create_habit(2, days=range(0,7,7), frequency=7))
+    monkeypatch.setattr(Habit, "DEFAULT_STORAGE_STRATEGY", storage)
+    assert [data["streak_state"] for data in storage.query(with_completions=False)]\
+        == [(6,7,7), (0,1,1)]
+    for completions in (Habit.COMPLETIONS_LAZY, Habit.COMPLETIONS_SUMMARY):
+        assert [Habit.habit_data(habit) for habit in Habit.load_all(completions=completions)]\
+            == [Habit.habit_data(habit) for habit in Habit.load_all()]
+    assert Habit.load(2, completions=Habit.COMPLETIONS_LAZY)["completed_dates"]\
+        == [CREATION_TIME.date()]
+
+@freeze_time("2024-10-06")
+def test_summary_habit_with_stored_period_after_today(storage, monkeypatch, create_habit):
+    #a completion after today can only be stored by an import
+    storage.save(create_habit(1, days=(4,5,6,20)))
+    monkeypatch.setattr(Habit, "DEFAULT_STORAGE_STRATEGY", storage)
+    summary = Habit.load(1, completions=Habit.COMPLETIONS_SUMMARY)
+    assert Habit.habit_data(summary)[4:] == Habit.habit_data(Habit.load(1))[4:] == (3,3)
+    assert not summary.completion.is_loaded()
+    with pytest.raises(ValueError,match="The completed dates of a summary habit are not loaded."):
+        summary["completed_dates"]
@@ -0,0 +1,127 @@
+"""
+NAME
+    test_storage_executor
+
+DESCRIPTION
+    module to test the StorageExecutor class without a Tk main loop
+"""
+import threading
+import pytest
+from scr.storage_executor import StorageExecutor
+
+
+class FakeMaster:
+    """
+    Records the callbacks of after() instead of running a Tk main loop.
+    """
+    def __init__(self):
+        self.scheduled = {}
+        self.count = 0
+
+    def after(self, _, function):
+        self.count += 1
+        self.scheduled[self.count] = function
+        return self.count
+
+    def after_cancel(self, after_id):
+        del self.scheduled[after_id]
+
+    def run_scheduled(self):
+        scheduled, self.scheduled = self.scheduled, {}
+        for function in scheduled.values():
+            function()
+
+    def run_until_idle(self, executor):
+        while executor.pending:
+            self.run_scheduled()
+
+
+@pytest.fixture
+def master():
+    return FakeMaster()
+
+@pytest.fixture
+def executor(master):
+    pending = []
+    storage_executor = StorageExecutor(master=master, on_pending=pending.append)
+    storage_executor.pending_history = pending
+    yield storage_executor
+    storage_executor.shutdown()
+
+
+def test_callbacks_on_polling_thread(master, executor):
+    results = []
+    threads = []
+    def callback(result):
+        results.append(result)
+        threads.append(threading.current_thread())
+    futures = [executor.submit(lambda x: x * 2, i, callback=callback) for i in range(5)]
+    assert [future.result(timeout=5) for future in futures] == [0,2,4,6,8]
+    assert not results
+    master.run_until_idle(executor)
+    assert results == [0,2,4,6,8]
+    assert threads == [threading.current_thread()] * 5
+    assert executor.pending == 0
+    assert executor.pending_history == [1,2,3,4,5,4,3,2,1,0]
+    #no polling without pending requests
+    assert not master.scheduled
+
+def test_single_worker_thread_in_order(master, executor):
+    threads = set()
+    order = []
+    def call(i):
+        threads.add(threading.current_thread())
+        order.append(i)
+    futures = [executor.submit(call, i) for i in range(20)]
+    futures[-1].result(timeout=5)
+    assert order == list(range(20))
+    assert len(threads) == 1
+    assert threading.current_thread() not in threads
+    master.run_until_idle(executor)
+
+def test_error_callback(master, executor):
+    errors = []
+    def fail():
+        raise ValueError("ID is not in database.")
+    future = executor.submit(fail, callback=errors.append, error_callback=errors.append)
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    master.run_until_idle(executor)
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+    executor.submit(fail).exception(timeout=5)
+    with pytest.raises(ValueError,match="ID is not in database."):
+        master.run_until_idle(executor)
+    assert executor.pending == 0
+
+def test_poll_until_finished(master, executor):
+    event = threading.Event()
+    results = []
+    future = executor.submit(event.wait, 5, callback=results.append)
+    master.run_scheduled()
+    #the request is still running, so the executor polls again
+    assert master.scheduled and not results
+    event.set()
+    future.result(timeout=5)
+    master.run_until_idle(executor)
+    assert results == [True]
+    assert not master.scheduled
+
+def test_background_requests_are_not_pending(master, executor):
+    results = []
+    future = executor.submit(lambda: 1, callback=results.append, background=True)
+    assert executor.pending == 0
+    future.result(timeout=5)
+    #the executor polls until the callback of the background request is delivered
+    while master.scheduled:
+        master.run_scheduled()
+    assert results == [1]
+    assert executor.pending_history == []
+
+def test_shutdown(master, executor):
+    results = []
+    future = executor.submit(lambda: "saved", callback=results.append)
+    executor.shutdown(wait=True)
+    assert future.result() == "saved"
+    assert not master.scheduled
+    with pytest.raises(RuntimeError,match="The storage executor is shut down."):
+        executor.submit(lambda: None)